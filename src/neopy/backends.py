@@ -0,0 +1,208 @@
+"""
+Execution backends.
+
+`Graph.run()` hands its query over to a backend: by default the
+`BoltBackend`, which sends it to the Neo4j server. Other backends can
+stand in for the server, like `neopy.memory.InMemoryBackend`.
+"""
+
+import re
+from contextlib import contextmanager
+
+from . import db
+from .cypher import cypher_name
+
+_current = None
+
+# Parameters (group 1), or string literals and quoted names, which are kept as they are.
+PARAMETERS = re.compile(r'"(?:\\.|[^"\\])*"' + r"|'(?:\\.|[^'\\])*'" + r"|`[^`]*`|\$(\w+)")
+
+
+def _prefixed(statement, prefix):
+    return PARAMETERS.sub(lambda match: "$" + prefix + match.group(1) if match.group(1) else match.group(0), statement)
+
+
+def combine(queries):
+    """
+    Combine queries into a single statement, of one subquery per query.
+
+    Each subquery returns the rows of its query as a list, so that the queries
+    are sent, and their records received, in a single round trip.
+
+    Arguments:
+        queries: A list of `(query, statement, parameters)` tuples.
+
+    Returns:
+        A tuple of the statement, its parameters and the column names of each query,
+        or `None` when the column names of a query are not known in advance.
+    """
+    clauses, parameters, columns = [], {}, []
+    for index, (query, _, _) in enumerate(queries):
+        names = None if query is None else query.columns()
+        if names is None:
+            return None
+        # Subqueries must alias the expressions they return.
+        statement, query_parameters = query.compile(aliased=True)
+        prefix = "q%d_" % index
+        body = _prefixed(statement.rstrip().rstrip(";"), prefix)
+        parameters.update((prefix + name, value) for name, value in query_parameters.items())
+        # Writes without RETURN clause run as unit subqueries, which keep the single row.
+        rows = "collect([%s])" % ", ".join(cypher_name(name) for name in names) if names else "[]"
+        clauses.append("CALL { CALL { %s } RETURN %s AS r%d }" % (body, rows, index))
+        columns.append(names)
+    clauses.append("RETURN " + ", ".join("r%d" % index for index in range(len(queries))))
+    return " ".join(clauses), parameters, columns
+
+
+class Backend:
+    """Interface of execution backends."""
+
+    def run(self, query, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        """
+        Execute a query.
+
+        Arguments:
+            query: The `Query`, for backends interpreting it.
+            statement: The rendered query.
+            parameters: The query parameters.
+            access_mode: `db.READ_ACCESS` for read-only queries, `db.WRITE_ACCESS` otherwise.
+            **options: Execution options, like a retry policy, an idempotency key or a logical session.
+
+        Returns:
+            The list of records.
+        """
+        raise NotImplementedError
+
+    def stream(self, query, statement, parameters, consumer, access_mode=db.WRITE_ACCESS, **options):
+        """
+        Execute a query, passing its records to a consumer as they arrive.
+
+        The consumer may be called again if the query is retried:
+        it must start over from the records it receives.
+
+        Arguments:
+            query: The `Query`, for backends interpreting it.
+            statement: The rendered query.
+            parameters: The query parameters.
+            consumer: A function accepting an iterator of records.
+            access_mode: `db.READ_ACCESS` for read-only queries, `db.WRITE_ACCESS` otherwise.
+            **options: Execution options, like a retry policy, an idempotency key or a logical session.
+
+        Returns:
+            The return value of the consumer.
+        """
+        return consumer(iter(self.run(query, statement, parameters, access_mode=access_mode, **options)))
+
+    def run_many(self, queries, access_mode=db.WRITE_ACCESS, **options):
+        """
+        Execute several queries, in order.
+
+        Backends that can run them in a single transaction, or round trip, override this method.
+
+        Arguments:
+            queries: A list of `(query, statement, parameters)` tuples.
+            access_mode: `db.READ_ACCESS` when all the queries are read-only, `db.WRITE_ACCESS` otherwise.
+            **options: Execution options, like a retry policy, an idempotency key or a logical session.
+
+        Returns:
+            The list of records of each query.
+        """
+        return [
+            self.run(query, statement, parameters, access_mode=access_mode, **options)
+            for query, statement, parameters in queries
+        ]
+
+    def explain(self, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        """
+        Return the execution plan of a query, without running it.
+
+        Arguments:
+            statement: The rendered query.
+            parameters: The query parameters.
+            access_mode: `db.READ_ACCESS` for read-only queries, `db.WRITE_ACCESS` otherwise.
+            **options: Execution options.
+
+        Returns:
+            The plan, as nested dictionaries with `operatorType`, `args` and `children` keys,
+            or `None` when the backend has no planner.
+        """
+        return None
+
+
+class BoltBackend(Backend):
+    """Execute queries on the Neo4j server, in retried transactions."""
+
+    def run(self, query, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        return db.run_transaction(lambda tx: list(tx.run(statement, parameters)), access_mode=access_mode, **options)
+
+    def stream(self, query, statement, parameters, consumer, access_mode=db.WRITE_ACCESS, **options):
+        return db.run_transaction(
+            lambda tx: consumer(tx.run(statement, parameters)),
+            access_mode=access_mode,
+            **options,
+        )
+
+    def run_many(self, queries, access_mode=db.WRITE_ACCESS, **options):
+        combined = combine(queries) if len(queries) > 1 else None
+        if combined is None:
+            # The driver waits for each query to be accepted before returning its result: one round trip each.
+            def work(tx):
+                return [list(tx.run(statement, parameters)) for _, statement, parameters in queries]
+
+            return db.run_transaction(work, access_mode=access_mode, **options)
+        from .memory import MemoryRecord  # noqa: WPS433 (circular import)
+
+        statement, parameters, columns = combined
+        (record,) = self.run(None, statement, parameters, access_mode=access_mode, **options)
+        return [
+            [MemoryRecord(names, row) for row in record["r%d" % index]] for index, names in enumerate(columns)
+        ]
+
+    def explain(self, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        explained = "EXPLAIN " + statement
+        return db.run_transaction(
+            lambda tx: tx.run(explained, parameters).consume().plan,
+            access_mode=access_mode,
+            **options,
+        )
+
+
+_default = BoltBackend()
+
+
+def use(backend):
+    """
+    Set the backend used by `Graph.run()`.
+
+    Arguments:
+        backend: A backend, or `None` for the default `BoltBackend`.
+
+    Returns:
+        The backend.
+    """
+    global _current  # noqa: WPS420 (module-level switch)
+    _current = backend
+    return backend
+
+
+def current():
+    return _current or _default
+
+
+@contextmanager
+def using(backend):
+    """
+    Use a backend in a `with` block.
+
+    Arguments:
+        backend: The backend to use.
+
+    Yields:
+        The backend.
+    """
+    previous = _current
+    use(backend)
+    try:
+        yield backend
+    finally:
+        use(previous)
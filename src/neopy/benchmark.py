@@ -0,0 +1,294 @@
+"""
+Benchmark the client-side cost of neopy on recorded traffic.
+
+A workload is a function issuing queries with `Graph.run()`. It is run
+several times against a `ReplayBackend`, so that the measured time is the
+time spent building, rendering and hydrating queries, plus the latency
+chosen for the replay:
+
+```python
+result = benchmark.run(workload, "traffic.jsonl.gz", repeat=10)
+print(result.summary())
+```
+
+Built-in scenarios (`SCENARIOS`) time single operations against the
+current backend instead, to compare targets: see `run_scenario`.
+`measure_allocations` traces the memory they allocate and the garbage
+collections they trigger, to compare ways of building queries:
+
+```python
+for name in ("render", "render-prepared"):
+    print(benchmark.measure_allocations(name).summary())
+```
+"""
+
+import gc
+import statistics
+import time
+import tracemalloc
+
+from . import backends
+from .graph import Graph, Node, NodeLabel
+from .replay import ReplayBackend
+
+BENCH_LABEL = NodeLabel("NeopyBench")
+
+
+class BenchmarkResult:
+    def __init__(self, name, timings, queries):
+        self.name = name
+        self.timings = timings
+        self.queries = queries
+
+    @property
+    def best(self):
+        return min(self.timings)
+
+    @property
+    def median(self):
+        return statistics.median(self.timings)
+
+    @property
+    def mean(self):
+        return statistics.mean(self.timings)
+
+    @property
+    def throughput(self):
+        """Timed runs per second."""
+        total = sum(self.timings)
+        return len(self.timings) / total if total else 0.0
+
+    def percentile(self, percent):
+        ordered = sorted(self.timings)
+        position = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+        return ordered[position]
+
+    @property
+    def per_query(self):
+        return self.median / self.queries if self.queries else 0.0
+
+    def latency_summary(self):
+        return "%s: %d operations, %.1f ops/s, p50 %.1fus, p95 %.1fus, p99 %.1fus" % (
+            self.name,
+            len(self.timings),
+            self.throughput,
+            self.percentile(50) * 1e6,
+            self.percentile(95) * 1e6,
+            self.percentile(99) * 1e6,
+        )
+
+    def summary(self):
+        return "%s: %d runs, %d queries, best %.6fs, median %.6fs, %.1fus/query" % (
+            self.name,
+            len(self.timings),
+            self.queries,
+            self.best,
+            self.median,
+            self.per_query * 1e6,
+        )
+
+
+def run(workload, recording, repeat=5, warmup=1, latency=0.0, recorded_latency=False, name=None):
+    """
+    Time a workload against recorded traffic.
+
+    Arguments:
+        workload: A function without arguments, issuing queries with `Graph.run()`.
+        recording: The path of a recording, or a `ReplayBackend`.
+        repeat: The number of timed runs.
+        warmup: The number of untimed runs before them.
+        latency: A delay added to each query, in seconds.
+        recorded_latency: Whether to also wait the time the recorded queries took.
+        name: The name of the benchmark (defaults to the workload's name).
+
+    Returns:
+        A `BenchmarkResult`.
+    """
+    replay = recording
+    if not isinstance(replay, ReplayBackend):
+        replay = ReplayBackend(recording, latency=latency, recorded_latency=recorded_latency)
+    timings = []
+    with backends.using(replay):
+        for iteration in range(warmup + repeat):
+            replay.rewind()
+            start = time.perf_counter()
+            workload()
+            elapsed = time.perf_counter() - start
+            if iteration >= warmup:
+                timings.append(elapsed)
+    return BenchmarkResult(name or getattr(workload, "__name__", "workload"), timings, replay.served)
+
+
+class Scenario:
+    """
+    A benchmark scenario: one operation, timed many times.
+
+    Arguments:
+        name: The name of the scenario.
+        operation: A function accepting the index of the operation.
+        setup: A function accepting the number of operations, run once before them.
+        teardown: A function run once after them, even when they fail, to delete what they wrote.
+        description: What the scenario measures.
+    """
+
+    def __init__(self, name, operation, setup=None, teardown=None, description=""):
+        self.name = name
+        self.operation = operation
+        self.setup = setup
+        self.teardown = teardown
+        self.description = description
+
+
+def _render(index):
+    person = Node("p", BENCH_LABEL)
+    Graph().match(person).where(person.prop.id == index).return_(person.prop.name).query.compile()
+
+
+def _create_people(operations):
+    graph = Graph()
+    for index in range(100):
+        graph = graph.create(Node(BENCH_LABEL, id=index, name="Person %d" % index))
+    graph.run()
+
+
+# Built once, then rebound and compiled by each operation.
+_PREPARED = Graph().match(Node("p", BENCH_LABEL)).where("p.id = $id").bind(id=0).return_("p.name").prepare()
+
+
+def _render_prepared(index):
+    _PREPARED.rebind(id=index).query.compile()
+
+
+def _delete_bench_nodes():
+    backend = backends.current()
+    store = getattr(backend, "store", None)
+    if store is None:
+        backend.run(None, "MATCH (n:%s) DETACH DELETE n" % BENCH_LABEL.name, {})
+        return
+    # In-memory backends do not execute DELETE clauses: delete through their store.
+    for node in store.find_nodes({BENCH_LABEL.name}, {}):
+        for relationship in {*store.outgoing[node.id], *store.incoming[node.id]}:
+            store.delete_relationship(relationship)
+        store.delete_node(node)
+
+
+def _point_read(index):
+    Graph().match(Node("p", BENCH_LABEL, id=index % 100)).return_("p.name").run()
+
+
+def _create(index):
+    Graph().create(Node("p", BENCH_LABEL, id=index)).return_("p").run()
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("render", _render, description="build and render a query, without executing it"),
+        Scenario("render-prepared", _render_prepared, description="rebind and compile a prepared query"),
+        Scenario(
+            "point-read",
+            _point_read,
+            setup=_create_people,
+            teardown=_delete_bench_nodes,
+            description="match one node by property",
+        ),
+        Scenario("create", _create, teardown=_delete_bench_nodes, description="create one node per query"),
+    )
+}
+
+
+def run_scenario(scenario, operations=1000, warmup=100):
+    """
+    Time the operations of a scenario, one by one, on the current backend.
+
+    Arguments:
+        scenario: A `Scenario`, or the name of a built-in one.
+        operations: The number of timed operations.
+        warmup: The number of untimed operations before them.
+
+    Returns:
+        A `BenchmarkResult`, with one timing per operation.
+    """
+    if isinstance(scenario, str):
+        scenario = SCENARIOS[scenario]
+    latencies = []
+    try:
+        if scenario.setup is not None:
+            scenario.setup(operations)
+        for index in range(warmup + operations):
+            start = time.perf_counter()
+            scenario.operation(index)
+            elapsed = time.perf_counter() - start
+            if index >= warmup:
+                latencies.append(elapsed)
+    finally:
+        if scenario.teardown is not None:
+            scenario.teardown()
+    return BenchmarkResult(scenario.name, latencies, operations)
+
+
+class AllocationResult:
+    def __init__(self, name, peaks, collections):
+        self.name = name
+        self.peaks = peaks
+        self.collections = collections
+
+    @property
+    def peak(self):
+        """Median memory allocated by an operation, in bytes."""
+        return statistics.median(self.peaks)
+
+    @property
+    def collections_per_thousand(self):
+        return 1000 * self.collections / len(self.peaks) if self.peaks else 0.0
+
+    def summary(self):
+        return "%s: %d operations, %d bytes allocated/operation, %.1f collections/1000 operations" % (
+            self.name,
+            len(self.peaks),
+            self.peak,
+            self.collections_per_thousand,
+        )
+
+
+def _collections():
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def measure_allocations(scenario, operations=1000, warmup=100):
+    """
+    Measure the memory allocated by the operations of a scenario, and the garbage collections they trigger.
+
+    Each operation is traced with `tracemalloc`: its peak of traced memory is
+    the memory it allocated, whether it was freed or kept afterwards.
+
+    Arguments:
+        scenario: A `Scenario`, or the name of a built-in one.
+        operations: The number of traced operations.
+        warmup: The number of untraced operations before them.
+
+    Returns:
+        An `AllocationResult`.
+    """
+    if isinstance(scenario, str):
+        scenario = SCENARIOS[scenario]
+    peaks = []
+    try:
+        if scenario.setup is not None:
+            scenario.setup(operations)
+        for index in range(warmup):
+            scenario.operation(index)
+        collections = _collections()
+        for index in range(warmup, warmup + operations):
+            # Restarting clears the traces, so that the peak is the one of this operation.
+            tracemalloc.start()
+            try:
+                scenario.operation(index)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        collections = _collections() - collections
+    finally:
+        if scenario.teardown is not None:
+            scenario.teardown()
+    return AllocationResult(scenario.name, peaks, collections)
@@ -0,0 +1,405 @@
+"""
+Parallel bulk loading of nodes and relationships.
+
+Nodes are written first, in `UNWIND` batches grouped by label set.
+Relationships are then partitioned in rounds: batches of the same round
+touch disjoint sets of nodes, so they can be written concurrently
+without competing for the same node locks.
+
+Tables of nodes can also be loaded column by column, from NumPy arrays,
+lists or data frames: slices of the columns are sent as list parameters,
+without building a `Node` or a dictionary per row. These nodes are merged
+on the key column, so loading a table again updates them instead of
+duplicating them.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import cache, db
+from .cypher import cypher_escape, cypher_name, cypher_parameter
+from .retry import RetryPolicy
+from .utils import chunks
+
+Batch = namedtuple("Batch", "statement rows")
+
+_worker = threading.local()
+
+
+class WorkerStats(namedtuple("WorkerStats", "worker batches items seconds")):
+    @property
+    def throughput(self):
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+class LoadReport:
+    def __init__(self):
+        self.workers = {}
+        self.seconds = 0.0
+
+    def add(self, worker, items, seconds):
+        stats = self.workers.get(worker, WorkerStats(worker, 0, 0, 0.0))
+        self.workers[worker] = WorkerStats(worker, stats.batches + 1, stats.items + items, stats.seconds + seconds)
+
+    @property
+    def items(self):
+        return sum(stats.items for stats in self.workers.values())
+
+    @property
+    def throughput(self):
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+class _Round:
+    def __init__(self, width, batch_size):
+        self.batches = [[] for _ in range(width)]
+        self.owners = {}
+        self.batch_size = batch_size
+
+    def place(self, start, end, row):
+        start_owner = self.owners.get(start)
+        end_owner = self.owners.get(end)
+        if start_owner is not None and end_owner is not None and start_owner != end_owner:
+            return False
+        target = start_owner if start_owner is not None else end_owner
+        if target is None:
+            target = min(range(len(self.batches)), key=lambda index: len(self.batches[index]))
+        if len(self.batches[target]) >= self.batch_size:
+            return False
+        self.batches[target].append(row)
+        self.owners[start] = self.owners[end] = target
+        return True
+
+
+def partition_edges(edges, batch_size, width):
+    """
+    Split edges in rounds of batches that touch disjoint node sets.
+
+    Arguments:
+        edges: An iterable of `(start_key, end_key, row)` tuples.
+        batch_size: Maximum number of rows in a batch.
+        width: Maximum number of batches in a round (the number of concurrent writers).
+
+    Returns:
+        A list of rounds, each round being a list of non-empty batches (lists of rows).
+    """
+    rounds = []
+    last_round = {}
+    for start, end, row in edges:
+        index = max(last_round.get(start, 0), last_round.get(end, 0))
+        while True:
+            if index == len(rounds):
+                rounds.append(_Round(width, batch_size))
+            if rounds[index].place(start, end, row):
+                break
+            index += 1
+        last_round[start] = last_round[end] = index
+    return [[batch for batch in round_.batches if batch] for round_ in rounds]
+
+
+def _labels(names):
+    return "".join(":" + cypher_escape(name) for name in names)
+
+
+def _written(names):
+    # Nodes without labels are tracked by the query cache under its wildcard.
+    return names or (cache.WILDCARD,)
+
+
+def _init_thread(driver, sessions):
+    _worker.session = driver.session()
+    sessions.append(_worker.session)
+
+
+def _init_process(uri, auth):
+    from multiprocessing.util import Finalize  # noqa: WPS433 (only needed by process workers)
+
+    from neo4j import GraphDatabase
+
+    _worker.driver = GraphDatabase.driver(uri, auth=auth)
+    _worker.session = _worker.driver.session()
+    # Pool processes exit without running `atexit` handlers, but they run multiprocessing finalizers.
+    Finalize(None, _close_process, exitpriority=0)
+
+
+def _close_process():
+    _worker.session.close()
+    _worker.driver.close()
+
+
+def _run_batch(statement, rows):
+    with _worker.session.begin_transaction() as tx:
+        tx.run(statement, rows=rows).consume()
+
+
+def _run_columns(statement, parameters):
+    with _worker.session.begin_transaction() as tx:
+        return [record[0] for record in tx.run(statement, parameters)]
+
+
+def _write_columns(statement, parameters, retry):
+    start = time.perf_counter()
+    ids = retry.call(_run_columns, statement, parameters)
+    worker = "{pid}-{thread}".format(pid=os.getpid(), thread=threading.current_thread().name)
+    return worker, parameters["size"], time.perf_counter() - start, ids
+
+
+def _column_slice(column, start, stop):
+    values = column[start:stop]
+    if getattr(values, "dtype", object) != object:
+        # NumPy arrays and pandas series of numbers convert to Python scalars in C, and hold no decimals.
+        return values.tolist()
+    return cypher_parameter(values.tolist() if hasattr(values, "tolist") else list(values))
+
+
+def _write_batch(statement, rows, retry):
+    start = time.perf_counter()
+    retry.call(_run_batch, statement, rows)
+    worker = "{pid}-{thread}".format(pid=os.getpid(), thread=threading.current_thread().name)
+    return worker, len(rows), time.perf_counter() - start
+
+
+class BulkLoader:
+    """
+    Load streams of nodes and relationships with a pool of writers.
+
+    Arguments:
+        key: The property identifying nodes, used to match the ends of relationships.
+        batch_size: Number of rows sent in each `UNWIND` batch.
+        workers: Number of concurrent writers, each with its own session.
+        executor: Either `"thread"` or `"process"`.
+        retry: The retry policy applied to each batch (defaults to retrying transient errors such as deadlocks).
+        driver: The driver used by thread workers (defaults to `neopy.db.get_driver()`).
+        uri: The URI used by process workers to create their own driver (defaults to `neopy.db.uri`).
+        auth: The authentication used by process workers (defaults to `neopy.db.auth`).
+        window: Number of relationships partitioned together (defaults to four rounds of full batches).
+    """
+
+    def __init__(
+        self,
+        key="id",
+        batch_size=1000,
+        workers=4,
+        executor="thread",
+        retry=None,
+        driver=None,
+        uri=None,
+        auth=None,
+        window=None,
+    ):
+        if executor not in {"thread", "process"}:
+            raise ValueError("executor must be 'thread' or 'process', not %r" % executor)
+        self.key = key
+        self.batch_size = batch_size
+        self.workers = workers
+        self.executor = executor
+        if retry is None:
+            from neo4j.exceptions import TransientError
+
+            retry = RetryPolicy(retry_on=(TransientError,))
+        self.retry = retry
+        self.driver = driver
+        self.uri = uri
+        self.auth = auth
+        self.window = window or batch_size * workers * 4
+
+    def load(self, nodes=(), edges=()):
+        """
+        Write nodes, then relationships.
+
+        Arguments:
+            nodes: An iterable of `Node` instances, carrying the key property.
+            edges: An iterable of `(start_node, relationship, end_node)` tuples.
+
+        Returns:
+            A `LoadReport` with the throughput of each worker.
+        """
+        report = LoadReport()
+        sessions = []
+        written = set()
+        start = time.perf_counter()
+        try:
+            with self._make_executor(sessions) as executor:
+                self._run_round(executor, self.node_batches(nodes, written), report)
+                for statement, rounds in self.edge_rounds(edges, written):
+                    for batches in rounds:
+                        self._run_round(executor, [Batch(statement, rows) for rows in batches], report)
+        finally:
+            # Evict cached reads even after a partial load: the first batches were committed.
+            cache.invalidate(written)
+            for session in sessions:
+                session.close()
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def node_batches(self, nodes, written=None):
+        pending = defaultdict(list)
+        for node in nodes:
+            names = tuple(sorted(label.name for label in node.labels))
+            if written is not None:
+                written.update(_written(names))
+            rows = pending[names]
+            rows.append(cypher_parameter(dict(node.properties)))
+            if len(rows) == self.batch_size:
+                yield Batch(self.node_statement(names), rows)
+                pending[names] = []
+        for names, rows in pending.items():
+            if rows:
+                yield Batch(self.node_statement(names), rows)
+
+    def load_columns(self, labels, columns, return_ids=False):
+        """
+        Create or update nodes from a table, column by column, merging them on the key column.
+
+        Arguments:
+            labels: The labels of the nodes, as `NodeLabel` instances or names.
+            columns: A mapping of property names to columns of equal length:
+                NumPy arrays, lists, or a data frame. It must contain the key column.
+            return_ids: Whether to return the internal ids of the created or updated nodes.
+
+        Raises:
+            ValueError: When the key column is missing or the columns have different lengths.
+
+        Returns:
+            A `LoadReport`, and the internal ids in row order (a NumPy array when NumPy is installed)
+            if `return_ids` is true.
+        """
+        names = tuple(sorted(getattr(label, "name", label) for label in labels))
+        columns = {name: columns[name] for name in columns.keys()}
+        if self.key not in columns:
+            raise ValueError("the key column %r is missing" % self.key)
+        sizes = {len(column) for column in columns.values()}
+        if len(sizes) != 1:
+            raise ValueError("columns have different lengths: %s" % sorted(sizes))
+        size = sizes.pop()
+        statement = self.columns_statement(names, list(columns), return_ids)
+
+        report = LoadReport()
+        ids = []
+        sessions = []
+        start = time.perf_counter()
+        try:
+            with self._make_executor(sessions) as executor:
+                for offsets in chunks(range(0, size, self.batch_size), self.workers * 2):
+                    futures = []
+                    for offset in offsets:
+                        stop = min(offset + self.batch_size, size)
+                        parameters = {"size": stop - offset}
+                        for index, column in enumerate(columns.values()):
+                            parameters["c%d" % index] = _column_slice(column, offset, stop)
+                        futures.append(executor.submit(_write_columns, statement, parameters, self.retry))
+                    for future in futures:
+                        worker, items, seconds, batch_ids = future.result()
+                        report.add(worker, items, seconds)
+                        ids.extend(batch_ids)
+        finally:
+            cache.invalidate(_written(names))
+            for session in sessions:
+                session.close()
+        report.seconds = time.perf_counter() - start
+        if not return_ids:
+            return report
+        try:
+            import numpy  # noqa: WPS433 (optional dependency)
+        except ImportError:
+            return report, ids
+        return report, numpy.array(ids, dtype="int64")
+
+    def columns_statement(self, names, properties, return_ids=False):
+        # Nodes are merged on the key column, so that loading a table again updates its nodes.
+        key = properties.index(self.key)
+        statement = "UNWIND range(0, $size - 1) AS i MERGE (n{labels} {{{key}: $c{index}[i]}})".format(
+            labels=_labels(names),
+            key=cypher_name(self.key),
+            index=key,
+        )
+        assignments = [
+            "n.%s = $c%d[i]" % (cypher_name(name), index) for index, name in enumerate(properties) if index != key
+        ]
+        if assignments:
+            statement += " SET " + ", ".join(assignments)
+        return statement + " RETURN id(n)" if return_ids else statement
+
+    def node_statement(self, names):
+        return "UNWIND $rows AS row CREATE (n{labels}) SET n = row".format(labels=_labels(names))
+
+    def edge_rounds(self, edges, written=None):
+        for window in chunks(edges, self.window):
+            groups = defaultdict(list)
+            for start, relationship, end in window:
+                start_names = tuple(sorted(label.name for label in start.labels))
+                end_names = tuple(sorted(label.name for label in end.labels))
+                if written is not None:
+                    written.update(_written(start_names), _written(end_names))
+                pattern = type(relationship)("r", *relationship.types).as_cypher(keys=["id", "types"])
+                start_key = cypher_parameter(start.properties[self.key])
+                end_key = cypher_parameter(end.properties[self.key])
+                properties = cypher_parameter(dict(relationship.properties))
+                row = {"start": start_key, "end": end_key, "properties": properties}
+                groups[(start_names, pattern, end_names)].append(
+                    ((start_names, start_key), (end_names, end_key), row)
+                )
+            for (start_names, pattern, end_names), group in groups.items():
+                statement = self.edge_statement(start_names, pattern, end_names)
+                yield statement, partition_edges(group, self.batch_size, self.workers)
+
+    def edge_statement(self, start_names, pattern, end_names):
+        return (
+            "UNWIND $rows AS row "
+            "MATCH (a{start} {{{key}: row.start}}) "
+            "MATCH (b{end} {{{key}: row.end}}) "
+            "CREATE (a){pattern}(b) SET r = row.properties"
+        ).format(start=_labels(start_names), end=_labels(end_names), key=cypher_name(self.key), pattern=pattern)
+
+    def _make_executor(self, sessions):
+        if self.executor == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_process,
+                initargs=(self.uri or db.uri, self.auth or db.auth),
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_thread,
+            initargs=(self.driver or db.get_driver(), sessions),
+        )
+
+    def _run_round(self, executor, batches, report):
+        for group in chunks(batches, self.workers * 2):
+            futures = [executor.submit(_write_batch, batch.statement, batch.rows, self.retry) for batch in group]
+            for future in futures:
+                report.add(*future.result())
+
+
+def load(nodes=(), edges=(), **options):
+    """
+    Load nodes and relationships in parallel.
+
+    Arguments:
+        nodes: An iterable of `Node` instances.
+        edges: An iterable of `(start_node, relationship, end_node)` tuples.
+        **options: Options passed to `BulkLoader`.
+
+    Returns:
+        A `LoadReport`.
+    """
+    return BulkLoader(**options).load(nodes, edges)
+
+
+def load_columns(labels, columns, return_ids=False, **options):
+    """
+    Create or update nodes from a table, column by column, merging them on the key column.
+
+    Arguments:
+        labels: The labels of the nodes.
+        columns: A mapping of property names to columns of equal length.
+        return_ids: Whether to also return the internal ids of the created or updated nodes.
+        **options: Options passed to `BulkLoader`.
+
+    Returns:
+        A `LoadReport`, and the internal ids if `return_ids` is true.
+    """
+    return BulkLoader(**options).load_columns(labels, columns, return_ids)
@@ -0,0 +1,206 @@
+"""
+Client-side cache of read query results.
+
+The cache is opt-in: once enabled with `enable()`, read-only queries
+run through `Graph.run()` are served from it, and every write run
+through neopy evicts the cached reads that matched one of its labels.
+Nodes without labels are tracked under the `"*"` wildcard: reads
+matching them are evicted by any write, and writes touching them
+evict every cached read.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+WILDCARD = "*"
+
+# String literals and escaped names, kept as they are, or runs of whitespace, collapsed.
+TOKENS = re.compile(r'"(?:\\.|[^"\\])*"' + r"|'(?:\\.|[^'\\])*'" + r"|`[^`]*`|\s+")
+
+_current = None
+
+
+class CacheBackend:
+    """Interface of the storages used by `QueryCache`, for example a shared cache server."""
+
+    def get(self, key):
+        """
+        Return the records stored under a key.
+
+        Arguments:
+            key: The cache key.
+
+        Returns:
+            The records, or `None` when the key is missing or expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key, records, labels, ttl):
+        """
+        Store records under a key.
+
+        Arguments:
+            key: The cache key.
+            records: The records to store.
+            labels: The labels matched by the query.
+            ttl: The time to live of the entry, in seconds.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, labels):
+        """
+        Evict the entries that matched any of the given labels.
+
+        Arguments:
+            labels: Label names. The wildcard evicts every entry.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    An in-process, size-bounded LRU storage.
+
+    Arguments:
+        maxsize: Maximum number of entries kept.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.keys_by_label = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, records = entry
+            if expires_at <= time.monotonic():
+                self._evict(key)
+                return None
+            self.entries.move_to_end(key)
+            return records
+
+    def set(self, key, records, labels, ttl):
+        with self.lock:
+            if key in self.entries:
+                self._evict(key)
+            self.entries[key] = (time.monotonic() + ttl, labels, records)
+            for label in labels:
+                self.keys_by_label[label].add(key)
+            while len(self.entries) > self.maxsize:
+                self._evict(next(iter(self.entries)))
+
+    def invalidate(self, labels):
+        with self.lock:
+            if WILDCARD in labels:
+                self._clear()
+                return
+            for label in {*labels, WILDCARD}:
+                for key in list(self.keys_by_label.get(label, ())):
+                    self._evict(key)
+
+    def clear(self):
+        with self.lock:
+            self._clear()
+
+    def _clear(self):
+        self.entries.clear()
+        self.keys_by_label.clear()
+
+    def _evict(self, key):
+        _, labels, _ = self.entries.pop(key)
+        for label in labels:
+            keys = self.keys_by_label[label]
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_label[label]
+
+
+def _normalise(match):
+    token = match.group()
+    return " " if token.isspace() else token
+
+
+class QueryCache:
+    """
+    Cache read results by normalised query text and parameters.
+
+    Arguments:
+        backend: The storage (defaults to a `MemoryBackend`).
+        ttl: The time to live of entries, in seconds.
+    """
+
+    def __init__(self, backend=None, ttl=60.0):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, statement, parameters=None):
+        normalised = TOKENS.sub(_normalise, statement).strip().rstrip(";")
+        return normalised + "\n" + json.dumps(parameters or {}, sort_keys=True, default=repr)
+
+    def get(self, statement, parameters=None):
+        records = self.backend.get(self.key(statement, parameters))
+        if records is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(records)
+
+    def set(self, statement, records, labels, parameters=None):
+        self.backend.set(self.key(statement, parameters), list(records), frozenset(labels), self.ttl)
+
+    def invalidate(self, labels):
+        self.backend.invalidate(frozenset(labels))
+
+    def clear(self):
+        self.backend.clear()
+        self.hits = self.misses = 0
+
+
+def enable(query_cache=None):
+    """
+    Enable result caching in `Graph.run()`.
+
+    Arguments:
+        query_cache: The cache to use (defaults to a new `QueryCache`).
+
+    Returns:
+        The enabled cache.
+    """
+    global _current  # noqa: WPS420 (module-level switch)
+    _current = query_cache or QueryCache()
+    return _current
+
+
+def disable():
+    global _current  # noqa: WPS420 (module-level switch)
+    _current = None
+
+
+def current():
+    return _current
+
+
+def invalidate(labels):
+    """
+    Evict the cached reads of labels written outside `Graph.run()`, when caching is enabled.
+
+    Arguments:
+        labels: Label names. The wildcard evicts every entry.
+    """
+    if _current is not None:
+        _current.invalidate(labels)
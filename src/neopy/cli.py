@@ -12,7 +12,15 @@
 """Module that contains the command line application."""
 
 import argparse
-from typing import List, Optional
+import csv
+import io
+import json
+import runpy
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import backends, bulk, db
+from .graph import Node, NodeLabel, RelationshipTo, RelationshipType
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -22,7 +30,206 @@ def get_parser() -> argparse.ArgumentParser:
     Returns:
         An argparse parser.
     """
-    return argparse.ArgumentParser(prog="neopy")
+    from . import benchmark, export  # noqa: WPS433 (only needed to run commands)
+
+    parser = argparse.ArgumentParser(prog="neopy")
+    connection = argparse.ArgumentParser(add_help=False)
+    connection.add_argument("--uri", help="URI of the Neo4j server (default: %s)." % db.uri)
+    connection.add_argument("--user", help="User name.")
+    connection.add_argument("--password", help="Password.")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    import_parser = subparsers.add_parser(
+        "import",
+        parents=[connection],
+        help="Load nodes and relationships from CSV or JSON lines files.",
+    )
+    import_parser.add_argument("--nodes", action="append", default=[], metavar="FILE", help="A file of nodes.")
+    import_parser.add_argument("--edges", action="append", default=[], metavar="FILE", help="A file of relationships.")
+    import_parser.add_argument("--label", action="append", default=[], dest="labels", help="A label of the nodes.")
+    import_parser.add_argument("--type", help="The type of the relationships.")
+    import_parser.add_argument("--start-label", action="append", dest="start_labels", help="A label of start nodes.")
+    import_parser.add_argument("--end-label", action="append", dest="end_labels", help="A label of end nodes.")
+    import_parser.add_argument("--start-column", default="start", help="The column of start node keys.")
+    import_parser.add_argument("--end-column", default="end", help="The column of end node keys.")
+    import_parser.add_argument("--key", default="id", help="The property identifying nodes (default: id).")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="Rows per batch (default: 1000).")
+    import_parser.add_argument("--workers", type=int, default=4, help="Concurrent writers (default: 4).")
+    import_parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="Writers pool.")
+
+    query_parser = subparsers.add_parser("query", parents=[connection], help="Run a query and stream its records.")
+    query_source = query_parser.add_mutually_exclusive_group(required=True)
+    query_source.add_argument("cypher", nargs="?", help="A Cypher statement.")
+    query_source.add_argument("--file", help="A Python file defining a `graph` variable, built with neopy.")
+    query_parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="A parameter of the Cypher statement. Values are parsed as JSON when possible.",
+    )
+    query_parser.add_argument("--read", action="store_true", help="Run the Cypher statement as a read transaction.")
+    query_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Output format.")
+    query_parser.add_argument("--output", help="Output file (default: standard output).")
+    query_parser.add_argument(
+        "--flush-size",
+        type=int,
+        default=export.DEFAULT_FLUSH_SIZE,
+        help="Records written at once (default: %d)." % export.DEFAULT_FLUSH_SIZE,
+    )
+
+    bench_parser = subparsers.add_parser("bench", parents=[connection], help="Run the benchmark scenarios.")
+    bench_parser.add_argument(
+        "scenarios",
+        nargs="*",
+        metavar="SCENARIO",
+        help="Scenarios to run, among: %s (default: all)." % ", ".join(benchmark.SCENARIOS),
+    )
+    bench_parser.add_argument("--target", choices=["memory", "bolt"], default="memory", help="Backend to run on.")
+    bench_parser.add_argument("--operations", type=int, default=1000, help="Timed operations (default: 1000).")
+    bench_parser.add_argument("--warmup", type=int, default=100, help="Untimed operations (default: 100).")
+    bench_parser.add_argument(
+        "--allocations",
+        action="store_true",
+        help="Measure the memory allocated by each operation instead of timing it.",
+    )
+    return parser
+
+
+def _connect(opts: argparse.Namespace) -> None:
+    if opts.uri:
+        db.uri = opts.uri
+    if opts.user:
+        db.auth = (opts.user, opts.password or "")
+
+
+def _convert(text: str) -> Any:
+    # Only numbers written back identically are converted: "007" or "1e3" stay strings.
+    for convert in (int, float):
+        try:
+            number = convert(text)
+        except ValueError:
+            continue
+        if repr(number) == text:
+            return number
+    return text
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read rows from a CSV or JSON lines file, one at a time.
+
+    Arguments:
+        path: The file path. Files ending in `.csv` are read as CSV, other files as JSON lines.
+
+    Yields:
+        Dictionaries. Numbers in CSV cells are converted when they read back the same, and empty cells skipped.
+    """
+    with open(path, newline="", encoding="utf-8") as stream:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(stream):
+                yield {key: _convert(value) for key, value in row.items() if value != ""}
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _import(opts: argparse.Namespace) -> int:
+    labels = [NodeLabel(name) for name in opts.labels]
+    start_labels = [NodeLabel(name) for name in opts.start_labels or opts.labels]
+    end_labels = [NodeLabel(name) for name in opts.end_labels or opts.labels]
+    if opts.edges and not opts.type:
+        print("neopy: --type is required to import relationships", file=sys.stderr)  # noqa: WPS421
+        return 1
+
+    def nodes() -> Iterator[Node]:
+        for path in opts.nodes:
+            for row in read_rows(path):
+                yield Node(*labels, **row)
+
+    def edges() -> Iterator[tuple]:
+        relationship_type = RelationshipType(opts.type)
+        for path in opts.edges:
+            for row in read_rows(path):
+                start = Node(*start_labels, **{opts.key: row.pop(opts.start_column)})
+                end = Node(*end_labels, **{opts.key: row.pop(opts.end_column)})
+                yield start, RelationshipTo(relationship_type, **row), end
+
+    report = bulk.load(
+        nodes(),
+        edges(),
+        key=opts.key,
+        batch_size=opts.batch_size,
+        workers=opts.workers,
+        executor=opts.executor,
+    )
+    print("%d items in %.2fs (%.1f items/s)" % (report.items, report.seconds, report.throughput))  # noqa: WPS421
+    return 0
+
+
+def _parameter(text: str) -> tuple:
+    name, _, value = text.partition("=")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def _query(opts: argparse.Namespace) -> int:
+    from . import export  # noqa: WPS433 (only needed for this command)
+
+    # The standard output is written once the query succeeded: it cannot be started over on retries.
+    stream = open(opts.output, "w", newline="", encoding="utf-8") if opts.output else io.StringIO()
+
+    def consumer(records: Iterator) -> int:
+        # Transactions may be retried: start the output over.
+        stream.seek(0)
+        stream.truncate()
+        writer = export.CsvWriter(stream) if opts.format == "csv" else export.JsonlWriter(stream)
+        return export.write_chunks(records, writer, opts.flush_size)
+
+    try:
+        if opts.file:
+            graph = runpy.run_path(opts.file).get("graph")
+            if graph is None:
+                print("neopy: %s does not define a `graph` variable" % opts.file, file=sys.stderr)  # noqa: WPS421
+                return 1
+            graph.stream(consumer)
+        else:
+            parameters = dict(_parameter(text) for text in opts.param)
+            access_mode = db.READ_ACCESS if opts.read else db.WRITE_ACCESS
+            backends.current().stream(None, opts.cypher, parameters, consumer, access_mode=access_mode)
+        if not opts.output:
+            sys.stdout.write(stream.getvalue())
+    finally:
+        stream.close()
+    return 0
+
+
+def _bench(opts: argparse.Namespace) -> int:
+    from . import benchmark  # noqa: WPS433 (only needed for this command)
+
+    unknown = [name for name in opts.scenarios if name not in benchmark.SCENARIOS]
+    if unknown:
+        print("neopy: unknown scenarios: %s" % ", ".join(unknown), file=sys.stderr)  # noqa: WPS421
+        return 1
+    if opts.target == "memory":
+        from .memory import InMemoryBackend  # noqa: WPS433 (only needed for this target)
+
+        backend = InMemoryBackend()
+    else:
+        backend = backends.BoltBackend()
+    with backends.using(backend):
+        for name in opts.scenarios or benchmark.SCENARIOS:
+            if opts.allocations:
+                print(benchmark.measure_allocations(name, opts.operations, opts.warmup).summary())  # noqa: WPS421
+            else:
+                print(benchmark.run_scenario(name, opts.operations, opts.warmup).latency_summary())  # noqa: WPS421
+    return 0
+
+
+COMMANDS = {"import": _import, "query": _query, "bench": _bench}
 
 
 def main(args: Optional[List[str]] = None) -> int:
@@ -39,5 +246,8 @@ def main(args: Optional[List[str]] = None) -> int:
     """
     parser = get_parser()
     opts = parser.parse_args(args=args)
-    print(opts)  # noqa: WPS421 (side-effect in main is fine)
-    return 0
+    if opts.command is None:
+        parser.print_help()
+        return 0
+    _connect(opts)
+    return COMMANDS[opts.command](opts)
@@ -0,0 +1,163 @@
+"""
+Columnar results, in NumPy arrays.
+
+Records are streamed straight into one growable buffer per column,
+instead of being collected as a list of records or dictionaries first.
+Each buffer is typed after the values it receives:
+
+- booleans go to `bool` arrays,
+- integers, and the internal ids of nodes and relationships, go to `int64` arrays,
+- floats, and integers mixed with floats or nulls, go to `float64` arrays (nulls being `NaN`),
+- text and other values go to `object` arrays.
+
+NumPy is an optional dependency: install the `columnar` extra.
+"""
+
+from itertools import chain
+from operator import attrgetter
+
+INITIAL_CAPACITY = 1024
+
+NULL = "null"
+BOOL = "bool"
+INT = "int"
+FLOAT = "float"
+OBJECT = "object"
+
+DTYPES = {NULL: "object", BOOL: "bool", INT: "int64", FLOAT: "float64", OBJECT: "object"}
+
+
+def _numpy():
+    try:
+        import numpy  # noqa: WPS433 (optional dependency)
+    except ImportError:
+        raise ImportError("columnar results require NumPy: install neopy with the 'columnar' extra")
+    return numpy
+
+
+def _is_entity(value):
+    return hasattr(value, "id") and (hasattr(value, "labels") or hasattr(value, "start_node"))
+
+
+def _kind(value):
+    if value is None:
+        return NULL
+    elif isinstance(value, bool):
+        return BOOL
+    elif isinstance(value, int) or _is_entity(value):
+        return INT
+    elif isinstance(value, float):
+        return FLOAT
+    return OBJECT
+
+
+def _combine(kind, other):
+    if kind == other:
+        return kind
+    kinds = {kind, other}
+    if kinds <= {INT, FLOAT, NULL}:
+        return FLOAT
+    return OBJECT
+
+
+class ColumnBuffer:
+    """
+    A growable, typed column.
+
+    Arguments:
+        capacity: The initial number of rows.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.numpy = _numpy()
+        self.kind = NULL
+        self.size = 0
+        self.data = self.numpy.empty(capacity, dtype=object)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value):
+        if _is_entity(value):
+            value = value.id
+        kind = _kind(value) if not self.size else _combine(self.kind, _kind(value))
+        if kind != self.kind:
+            self.promote(kind)
+        if self.size == len(self.data):
+            self.grow()
+        if value is None and self.kind == FLOAT:
+            value = self.numpy.nan
+        try:
+            self.data[self.size] = value
+        except OverflowError:
+            self.promote(OBJECT)
+            self.data[self.size] = value
+        self.size += 1
+
+    def grow(self):
+        data = self.numpy.empty(max(len(self.data) * 2, 1), dtype=self.data.dtype)
+        data[: self.size] = self.data[: self.size]
+        self.data = data
+
+    def promote(self, kind):
+        data = self.numpy.empty(len(self.data), dtype=DTYPES[kind])
+        values = self.data[: self.size]
+        if kind == FLOAT and self.kind == NULL:
+            data[: self.size] = self.numpy.nan
+        elif kind == FLOAT and self.data.dtype == object:
+            data[: self.size] = [self.numpy.nan if value is None else value for value in values]
+        else:
+            data[: self.size] = values.astype(DTYPES[kind])
+        self.data = data
+        self.kind = kind
+
+    def array(self):
+        """
+        Return the filled part of the buffer.
+
+        Returns:
+            A NumPy array.
+        """
+        return self.data[: self.size].copy()
+
+
+def to_columns(records, capacity=INITIAL_CAPACITY):
+    """
+    Fill column buffers from records.
+
+    Arguments:
+        records: An iterable of records.
+        capacity: The initial number of rows of each buffer.
+
+    Returns:
+        A dictionary of NumPy arrays, by record key.
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return {}
+    keys = list(first.keys())
+    buffers = [ColumnBuffer(capacity) for _ in keys]
+    appenders = list(map(attrgetter("append"), buffers))
+    for record in chain([first], records):
+        for append, value in zip(appenders, record.values()):
+            append(value)
+    return {key: buffer.array() for key, buffer in zip(keys, buffers)}
+
+
+def to_numpy(records, capacity=INITIAL_CAPACITY):
+    """
+    Fill a structured array from records.
+
+    Arguments:
+        records: An iterable of records.
+        capacity: The initial number of rows of each column buffer.
+
+    Returns:
+        A NumPy record array, with one field per record key.
+    """
+    numpy = _numpy()
+    columns = to_columns(records, capacity)
+    if not columns:
+        return numpy.rec.array(numpy.empty(0, dtype=[]))
+    return numpy.rec.fromarrays(list(columns.values()), names=list(columns.keys()))
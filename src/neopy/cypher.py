@@ -1,11 +1,111 @@
 import copy
+import datetime
 import random
+import re
 import string
-from collections import Iterable, namedtuple
+from collections import namedtuple
+from collections.abc import Iterable
+from decimal import Decimal
+from itertools import groupby
+from operator import attrgetter
 
 from .exceptions import CypherError
 
-StatementArgs = namedtuple("StatementArgs", "args kwargs")
+Clause = namedtuple("Clause", "kind args kwargs")
+
+MATCH = "MATCH"
+OPTIONAL_MATCH = "OPTIONAL MATCH"
+WHERE = "WHERE"
+CREATE = "CREATE"
+DELETE = "DELETE"
+WITH = "WITH"
+WITH_DISTINCT = "WITH DISTINCT"
+RETURN = "RETURN"
+RETURN_DISTINCT = "RETURN DISTINCT"
+SET = "SET"
+REMOVE = "REMOVE"
+MERGE = "MERGE"
+ORDER_BY = "ORDER BY"
+SKIP = "SKIP"
+LIMIT = "LIMIT"
+CALL_SUBQUERY = "CALL {}"
+CALL = "CALL"
+MODIFIERS = "ORDER BY, SKIP, LIMIT"
+
+RENDERERS = {
+    MATCH: "render_matches",
+    OPTIONAL_MATCH: "render_matches",
+    WHERE: "render_wheres",
+    CREATE: "render_creates",
+    DELETE: "render_deletes",
+    WITH: "render_withs",
+    WITH_DISTINCT: "render_withs",
+    SET: "render_sets",
+    REMOVE: "render_removes",
+    MERGE: "render_merges",
+    CALL_SUBQUERY: "render_subqueries",
+    CALL: "render_calls",
+    RETURN: "render_returns",
+    MODIFIERS: "render_modifiers",
+}
+
+# Conditions binding less strongly than AND (OR, XOR)
+# are wrapped in parentheses when joined in a WHERE clause.
+AND_PRECEDENCE = 3
+
+
+# Values sent as query parameters, in their driver-native types, rather than
+# rendered in the query text, so that the server can use its range and point indexes.
+TEMPORAL_TYPES = (datetime.date, datetime.time, datetime.timedelta)
+
+# Names of the coordinates of points, in order.
+POINT_KEYS = ("x", "y", "z")
+
+
+def is_native(val):
+    """Whether a value is a temporal value, a point or a decimal, or a list containing one."""
+    if isinstance(val, (list, tuple)) and not hasattr(val, "srid"):
+        return any(is_native(v) for v in val)
+    # Points (driver or other) carry a spatial reference id, driver temporal values come from `neo4j.time`.
+    return isinstance(val, TEMPORAL_TYPES + (Decimal,)) or hasattr(val, "srid") or type(val).__module__ == "neo4j.time"
+
+
+def cypher_parameter(val):
+    """
+    Convert a parameter value to a type the driver can send: decimals become floats, in lists and maps too.
+
+    Neo4j has no decimal type: the float is the nearest double, which keeps about 15 significant digits.
+    Store decimals needing more as strings.
+    """
+    if isinstance(val, Decimal):
+        return float(val)
+    elif isinstance(val, list):
+        return [cypher_parameter(v) for v in val]
+    elif isinstance(val, dict):
+        return {k: cypher_parameter(v) for k, v in val.items()}
+    return val
+
+
+def cypher_temporal(val):
+    if hasattr(val, "to_native"):
+        val = val.to_native()
+    if isinstance(val, datetime.datetime):
+        function = "datetime" if val.tzinfo else "localdatetime"
+    elif isinstance(val, datetime.date):
+        function = "date"
+    elif isinstance(val, datetime.time):
+        function = "time" if val.tzinfo else "localtime"
+    elif isinstance(val, datetime.timedelta):
+        return "duration({days: %d, seconds: %d, microseconds: %d})" % (val.days, val.seconds, val.microseconds)
+    else:
+        # A driver duration, which can count months.
+        return "duration({months: %d, days: %d, seconds: %d, nanoseconds: %d})" % (
+            val.months,
+            val.days,
+            val.seconds,
+            val.nanoseconds,
+        )
+    return '%s("%s")' % (function, val.isoformat())
 
 
 def cypher_primitive(val):
@@ -13,6 +113,11 @@ def cypher_primitive(val):
         return '"%s"' % val
     elif val is None:
         return "null"
+    elif hasattr(val, "srid"):
+        coordinates = ", ".join("%s: %r" % (key, float(v)) for key, v in zip(POINT_KEYS, val))
+        return "point({%s, srid: %d})" % (coordinates, val.srid)
+    elif isinstance(val, TEMPORAL_TYPES) or type(val).__module__ == "neo4j.time":
+        return cypher_temporal(val)
     elif isinstance(val, Iterable):
         return "[%s]" % ",".join(cypher_primitive(v) for v in val)
     return str(val)
@@ -22,6 +127,35 @@ def cypher_escape(s):
     return "`%s`" % s
 
 
+def cypher_name(name):
+    return name if name.isidentifier() else cypher_escape(name)
+
+
+def cypher_value(val, parameters=None):
+    """
+    Render a literal value, or register it as a query parameter if it has a driver-native type.
+
+    Arguments:
+        val: The value.
+        parameters: A function registering a value as a query parameter, and returning its reference.
+            Without it, all values are inlined.
+
+    Returns:
+        Cypher text.
+    """
+    if parameters is not None and is_native(val):
+        return parameters(val)
+    return cypher_primitive(val)
+
+
+def cypher_reference(val, parameters=None):
+    if isinstance(val, str):
+        return val
+    elif isinstance(val, Cypher):
+        return val.cypher_id if val.is_pattern else val.render(parameters)
+    return cypher_primitive(val)
+
+
 class Properties(dict):
     def __getattr__(self, item):
         return self[item]
@@ -32,20 +166,27 @@ class Properties(dict):
     def __deepcopy__(self, memo):
         return Properties(copy.deepcopy(dict(self)))
 
-    def as_cypher(self):
+    def as_cypher(self, parameters=None):
         if not self:
             return ""
-        return " {" + ", ".join("{k}: {v}".format(k=k, v=cypher_primitive(v)) for k, v in self.items()) + "}"
+        return " {" + ", ".join("{k}: {v}".format(k=k, v=cypher_value(v, parameters)) for k, v in self.items()) + "}"
 
 
 class Cypher:
     cypher_template = ""
 
+    # Patterns (nodes, relationships, paths) are referenced by their cypher ID
+    # outside of MATCH and CREATE clauses, other components by their full cypher.
+    is_pattern = False
+
     def __str__(self):
         return self.as_cypher()
 
-    def as_cypher(self, keys=None):
-        params = self.cypher_params
+    def render(self, parameters=None):
+        return self.as_cypher(parameters=parameters)
+
+    def as_cypher(self, keys=None, parameters=None):
+        params = self.render_params(parameters)
         if keys:
             return self.cypher_template.format(**{k: v if k in keys else "" for k, v in params.items()})
         return self.cypher_template.format(**params)
@@ -54,17 +195,61 @@ class Cypher:
     def cypher_params(self):
         raise NotImplementedError
 
+    def render_params(self, parameters=None):
+        return self.cypher_params
+
 
 class QueryStatements:
+    """The clauses of a query, in the order they were added."""
+
     def __init__(self):
-        self.matches = []
-        self.wheres = []
-        self.creates = []
-        self.deletes = []
-        self.returns = []
-        self.sets = []
-        self.removes = []
-        self.merges = []
+        self.clauses = []
+
+    def add(self, kind, *args, **kwargs):
+        self.clauses.append(Clause(kind, args, kwargs))
+
+    def of_kind(self, *kinds):
+        return [clause for clause in self.clauses if clause.kind in kinds]
+
+    @property
+    def matches(self):
+        return self.of_kind(MATCH, OPTIONAL_MATCH)
+
+    @property
+    def wheres(self):
+        return self.of_kind(WHERE)
+
+    @property
+    def creates(self):
+        return self.of_kind(CREATE)
+
+    @property
+    def deletes(self):
+        return self.of_kind(DELETE)
+
+    @property
+    def returns(self):
+        return self.of_kind(RETURN, RETURN_DISTINCT)
+
+    @property
+    def sets(self):
+        return self.of_kind(SET)
+
+    @property
+    def removes(self):
+        return self.of_kind(REMOVE)
+
+    @property
+    def merges(self):
+        return self.of_kind(MERGE)
+
+    @property
+    def subqueries(self):
+        return [clause.args[0] for clause in self.of_kind(CALL_SUBQUERY)]
+
+    @property
+    def calls(self):
+        return self.of_kind(CALL)
 
 
 class Query:
@@ -79,130 +264,395 @@ class Query:
         # their cypher IDs only in further statements.
         self.created_ids = set()
 
+        # Values sent along with the rendered query,
+        # referenced in it as $name.
+        self.parameters = {}
+
+        # Literal values of the expressions, collected at render time.
+        self.render_parameters = {}
+
+        # The rendered text and literal values, kept by `prepare()`
+        # until a clause is added.
+        self.prepared = None
+
+        # Whether returned expressions are rendered with their column name as alias (see `compile`).
+        self.aliased = False
+
     def __str__(self):
         return self.render()
 
+    def is_read_only(self):
+        statements = self.statements
+        if statements.creates or statements.merges or statements.sets or statements.deletes or statements.removes:
+            return False
+        if not all(call.kwargs["read_only"] for call in statements.calls):
+            return False
+        return all(subquery.is_read_only() for subquery in statements.subqueries)
+
+    def labels(self):
+        labels = set()
+        statements = self.statements
+        for statement in statements.matches + statements.creates + statements.merges + statements.deletes:
+            for arg in self.expand_paths(statement.args):
+                if hasattr(arg, "labels"):
+                    if arg.labels:
+                        labels.update(label.name for label in arg.labels)
+                    else:
+                        labels.add("*")
+        for subquery in statements.subqueries:
+            labels.update(subquery.labels())
+        if statements.calls:
+            # Procedures may read or write nodes of any label.
+            labels.add("*")
+        return labels
+
+    @staticmethod
+    def expand_paths(args):
+        for arg in args:
+            yield arg
+            yield from getattr(arg, "components", ())
+
+    def add(self, kind, *args, **kwargs):
+        self.statements.add(kind, *args, **kwargs)
+        self.prepared = None
+
+    def add_parameter(self, value, name="param"):
+        key = name
+        index = 0
+        while key in self.parameters:
+            index += 1
+            key = "%s%d" % (name, index)
+        self.parameters[key] = cypher_parameter(value)
+        return "$" + key
+
+    def parametrize(self, value):
+        # Literal names skip the names of bound parameters.
+        index = len(self.render_parameters)
+        name = "p%d" % index
+        while name in self.render_parameters or name in self.parameters:
+            index += 1
+            name = "p%d" % index
+        self.render_parameters[name] = cypher_parameter(value)
+        return "$" + name
+
+    def rename_parameter(self, name, new_name):
+        """
+        Rename a bound parameter, and its references in the clauses given as text.
+
+        References inside `Raw` expressions are not renamed.
+
+        Arguments:
+            name: The current name.
+            new_name: The new name.
+        """
+        self.parameters[new_name] = self.parameters.pop(name)
+        pattern = re.compile(r"\$%s\b" % re.escape(name))
+
+        def rename(value):
+            return pattern.sub("$" + new_name, value) if isinstance(value, str) else value
+
+        for index, clause in enumerate(self.statements.clauses):
+            if clause.kind == CALL_SUBQUERY:
+                if name in clause.args[0].parameters:
+                    clause.args[0].rename_parameter(name, new_name)
+                continue
+            args = tuple(rename(arg) for arg in clause.args)
+            kwargs = {key: rename(value) for key, value in clause.kwargs.items()}
+            self.statements.clauses[index] = Clause(clause.kind, args, kwargs)
+        self.prepared = None
+
     def add_match(self, *args, **kwargs):
-        self.statements.matches.append(StatementArgs(args, kwargs))
+        self.add(MATCH, *args, **kwargs)
+
+    def add_optional_match(self, *args, **kwargs):
+        self.add(OPTIONAL_MATCH, *args, **kwargs)
 
-    def add_where(self, *args, **kwargs):
-        self.statements.wheres.append(StatementArgs(args, kwargs))
+    def add_where(self, *args):
+        self.add(WHERE, *args)
 
     def add_create(self, *args, **kwargs):
-        self.statements.creates.append(StatementArgs(args, kwargs))
+        self.add(CREATE, *args, **kwargs)
 
     def add_delete(self, *args, **kwargs):
-        self.statements.deletes.append(StatementArgs(args, kwargs))
+        self.add(DELETE, *args, **kwargs)
+
+    def add_with(self, *args, **kwargs):
+        self.add(WITH, *args, **kwargs)
+
+    def add_with_distinct(self, *args, **kwargs):
+        self.add(WITH_DISTINCT, *args, **kwargs)
 
     def add_return(self, *args, **kwargs):
-        self.statements.returns.append(StatementArgs(args, kwargs))
+        self.add(RETURN, *args, **kwargs)
+
+    def add_return_distinct(self, *args, **kwargs):
+        self.add(RETURN_DISTINCT, *args, **kwargs)
 
     def add_set(self, *args, **kwargs):
-        self.statements.sets.append(StatementArgs(args, kwargs))
+        self.add(SET, *args, **kwargs)
 
     def add_remove(self, *args, **kwargs):
-        self.statements.removes.append(StatementArgs(args, kwargs))
+        self.add(REMOVE, *args, **kwargs)
 
     def add_merge(self, *args, **kwargs):
-        self.statements.merges.append(StatementArgs(args, kwargs))
+        self.add(MERGE, *args, **kwargs)
+
+    def add_order_by(self, *args, **kwargs):
+        self.add(ORDER_BY, *args, **kwargs)
+
+    def add_skip(self, count):
+        if isinstance(count, int):
+            count = self.add_parameter(count, "skip")
+        self.add(SKIP, count)
+
+    def add_limit(self, count):
+        if isinstance(count, int):
+            count = self.add_parameter(count, "limit")
+        self.add(LIMIT, count)
+
+    def add_call(self, procedure, *arguments, yields=(), read_only=False):
+        if isinstance(yields, dict):
+            yields = [(field, alias) for alias, field in yields.items()]
+        else:
+            yields = [(field, field) for field in yields]
+        self.add(CALL, procedure, *arguments, yields=yields, read_only=read_only)
+
+    def add_subquery(self, subquery):
+        subquery = copy.deepcopy(subquery)
+        # Parameters of the subquery sharing a name with other values are renamed, not overwritten.
+        for name, value in list(subquery.parameters.items()):
+            if name in self.parameters and self.parameters[name] != value:
+                index = 1
+                while "%s%d" % (name, index) in self.parameters or "%s%d" % (name, index) in subquery.parameters:
+                    index += 1
+                subquery.rename_parameter(name, "%s%d" % (name, index))
+        self.parameters.update(subquery.parameters)
+        self.add(CALL_SUBQUERY, subquery)
+
+    def columns(self):
+        """
+        Return the names of the columns of the records, as named by the server.
+
+        Returns:
+            A list of names, or `None` when they are not known in advance (`RETURN *`, literals)
+            or cannot be aliased (quoted names).
+        """
+
+        def unnamed(value):
+            raise CypherError("literals have no column name")
+
+        names = []
+        try:
+            for projection in self.statements.returns:
+                names.extend(cypher_reference(arg, unnamed) for arg in projection.args)
+                names.extend(projection.kwargs)
+        except CypherError:
+            return None
+        return None if any(name == "*" or "`" in name for name in names) else names
+
+    def compile(self, aliased=False):
+        """
+        Render the query, and merge its bound and literal parameters.
+
+        Arguments:
+            aliased: Whether to alias returned expressions with their column names, as
+                `RETURN p.name AS `p.name``, like a subquery must. The records are unchanged.
+
+        Returns:
+            The text of the query, and its parameters.
+        """
+        if aliased:
+            self.aliased = True
+            try:
+                text, render_parameters = self.render(), self.render_parameters
+            finally:
+                self.aliased = False
+        elif self.prepared is None:
+            text, render_parameters = self.render(), self.render_parameters
+        else:
+            text, render_parameters = self.prepared
+        parameters = dict(self.parameters)
+        conflicts = sorted(set(parameters) & set(render_parameters))
+        if conflicts:
+            raise CypherError("parameters bound and used for literals: %s" % ", ".join(conflicts))
+        parameters.update(render_parameters)
+        return text, parameters
+
+    def prepare(self):
+        """Render the query once: `compile()` then only merges the current parameter values."""
+        self.prepared = (self.render(), self.render_parameters)
+
+    def rebind(self, **values):
+        """
+        Change the values of existing named parameters, in place, keeping the prepared text.
+
+        Arguments:
+            **values: New values, by parameter name.
+
+        Raises:
+            CypherError: When a name is not a named parameter of the query.
+        """
+        unknown = sorted(set(values) - set(self.parameters))
+        if unknown:
+            raise CypherError("unknown query parameters: %s" % ", ".join(unknown))
+        self.parameters.update((name, cypher_parameter(value)) for name, value in values.items())
 
     def render(self):
-        statements = []
-
-        if self.statements.matches:
-            statements.append(self.render_matches())
-        if self.statements.wheres:
-            statements.append(self.render_wheres())
-        if self.statements.creates:
-            statements.append(self.render_creates())
-        if self.statements.deletes:
-            statements.append(self.render_deletes())
-        if self.statements.returns:
-            statements.append(self.render_returns())
-        if self.statements.sets:
-            statements.append(self.render_sets())
-        if self.statements.removes:
-            statements.append(self.render_removes())
-        if self.statements.merges:
-            statements.append(self.render_merges())
-
-        return " ".join(statements) + ";"
-
-    def render_matches(self):
+        self.render_parameters = {}
+        return self.render_body() + ";"
+
+    def steps(self):
+        # Clauses are processed in the order they were added, consecutive clauses
+        # of the same kind together (WHERE conditions are joined with AND for example).
+        # RETURN must be the last clause: all RETURN clauses, and the ORDER BY,
+        # SKIP and LIMIT clauses that do not follow a WITH clause, come at the end.
+        steps = []
+        returns = []
+        return_modifiers = []
+        last_projection = None
+        for kind, clauses in groupby(self.statements.clauses, attrgetter("kind")):
+            clauses = list(clauses)
+            if kind in {RETURN, RETURN_DISTINCT}:
+                returns.extend(clauses)
+                last_projection = RETURN
+            elif kind in {ORDER_BY, SKIP, LIMIT}:
+                if last_projection == WITH:
+                    steps.append((MODIFIERS, clauses))
+                else:
+                    return_modifiers.extend(clauses)
+            else:
+                steps.append((kind, clauses))
+                if kind in {WITH, WITH_DISTINCT}:
+                    last_projection = WITH
+        if returns:
+            steps.append((RETURN, returns))
+        if return_modifiers:
+            steps.append((MODIFIERS, return_modifiers))
+        return steps
+
+    def render_body(self):
+        self.created_ids = set()
+        return " ".join(getattr(self, RENDERERS[kind])(clauses) for kind, clauses in self.steps())
+
+    def render_matches(self, clauses):
         cyphers = []
-        for match in self.statements.matches:
+        for match in clauses:
             cypher_matches = []
             for arg in match.args:
-                cypher_matches.append(arg.as_cypher())
+                cypher_matches.append(arg.as_cypher(parameters=self.parametrize))
+            for arg in self.expand_paths(match.args):
                 if hasattr(arg, "cypher_id") and arg.cypher_id:
                     self.matched_ids.add(arg.cypher_id)
-            cyphers.append("MATCH " + "".join(cypher_matches))
+            cyphers.append(match.kind + " " + "".join(cypher_matches))
         return " ".join(cyphers)
 
-    def render_wheres(self):
-        cyphers = []
-        for where in self.statements.wheres:
-            cypher_wheres = []
-            if where.args:
-                cypher_wheres.extend([a.as_cypher() for a in where.args])
-            if where.kwargs:
-                for p_key, p_value in where.kwargs.items():
-                    splits = p_key.split("__")
-                    if len(splits) == 1:
-                        raise CypherError
-                    elif len(splits) == 2:
-                        cypher_id, p_key = splits
-                        if isinstance(p_value, Cypher):
-                            p_value = p_value.as_cypher()
-                        else:
-                            p_value = cypher_primitive(p_value)
-                        cypher_wheres.append("{}.{} = {}".format(cypher_id, p_key, p_value))
-                    elif len(splits) == 3:
-                        cypher_id, p_key, operator = splits
-                        pass  # TODO
-                    else:
-                        raise CypherError
-            cyphers.append("WHERE " + ", ".join(cypher_wheres))
-        return " ".join(cyphers)
+    def render_wheres(self, clauses):
+        cypher_wheres = []
+        for where in clauses:
+            for arg in where.args:
+                if isinstance(arg, str):
+                    cypher_wheres.append(arg)
+                elif getattr(arg, "precedence", 0) < AND_PRECEDENCE:
+                    cypher_wheres.append("(%s)" % arg.render(self.parametrize))
+                else:
+                    cypher_wheres.append(arg.render(self.parametrize))
+        return "WHERE " + " AND ".join(cypher_wheres)
 
-    def render_creates(self):
+    def render_creates(self, clauses):
         cyphers = []
-        for create in self.statements.creates:
+        for create in clauses:
             cypher_creates = []
             for arg in create.args:
                 if hasattr(arg, "cypher_id") and arg.cypher_id:
                     if arg.cypher_id in self.matched_ids | self.created_ids:
                         cypher_creates.append(arg.as_cypher(keys=["id"]))
                     else:
-                        cypher_creates.append(arg.as_cypher())
+                        cypher_creates.append(arg.as_cypher(parameters=self.parametrize))
                         self.created_ids.add(arg.cypher_id)
                 else:
-                    cypher_creates.append(arg.as_cypher())
+                    cypher_creates.append(arg.as_cypher(parameters=self.parametrize))
             cyphers.append("CREATE " + "".join(cypher_creates))
         return " ".join(cyphers)
 
-    def render_deletes(self):
+    def render_deletes(self, clauses):
         pass
 
-    def render_returns(self):
+    def render_projections(self, clauses, aliased=False):
+        cypher_projections = []
+        for projection in clauses:
+            for arg in projection.args:
+                cypher = cypher_reference(arg, self.parametrize)
+                if aliased and not cypher.isidentifier():
+                    cypher = "{} AS {}".format(cypher, cypher_escape(cypher))
+                cypher_projections.append(cypher)
+            for alias, arg in projection.kwargs.items():
+                cypher_projections.append(
+                    "{} AS {}".format(cypher_reference(arg, self.parametrize), cypher_name(alias))
+                )
+        return ", ".join(cypher_projections)
+
+    def render_withs(self, clauses):
+        keyword = WITH_DISTINCT if any(clause.kind == WITH_DISTINCT for clause in clauses) else WITH
+        return keyword + " " + self.render_projections(clauses)
+
+    def render_returns(self, clauses):
+        keyword = RETURN_DISTINCT if any(clause.kind == RETURN_DISTINCT for clause in clauses) else RETURN
+        return keyword + " " + self.render_projections(clauses, self.aliased)
+
+    def render_modifiers(self, clauses):
+        cyphers = []
+        orders = [clause for clause in clauses if clause.kind == ORDER_BY]
+        if orders:
+            cyphers.append(self.render_orders(orders))
+        for kind in (SKIP, LIMIT):
+            counts = [clause.args[0] for clause in clauses if clause.kind == kind]
+            if counts:
+                cyphers.append("%s %s" % (kind, counts[-1]))
+        return " ".join(cyphers)
+
+    def render_orders(self, clauses):
+        cypher_orders = []
+        for order in clauses:
+            direction = " DESC" if order.kwargs.get("descending") else ""
+            for arg in order.args:
+                cypher_orders.append(cypher_reference(arg, self.parametrize) + direction)
+        return "ORDER BY " + ", ".join(cypher_orders)
+
+    def render_subqueries(self, clauses):
+        cyphers = []
+        for clause in clauses:
+            subquery = clause.args[0]
+            # Share the parameters, so that names stay unique in the whole statement.
+            subquery.render_parameters = self.render_parameters
+            cyphers.append("CALL { %s }" % subquery.render_body())
+        return " ".join(cyphers)
+
+    def render_calls(self, clauses):
         cyphers = []
-        for return_ in self.statements.returns:
-            cypher_returns = []
-            for arg in return_.args:
-                if isinstance(arg, Cypher) and hasattr(arg, "cypher_id"):
-                    cypher_returns.append(arg.cypher_id)
-                elif isinstance(arg, str):
-                    cypher_returns.append(arg)
-            cyphers.append("RETURN " + ", ".join(cypher_returns))
+        for call in clauses:
+            procedure, *arguments = call.args
+            # Arguments are values, sent as parameters, unless they are expressions or patterns.
+            cypher_arguments = [
+                cypher_reference(arg, self.parametrize) if isinstance(arg, Cypher) else self.parametrize(arg)
+                for arg in arguments
+            ]
+            cypher = "CALL %s(%s)" % (procedure, ", ".join(cypher_arguments))
+            yields = call.kwargs["yields"]
+            if yields:
+                cypher += " YIELD " + ", ".join(
+                    field if field == alias else "%s AS %s" % (field, cypher_name(alias)) for field, alias in yields
+                )
+                self.matched_ids.update(alias for _, alias in yields)
+            cyphers.append(cypher)
         return " ".join(cyphers)
 
-    def render_sets(self):
+    def render_sets(self, clauses):
         pass
 
-    def render_removes(self):
+    def render_removes(self, clauses):
         pass
 
-    def render_merges(self):
+    def render_merges(self, clauses):
         pass
 
     def get_unused_id(self):
@@ -1,4 +1,164 @@
-from neo4j.v1 import GraphDatabase
+"""
+Connection to the Neo4j server.
 
-uri = "bolt://localhost:7687"
-driver = GraphDatabase.driver(uri)
+The driver is imported and created on first use only, so that building
+and rendering queries works without the `neo4j` package installed,
+and without a reachable server.
+"""
+
+import json
+import time
+
+from .exceptions import AlreadyCommitted
+from .retry import RetryPolicy
+
+# Same values as neo4j.READ_ACCESS and neo4j.WRITE_ACCESS.
+READ_ACCESS = "READ"
+WRITE_ACCESS = "WRITE"
+
+uri = "neo4j://localhost:7687"
+auth = None
+driver = None
+retry_policy = RetryPolicy()
+
+
+def get_driver():
+    """
+    Return the driver, creating it from `uri` and `auth` on first use.
+
+    Returns:
+        A Neo4j driver.
+    """
+    global driver  # noqa: WPS420 (created once, on first use)
+    if driver is None:
+        from neo4j import GraphDatabase
+
+        driver = GraphDatabase.driver(uri, auth=auth)
+    return driver
+
+
+class Session:
+    """
+    A logical session, carrying bookmarks from one transaction to the next.
+
+    Each transaction run with this session waits for the previous ones
+    to be visible on the server it is routed to, so reads that follow
+    writes are causally consistent even when served by a follower.
+
+    Arguments:
+        bookmarks: Initial bookmarks, for example from another session.
+    """
+
+    def __init__(self, bookmarks=()):
+        self.bookmarks = list(bookmarks)
+
+
+# The smallest transaction timeout, in seconds, when a retry deadline is almost reached.
+MIN_TIMEOUT = 0.001
+
+# How long idempotency markers are kept, in seconds: past this delay, a replay writes again.
+marker_ttl = 24 * 3600.0
+
+MARKER_CHECK = "MATCH (m:NeopyMarker {key: $key}) WHERE m.expiresAt > timestamp() RETURN m.outcome AS outcome"
+# Merged: an expired marker of the key may not have been purged yet.
+MARKER_CREATE = (
+    "MERGE (m:NeopyMarker {key: $key}) "
+    "SET m.committedAt = timestamp(), m.expiresAt = timestamp() + $ttl, m.outcome = $outcome"
+)
+MARKER_CONSTRAINT = "CREATE CONSTRAINT neopy_marker_key IF NOT EXISTS FOR (m:NeopyMarker) REQUIRE m.key IS UNIQUE"
+MARKER_PURGE = "MATCH (m:NeopyMarker) WHERE coalesce(m.expiresAt, 0) <= timestamp() DELETE m RETURN count(m)"
+
+
+def _encode_outcome(result):
+    from . import replay  # noqa: WPS433 (replay depends on this module)
+
+    return json.dumps(replay.encode(result), separators=(",", ":"))
+
+
+def _decode_outcome(outcome):
+    from . import replay  # noqa: WPS433 (replay depends on this module)
+
+    return replay.decode(json.loads(outcome))
+
+
+def run_transaction(work, policy=None, idempotency_key=None, access_mode=WRITE_ACCESS, session=None):
+    """
+    Run a transaction function, retrying it on transient errors.
+
+    When an idempotency key is given, a marker node carrying this key and the
+    result of the work is created in the same transaction as the work. Any later
+    call with the key, a retry after a commit that reached the server (a connection
+    reset during commit for example) or a new call, finds the marker and returns
+    the stored result instead of writing twice. Records are returned as
+    `neopy.memory` records. Markers are looked up by key: create their uniqueness
+    constraint once with `create_marker_constraint()`. They expire after
+    `marker_ttl` seconds: delete them with `purge_markers()`.
+
+    When the retry policy has a deadline, the time left is the timeout of each
+    transaction, so that a single attempt cannot run past it.
+
+    Arguments:
+        work: A function accepting a transaction. It must consume its results.
+        policy: The retry policy (defaults to `neopy.db.retry_policy`).
+        idempotency_key: A key unique to this logical write.
+        access_mode: `READ_ACCESS` to route the transaction to a reader, or `WRITE_ACCESS`.
+        session: A logical `Session` whose bookmarks are used, then updated.
+
+    Raises:
+        AlreadyCommitted: When a marker of the key has no stored result.
+
+    Returns:
+        The return value of the transaction function.
+    """
+    policy = policy or retry_policy
+    deadline = None if policy.deadline is None else time.monotonic() + policy.deadline
+
+    def attempt():
+        bookmarks = session.bookmarks if session else None
+        config = {}
+        if deadline is not None:
+            config["timeout"] = max(deadline - time.monotonic(), MIN_TIMEOUT)
+        with get_driver().session(default_access_mode=access_mode, bookmarks=bookmarks) as driver_session:
+            with driver_session.begin_transaction(**config) as tx:
+                markers = []
+                if idempotency_key is not None:
+                    markers = list(tx.run(MARKER_CHECK, key=idempotency_key))
+                if markers:
+                    if markers[0]["outcome"] is None:
+                        raise AlreadyCommitted(idempotency_key)
+                    result = _decode_outcome(markers[0]["outcome"])
+                else:
+                    result = work(tx)
+                    if idempotency_key is not None:
+                        outcome = _encode_outcome(result)
+                        ttl = int(marker_ttl * 1000)
+                        tx.run(MARKER_CREATE, key=idempotency_key, ttl=ttl, outcome=outcome).consume()
+            bookmark = driver_session.last_bookmark()
+            if session is not None and bookmark is not None:
+                session.bookmarks = [bookmark]
+            return result
+
+    return policy.call(attempt)
+
+
+def create_marker_constraint(policy=None):
+    """
+    Create the uniqueness constraint of idempotency markers, which also indexes their keys.
+
+    Arguments:
+        policy: The retry policy (defaults to `neopy.db.retry_policy`).
+    """
+    run_transaction(lambda tx: tx.run(MARKER_CONSTRAINT).consume(), policy=policy)
+
+
+def purge_markers(policy=None):
+    """
+    Delete the expired idempotency markers.
+
+    Arguments:
+        policy: The retry policy (defaults to `neopy.db.retry_policy`).
+
+    Returns:
+        The number of deleted markers.
+    """
+    return run_transaction(lambda tx: tx.run(MARKER_PURGE).single()[0], policy=policy)
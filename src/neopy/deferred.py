@@ -0,0 +1,286 @@
+"""
+Deferred, batched writes for `Node.create()` and `Node.connect()`.
+
+Code creating nodes one at a time sends one query per node. With
+deferred writes enabled, these calls only register the writes, and
+return their nodes and relationships right away, as placeholders. The
+pending writes are sent together, as a single statement (with one
+`UNWIND` subquery per label set and relationship type) run by the
+current backend:
+
+- when `max_size` writes are pending,
+- `max_delay` seconds after the first pending write, from a timer thread,
+- when the `internal_id` of a placeholder is read,
+- when `flush()` or `disable()` is called, or the `deferred_writes()` block exits.
+
+```python
+with deferred.deferred_writes(max_size=500):
+    for name in names:
+        you.connect(RelationshipTo(RelationshipType("friend")), Node(NodeLabel("Person"), name=name))
+```
+
+Calls given execution options (a retry policy, a session...) are not deferred.
+When a flush from the timer thread fails, its error is raised by the next
+`create()`, `connect()`, `flush()` or `disable()` call.
+The statement is only rendered, not built as a `Query`: backends
+interpreting queries, like the `InMemoryBackend`, cannot run it.
+"""
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from . import backends, cache
+from .cypher import cypher_escape, cypher_parameter
+from .exceptions import CypherError
+
+_current = None
+
+# The existing nodes connected by the pending writes: no row at all if one of them was deleted.
+MATCH_EXISTING = (
+    "CALL { UNWIND $existing AS i MATCH (n) WHERE id(n) = i RETURN collect(n) AS existing } "
+    "WITH existing WHERE size(existing) = size($existing)"
+)
+CREATE_NODES = "CALL {{ UNWIND ${name} AS row CREATE (n{labels}) SET n = row RETURN collect(n) AS {name} }}"
+CREATE_RELATIONSHIPS = (
+    "CALL {{ WITH nodes UNWIND ${name} AS row WITH nodes[row.start] AS a, nodes[row.end] AS b, row "
+    "CREATE (a)-[r:{type}]->(b) SET r = row.properties RETURN collect(id(r)) AS {name} }}"
+)
+
+
+class PendingWrite:
+    """The internal id of a node or relationship, once its deferred write is flushed."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.internal_id = None
+        self.error = None
+        self.done = False
+
+    def __deepcopy__(self, memo):
+        # Copies of a placeholder (in cloned graphs) share its pending write.
+        return self
+
+    def resolve(self, internal_id):
+        self.internal_id = internal_id
+        self.done = True
+
+    def fail(self, error):
+        self.error = error
+        self.done = True
+
+    def result(self):
+        if not self.done:
+            self.buffer.flush()
+        if self.error is not None:
+            raise self.error
+        return self.internal_id
+
+
+def _labels(node):
+    return "".join(":" + cypher_escape(name) for name in sorted(label.name for label in node.labels))
+
+
+def _written(creates, connects):
+    nodes = [node for node, _ in creates] + [node for start, _, end, _ in connects for node in (start, end)]
+    labels = set()
+    for node in nodes:
+        if node.labels:
+            labels.update(label.name for label in node.labels)
+        else:
+            labels.add(cache.WILDCARD)
+    return labels
+
+
+class WriteBuffer:
+    """
+    Pending node and relationship creations.
+
+    Arguments:
+        max_size: The number of pending writes that triggers a flush.
+        max_delay: The age of the first pending write, in seconds, that triggers a flush.
+        policy: The retry policy of the flush transaction (defaults to `neopy.db.retry_policy`).
+    """
+
+    def __init__(self, max_size=1000, max_delay=1.0, policy=None):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.policy = policy
+        self.creates = []
+        self.connects = []
+        self.timer = None
+        self.error = None
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.creates) + len(self.connects)
+
+    def create(self, node):
+        with self.lock:
+            self._raise_error()
+            pending = PendingWrite(self)
+            node.defer(pending)
+            self.creates.append((node, pending))
+            self._registered()
+        return node
+
+    def connect(self, start, relationship, end):
+        if len(relationship.types) != 1:
+            raise CypherError("a created relationship needs exactly one type")
+        with self.lock:
+            self._raise_error()
+            for node in (start, end):
+                if not node.is_created:
+                    self.create(node)
+            pending = PendingWrite(self)
+            relationship.defer(pending)
+            self.connects.append((start, relationship, end, pending))
+            self._registered()
+        return relationship
+
+    def flush(self):
+        """Send the pending writes, in one transaction."""
+        with self.lock:
+            self._raise_error()
+            creates, connects = self.creates, self.connects
+            self.creates, self.connects = [], []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not creates and not connects:
+                return
+            pendings = [pending for _, pending in creates] + [pending for *_, pending in connects]
+            statement, parameters, groups = self._statement(creates, connects)
+            try:
+                records = backends.current().run(None, statement, parameters, policy=self.policy)
+                if not records:
+                    raise CypherError("a node connected by a deferred write no longer exists")
+            except Exception as error:
+                for pending in pendings:
+                    pending.fail(error)
+                raise
+            for name, group in groups.items():
+                for pending, internal_id in zip(group, records[0][name]):
+                    pending.resolve(internal_id)
+            cache.invalidate(_written(creates, connects))
+
+    def _registered(self):
+        if len(self) >= self.max_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = threading.Timer(self.max_delay, self._expired)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _expired(self):
+        with self.lock:
+            try:
+                self.flush()
+            except Exception as error:
+                # Nobody is there to catch it in the timer thread: raise it from the next call instead.
+                self.error = error
+
+    def _raise_error(self):
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def _statement(self, creates, connects):
+        # Relationships refer to their nodes by index in a list of the existing nodes they connect,
+        # followed by the created nodes.
+        created = {pending for _, pending in creates}
+        existing = {}
+        for start, _, end, _ in connects:
+            for node in (start, end):
+                if node.pending not in created:
+                    existing.setdefault(node.internal_id, len(existing))
+        clauses, parameters, groups = [], {}, {}
+        if existing:
+            clauses.append(MATCH_EXISTING)
+            parameters["existing"] = list(existing)
+        node_groups = defaultdict(list)
+        for node, pending in creates:
+            node_groups[_labels(node)].append((node, pending))
+        positions = {}
+        for labels, group in node_groups.items():
+            name = "n%d" % len(groups)
+            for _, pending in group:
+                positions[pending] = len(existing) + len(positions)
+            clauses.append(CREATE_NODES.format(name=name, labels=labels))
+            parameters[name] = [cypher_parameter(dict(node.properties)) for node, _ in group]
+            groups[name] = [pending for _, pending in group]
+        returns = ["[n IN {name} | id(n)] AS {name}".format(name=name) for name in groups]
+        if connects:
+            nodes = " + ".join(["existing"] * bool(existing) + list(groups))
+            clauses.append("WITH " + ", ".join(["%s AS nodes" % nodes, *groups]))
+
+        def position(node):
+            return positions[node.pending] if node.pending in created else existing[node.internal_id]
+
+        relationship_groups = defaultdict(list)
+        for start, relationship, end, pending in connects:
+            properties = cypher_parameter(dict(relationship.properties))
+            row = {"start": position(start), "end": position(end), "properties": properties}
+            relationship_groups[next(iter(relationship.types)).name].append((pending, row))
+        for index, (type_name, group) in enumerate(relationship_groups.items()):
+            name = "r%d" % index
+            clauses.append(CREATE_RELATIONSHIPS.format(name=name, type=cypher_escape(type_name)))
+            parameters[name] = [row for _, row in group]
+            groups[name] = [pending for pending, _ in group]
+            returns.append(name)
+        clauses.append("RETURN " + ", ".join(returns))
+        return " ".join(clauses), parameters, groups
+
+
+def enable(max_size=1000, max_delay=1.0, policy=None):
+    """
+    Defer the writes of `Node.create()` and `Node.connect()`.
+
+    Arguments:
+        max_size: The number of pending writes that triggers a flush.
+        max_delay: The age of the first pending write, in seconds, that triggers a flush.
+        policy: The retry policy of flush transactions.
+
+    Returns:
+        The `WriteBuffer`.
+    """
+    global _current  # noqa: WPS420 (module-level switch)
+    _current = WriteBuffer(max_size, max_delay, policy)
+    return _current
+
+
+def disable():
+    """Flush the pending writes, and write immediately again."""
+    global _current  # noqa: WPS420 (module-level switch)
+    buffer, _current = _current, None
+    if buffer is not None:
+        buffer.flush()
+
+
+def current():
+    return _current
+
+
+def flush():
+    if _current is not None:
+        _current.flush()
+
+
+@contextmanager
+def deferred_writes(max_size=1000, max_delay=1.0, policy=None):
+    """
+    Defer writes in a `with` block, flushing them when it exits.
+
+    Arguments:
+        max_size: The number of pending writes that triggers a flush.
+        max_delay: The age of the first pending write, in seconds, that triggers a flush.
+        policy: The retry policy of flush transactions.
+
+    Yields:
+        The `WriteBuffer`.
+    """
+    buffer = enable(max_size, max_delay, policy)
+    try:
+        yield buffer
+    finally:
+        disable()
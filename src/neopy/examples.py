@@ -1,11 +1,13 @@
 from unittest import TestCase
 
+from .functions import fn
 from .graph import Graph
 from .graph import Node as N
 from .graph import NodeLabel as L
 from .graph import Relationship as Rel
 from .graph import RelationshipTo as RelTo
 from .graph import RelationshipType as T
+from .graph import ShortestPath as Sp
 
 graph = Graph()
 
@@ -17,12 +19,8 @@ class Person(N):
 
 
 def get_result(query):
-    records = query.run()
-    records_list = list(records)
-    first_record = records_list[0]
-    first_record_values = first_record.values()
-    return first_record_values
-    # return list(query.run())[0].values()
+    # Only the first record is read from the result.
+    return query.stream(lambda records: next(records).values())
 
 
 def example1():
@@ -160,20 +158,17 @@ def example7():
     # WHERE user.Id = 1234
     # RETURN user, count(friend) AS NumberOfFriends
 
-    def Count(v):
-        return v
-
     query = (
         graph.optional_match(N("user", L("User")), Rel(T("friends_with")), N("friend", L("User")))
         .where(user__id=1234)
-        .return_("user", number_of_friends=Count("friend"))
+        .return_("user", number_of_friends=fn.Count("friend"))
     )
 
     user_label = L("User")
     user = N("user", user_label)
     friend = N("friend", user_label)
     rel = Rel(T("friends_with"))
-    n_of_f = Count(friend)
+    n_of_f = fn.Count(friend)
 
     query = graph.optional_match(user, rel, friend).where(user__id=1234).return_(user, n_of_f)
 
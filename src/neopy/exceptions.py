@@ -4,3 +4,19 @@ class CypherError(Exception):
 
 class CypherIdAlreadyUsed(CypherError):
     pass
+
+
+class AlreadyCommitted(Exception):
+    pass
+
+
+class ReplayMiss(Exception):
+    pass
+
+
+class QueryPlanError(CypherError):
+    pass
+
+
+class QueryPlanWarning(UserWarning):
+    pass
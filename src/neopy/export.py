@@ -0,0 +1,316 @@
+"""
+Streaming export of query results to files.
+
+Records are read from the open result as the server sends them, and
+written in chunks of `flush_size` rows: memory use stays flat whatever
+the size of the result. Exports can be split across several files of
+at most `max_records` records each.
+
+```python
+report = export.export(graph, "people-{index}.jsonl.gz", max_records=1_000_000)
+```
+
+Formats are JSON lines and CSV (optionally gzipped), and Parquet
+(one row group per chunk), which requires PyArrow. The Parquet schema
+can be passed, otherwise it is inferred: chunks are held back, up to
+`BUFFERED_CHUNKS`, while a column has only nulls, and integer columns
+mixed with floats are widened to floats.
+
+Values are written as plain data: nodes and relationships as maps of
+their properties, paths as maps of their node and relationship lists,
+and temporal values as ISO-8601 strings.
+"""
+
+import csv
+import datetime
+import gzip
+import json
+import os
+import re
+from itertools import chain
+
+from .cypher import TEMPORAL_TYPES
+
+DEFAULT_FLUSH_SIZE = 10000
+BUFFERED_CHUNKS = 10
+
+SUFFIXES = {".jsonl": "jsonl", ".json": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".parquet": "parquet"}
+
+
+def _open_text(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _iso_duration(value):
+    seconds = "{0:.6f}".format(value.seconds + value.microseconds / 1e6).rstrip("0").rstrip(".")
+    return "P{days}DT{seconds}S".format(days=value.days, seconds=seconds)
+
+
+def serialize(value):
+    """
+    Convert a record value to plain data, for export files.
+
+    Arguments:
+        value: A record value.
+
+    Returns:
+        JSON-compatible data. Nodes and relationships become maps of their properties,
+        paths maps of their `nodes` and `relationships`, and temporal values ISO-8601 strings.
+    """
+    if hasattr(value, "iso_format"):
+        # Driver temporal values.
+        return value.iso_format()
+    elif isinstance(value, datetime.timedelta):
+        return _iso_duration(value)
+    elif isinstance(value, TEMPORAL_TYPES):
+        return value.isoformat()
+    elif isinstance(value, (list, tuple)):
+        return [serialize(item) for item in value]
+    elif isinstance(value, dict):
+        return {key: serialize(item) for key, item in value.items()}
+    elif hasattr(value, "relationships") and hasattr(value, "nodes"):
+        return {"nodes": serialize(list(value.nodes)), "relationships": serialize(list(value.relationships))}
+    elif hasattr(value, "items") and (hasattr(value, "labels") or hasattr(value, "start_node")):
+        return serialize(dict(value.items()))
+    elif value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def guess_format(path):
+    """
+    Guess the format of a file from its name.
+
+    Arguments:
+        path: The file path.
+
+    Raises:
+        ValueError: When the suffix is unknown.
+
+    Returns:
+        `"jsonl"`, `"csv"` or `"parquet"`.
+    """
+    name = re.sub(r"\.gz$", "", str(path))
+    for suffix, file_format in SUFFIXES.items():
+        if name.endswith(suffix):
+            return file_format
+    raise ValueError("cannot guess the export format of %s" % path)
+
+
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, keys, rows):
+        self.stream.write("".join(json.dumps(dict(zip(keys, row))) + "\n" for row in rows))
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.writer(stream)
+        self.header = False
+
+    def write(self, keys, rows):
+        if not self.header:
+            self.writer.writerow(keys)
+            self.header = True
+        self.writer.writerows(
+            [value if isinstance(value, (str, int, float)) else json.dumps(value) for value in row] for row in rows
+        )
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, schema=None):
+        try:
+            import pyarrow  # noqa: WPS433 (optional dependency)
+            import pyarrow.parquet  # noqa: WPS433,WPS301
+        except ImportError:
+            raise ImportError("Parquet export requires PyArrow")
+        self.pyarrow = pyarrow
+        self.path = path
+        self.schema = schema
+        self.tables = []
+        self.writer = None
+
+    def write(self, keys, rows):
+        columns = {key: [row[index] for row in rows] for index, key in enumerate(keys)}
+        # Nested values (entities, lists, maps) are stored as JSON text.
+        for key, values in columns.items():
+            if any(isinstance(value, (dict, list)) for value in values):
+                columns[key] = [None if value is None else json.dumps(value) for value in values]
+        table = self.pyarrow.table(columns)
+        if self.writer is not None:
+            self._write(table)
+            return
+        self.tables.append(table)
+        if self.schema is None:
+            schema = self._infer()
+            if any(self.pyarrow.types.is_null(field.type) for field in schema):
+                if len(self.tables) < BUFFERED_CHUNKS:
+                    return
+                # Still no values: the type of these columns is anyone's guess, text can hold them all.
+                text = self.pyarrow.string()
+                schema = self.pyarrow.schema(
+                    [field.with_type(text) if self.pyarrow.types.is_null(field.type) else field for field in schema]
+                )
+            self.schema = schema
+        self._open()
+
+    def close(self):
+        if self.writer is None and self.tables:
+            self.schema = self.schema or self._infer()
+            self._open()
+        if self.writer is not None:
+            self.writer.close()
+
+    def _infer(self):
+        schemas = [table.schema for table in self.tables]
+        try:
+            return self.pyarrow.unify_schemas(schemas, promote_options="permissive")
+        except (ValueError, TypeError, NotImplementedError) as error:
+            raise ValueError("cannot infer a Parquet schema from %s, pass a schema" % schemas) from error
+
+    def _open(self):
+        self.writer = self.pyarrow.parquet.ParquetWriter(self.path, self.schema)
+        tables, self.tables = self.tables, []
+        for table in tables:
+            self._write(table)
+
+    def _write(self, table):
+        try:
+            table = table.cast(self.schema)
+        except (ValueError, TypeError, NotImplementedError) as error:
+            message = "cannot write %s as Parquet schema %s, pass a schema" % (table.schema, self.schema)
+            raise ValueError(message) from error
+        self.writer.write_table(table)
+
+
+def open_writer(path, file_format, schema=None):
+    if file_format == "parquet":
+        return ParquetWriter(path, schema)
+    writer_class = CsvWriter if file_format == "csv" else JsonlWriter
+    return writer_class(_open_text(path))
+
+
+def write_chunks(records, writer, flush_size=DEFAULT_FLUSH_SIZE, limit=None):
+    """
+    Write records to a writer, a chunk at a time.
+
+    Arguments:
+        records: An iterator of records.
+        writer: A writer, like `JsonlWriter`.
+        flush_size: The number of records in each chunk.
+        limit: The maximum number of records to write.
+
+    Returns:
+        The number of records written.
+    """
+    count = 0
+    keys = None
+    chunk = []
+    for record in records:
+        if keys is None:
+            keys = list(record.keys())
+        chunk.append([serialize(value) for value in record.values()])
+        count += 1
+        if len(chunk) == flush_size:
+            writer.write(keys, chunk)
+            chunk = []
+        if count == limit:
+            break
+    if chunk:
+        writer.write(keys, chunk)
+    return count
+
+
+class ExportReport:
+    def __init__(self, paths, records):
+        self.paths = paths
+        self.records = records
+
+
+class Exporter:
+    """
+    A consumer of records writing them to files (see `Graph.stream()`).
+
+    Arguments:
+        path: The file path. When splitting, it can contain an `{index}` placeholder,
+            otherwise the index is inserted before the suffix.
+        file_format: `"jsonl"`, `"csv"` or `"parquet"` (defaults to guessing from the path).
+        flush_size: The number of records written at once.
+        max_records: The maximum number of records per file (defaults to a single file).
+        schema: The PyArrow schema of Parquet files (defaults to inferring it from the records).
+    """
+
+    def __init__(self, path, file_format=None, flush_size=DEFAULT_FLUSH_SIZE, max_records=None, schema=None):
+        self.path = str(path)
+        self.file_format = file_format or guess_format(path)
+        self.flush_size = flush_size
+        self.max_records = max_records
+        self.schema = schema
+
+    def file_path(self, index):
+        if self.max_records is None:
+            return self.path
+        if "{index" in self.path:
+            return self.path.format(index=index)
+        directory, name = os.path.split(self.path)
+        stem, dot, suffix = name.partition(".")
+        name = "{stem}-{index:05d}{dot}{suffix}".format(stem=stem, index=index, dot=dot, suffix=suffix)
+        return os.path.join(directory, name)
+
+    def __call__(self, records):
+        # Files are opened for writing on each call: a retried query starts the export over.
+        records = iter(records)
+        paths = []
+        total = 0
+        while True:
+            first = next(records, None)
+            if first is None and paths:
+                break
+            path = self.file_path(len(paths))
+            writer = open_writer(path, self.file_format, self.schema)
+            try:
+                remaining = chain([first], records) if first is not None else iter(())
+                count = write_chunks(remaining, writer, self.flush_size, self.max_records)
+            finally:
+                writer.close()
+            paths.append(path)
+            total += count
+            if first is None or self.max_records is None:
+                break
+        return ExportReport(paths, total)
+
+
+def export(
+    graph, path, file_format=None, flush_size=DEFAULT_FLUSH_SIZE, max_records=None, backend=None, schema=None, **options
+):
+    """
+    Stream the records of a query to files.
+
+    Arguments:
+        graph: The query.
+        path: The file path (see `Exporter`).
+        file_format: `"jsonl"`, `"csv"` or `"parquet"` (defaults to guessing from the path).
+        flush_size: The number of records written at once.
+        max_records: The maximum number of records per file (defaults to a single file).
+        backend: The backend running the query (defaults to the current one).
+        schema: The PyArrow schema of Parquet files (defaults to inferring it from the records).
+        **options: Options passed to `Graph.stream()`.
+
+    Returns:
+        An `ExportReport`, with the written paths and the number of records.
+    """
+    exporter = Exporter(path, file_format, flush_size, max_records, schema)
+    return graph.stream(exporter, backend=backend, **options)
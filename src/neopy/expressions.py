@@ -0,0 +1,402 @@
+"""
+Immutable expression trees, rendered to parameterized Cypher.
+
+Expressions are built with Python operators:
+
+```python
+person = Node("p", NodeLabel("Person"))
+adult = (person.prop.age >= 18) & (person.prop.name != "Anna")
+```
+
+Literal values are not inlined: they become query parameters when the
+expression is rendered in a query. An expression is compiled once to a
+template with placeholders for its literals. The template is its shape:
+expressions differing only by their literal values share it.
+Expressions are hashable, and can be used in cache keys.
+
+Note that `==` builds a comparison instead of testing equality: use
+the `key` property to compare two expressions.
+"""
+
+from .cypher import Cypher, cypher_name, cypher_primitive
+from .exceptions import CypherError
+
+# Binding strength of operators: operands binding less strongly
+# than their operator are wrapped in parentheses.
+PRECEDENCE = {
+    "OR": 1,
+    "XOR": 2,
+    "AND": 3,
+    "NOT": 4,
+    "=": 5,
+    "<>": 5,
+    "<": 5,
+    "<=": 5,
+    ">": 5,
+    ">=": 5,
+    "=~": 5,
+    "IN": 5,
+    "CONTAINS": 5,
+    "STARTS WITH": 5,
+    "ENDS WITH": 5,
+    "IS NULL": 5,
+    "IS NOT NULL": 5,
+    "+": 6,
+    "-": 6,
+    "*": 7,
+    "/": 7,
+    "%": 7,
+    "^": 8,
+    "NEG": 9,
+}
+ATOM = 10
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    elif isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def operand(value):
+    """
+    Convert a value to an expression, as an operand: other values are literals.
+
+    Arguments:
+        value: An expression, a node, relationship or path, or a literal value.
+
+    Returns:
+        An expression.
+    """
+    if isinstance(value, Expression):
+        return value
+    elif isinstance(value, Cypher):
+        if value.is_pattern:
+            return Variable(value.cypher_id)
+        return Raw(value.as_cypher())
+    return Literal(value)
+
+
+def reference(value):
+    """
+    Convert a value to an expression, as a function argument: strings are references.
+
+    Arguments:
+        value: A string, an expression, a node, relationship or path, or a literal value.
+
+    Returns:
+        An expression.
+    """
+    if isinstance(value, str):
+        return Raw(value)
+    return operand(value)
+
+
+class Expression(Cypher):
+    precedence = ATOM
+
+    def __setattr__(self, name, value):
+        raise AttributeError("expressions are immutable")
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, self.render())
+
+    def __eq__(self, other):
+        return Comparison("=", self, other)
+
+    def __ne__(self, other):
+        return Comparison("<>", self, other)
+
+    def __lt__(self, other):
+        return Comparison("<", self, other)
+
+    def __le__(self, other):
+        return Comparison("<=", self, other)
+
+    def __gt__(self, other):
+        return Comparison(">", self, other)
+
+    def __ge__(self, other):
+        return Comparison(">=", self, other)
+
+    def __add__(self, other):
+        return BinaryOperation("+", self, other)
+
+    def __radd__(self, other):
+        return BinaryOperation("+", other, self)
+
+    def __sub__(self, other):
+        return BinaryOperation("-", self, other)
+
+    def __rsub__(self, other):
+        return BinaryOperation("-", other, self)
+
+    def __mul__(self, other):
+        return BinaryOperation("*", self, other)
+
+    def __rmul__(self, other):
+        return BinaryOperation("*", other, self)
+
+    def __truediv__(self, other):
+        return BinaryOperation("/", self, other)
+
+    def __rtruediv__(self, other):
+        return BinaryOperation("/", other, self)
+
+    def __mod__(self, other):
+        return BinaryOperation("%", self, other)
+
+    def __pow__(self, other):
+        return BinaryOperation("^", self, other)
+
+    def __neg__(self):
+        return UnaryOperation("NEG", self)
+
+    def __and__(self, other):
+        return BinaryOperation("AND", self, other)
+
+    def __or__(self, other):
+        return BinaryOperation("OR", self, other)
+
+    def __xor__(self, other):
+        return BinaryOperation("XOR", self, other)
+
+    def __invert__(self):
+        return UnaryOperation("NOT", self)
+
+    def in_(self, values):
+        return Comparison("IN", self, values)
+
+    def contains(self, value):
+        return Comparison("CONTAINS", self, value)
+
+    def starts_with(self, value):
+        return Comparison("STARTS WITH", self, value)
+
+    def ends_with(self, value):
+        return Comparison("ENDS WITH", self, value)
+
+    def matches(self, pattern):
+        return Comparison("=~", self, pattern)
+
+    def is_null(self):
+        return UnaryOperation("IS NULL", self)
+
+    def is_not_null(self):
+        return UnaryOperation("IS NOT NULL", self)
+
+    @property
+    def key(self):
+        template, values = self.compile()
+        return template, _freeze(values)
+
+    @property
+    def shape(self):
+        return self.compile()[0]
+
+    @property
+    def cypher_params(self):
+        return {}
+
+    def compile(self):
+        """
+        Compile the expression once.
+
+        Returns:
+            A template with positional placeholders for literal values, and these values.
+        """
+        compiled = self.__dict__.get("_compiled")
+        if compiled is None:
+            values = []
+            compiled = (self.compile_into(values), tuple(values))
+            object.__setattr__(self, "_compiled", compiled)
+        return compiled
+
+    def compile_into(self, values):
+        raise NotImplementedError
+
+    def compile_operand(self, child, values, right=False):
+        template = child.compile_into(values)
+        if child.precedence < self.precedence or (right and child.precedence == self.precedence):
+            return "(%s)" % template
+        return template
+
+    def render(self, parameters=None):
+        """
+        Render the expression.
+
+        Arguments:
+            parameters: A function registering a literal value as a query parameter, and returning its reference.
+                Without it, literal values are inlined.
+
+        Returns:
+            Cypher text.
+        """
+        template, values = self.compile()
+        convert = cypher_primitive if parameters is None else parameters
+        return template.format(*[convert(value) for value in values])
+
+    def as_cypher(self, keys=None, parameters=None):
+        return self.render(parameters)
+
+
+class Literal(Expression):
+    def __init__(self, value):
+        object.__setattr__(self, "value", value)
+
+    def compile_into(self, values):
+        values.append(self.value)
+        return "{%d}" % (len(values) - 1)
+
+
+class Raw(Expression):
+    def __init__(self, text):
+        object.__setattr__(self, "text", text)
+
+    def compile_into(self, values):
+        return _escape(self.text)
+
+
+class Variable(Raw):
+    def __init__(self, name):
+        if not name:
+            raise CypherError("cannot reference a component without cypher ID")
+        super().__init__(cypher_name(name))
+
+
+class Property(Expression):
+    def __init__(self, owner, name):
+        object.__setattr__(self, "owner", reference(owner))
+        object.__setattr__(self, "name", name)
+
+    def compile_into(self, values):
+        return "%s.%s" % (self.compile_operand(self.owner, values), _escape(cypher_name(self.name)))
+
+
+class Projection(Expression):
+    def __init__(self, owner, *names, **computed):
+        object.__setattr__(self, "owner", reference(owner))
+        object.__setattr__(self, "names", names)
+        object.__setattr__(self, "computed", tuple((key, reference(value)) for key, value in computed.items()))
+
+    def compile_into(self, values):
+        keys = [".%s" % cypher_name(name) for name in self.names]
+        keys.extend("%s: %s" % (cypher_name(key), value.compile_into(values)) for key, value in self.computed)
+        return "%s{{%s}}" % (self.owner.compile_into(values), ", ".join(keys))
+
+
+class FunctionCall(Expression):
+    def __init__(self, name, *arguments, distinct=False):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "arguments", tuple(reference(argument) for argument in arguments))
+        object.__setattr__(self, "distinct", distinct)
+
+    def compile_into(self, values):
+        arguments = ", ".join(argument.compile_into(values) for argument in self.arguments)
+        return "%s(%s%s)" % (self.name, "DISTINCT " if self.distinct else "", arguments)
+
+
+class BinaryOperation(Expression):
+    def __init__(self, operator, left, right):
+        object.__setattr__(self, "operator", operator)
+        object.__setattr__(self, "left", operand(left))
+        object.__setattr__(self, "right", operand(right))
+        object.__setattr__(self, "precedence", PRECEDENCE[operator])
+
+    def compile_into(self, values):
+        left = self.compile_operand(self.left, values)
+        right = self.compile_operand(self.right, values, right=True)
+        return "%s %s %s" % (left, self.operator, right)
+
+
+class Comparison(BinaryOperation):
+    def __bool__(self):
+        # Let dictionaries and sets compare expressions used as keys.
+        if self.operator == "=":
+            return self.left.key == self.right.key
+        elif self.operator == "<>":
+            return self.left.key != self.right.key
+        raise TypeError("a Cypher comparison has no truth value")
+
+
+class UnaryOperation(Expression):
+    def __init__(self, operator, operand_):
+        object.__setattr__(self, "operator", operator)
+        object.__setattr__(self, "operand", operand(operand_))
+        object.__setattr__(self, "precedence", PRECEDENCE[operator])
+
+    def compile_into(self, values):
+        template = self.compile_operand(self.operand, values)
+        if self.operator == "NEG":
+            return "-" + template
+        elif self.operator == "NOT":
+            return "NOT " + template
+        return "%s %s" % (template, self.operator)
+
+
+class PropertyAccessor:
+    """Build properties of a component as attributes: `node.prop.name`, or items: `node.prop["first name"]`."""
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Property(self._owner, name)
+
+    def __getitem__(self, name):
+        return Property(self._owner, name)
+
+
+LOOKUPS = {
+    "eq": lambda left, right: left == right,
+    "ne": lambda left, right: left != right,
+    "lt": lambda left, right: left < right,
+    "lte": lambda left, right: left <= right,
+    "gt": lambda left, right: left > right,
+    "gte": lambda left, right: left >= right,
+    "in": lambda left, right: left.in_(right),
+    "contains": lambda left, right: left.contains(right),
+    "startswith": lambda left, right: left.starts_with(right),
+    "endswith": lambda left, right: left.ends_with(right),
+    "isnull": lambda left, right: left.is_null() if right else left.is_not_null(),
+}
+
+
+def lookup(key, value):
+    """
+    Build a condition from a keyword lookup, like `user__age__gte=18`.
+
+    Arguments:
+        key: A cypher ID, a property name, and optionally an operator, separated by double underscores.
+        value: The value compared to the property.
+
+    Raises:
+        CypherError: When the lookup is malformed or its operator unknown.
+
+    Returns:
+        A condition expression.
+    """
+    splits = key.split("__")
+    if len(splits) == 2:
+        splits.append("eq")
+    if len(splits) != 3 or splits[2] not in LOOKUPS:
+        raise CypherError("invalid lookup: %s" % key)
+    cypher_id, name, operator = splits
+    return LOOKUPS[operator](Property(Variable(cypher_id), name), value)
@@ -1,20 +1,53 @@
-from .cypher import Cypher
+from .expressions import FunctionCall, Projection, Property
+
+__all__ = ["Function", "FunctionCall", "Projection", "Property", "fn"]
 
 
 class Function:
-    class Id(Cypher):
-        cypher_template = "id({id})"
+    @staticmethod
+    def call(name, *arguments, distinct=False):
+        return FunctionCall(name, *arguments, distinct=distinct)
 
+    class Id(FunctionCall):
         def __init__(self, cypher_id):
-            self.cypher_id = cypher_id
-
-        @property
-        def cypher_params(self):
-            return dict(id=self.cypher_id)
+            super().__init__("id", cypher_id)
 
         def eq(self, value):
-            self.cypher_template += " = {}".format(value)
-            return self
+            return self == value
+
+    class Distance(FunctionCall):
+        def __init__(self, start, end):
+            super().__init__("point.distance", start, end)
+
+    class Aggregate(FunctionCall):
+        function_name = ""
+
+        def __init__(self, value, distinct=False):
+            super().__init__(self.function_name, value, distinct=distinct)
+
+    class Count(Aggregate):
+        function_name = "count"
+
+        def __init__(self, value="*", distinct=False):
+            super().__init__(value, distinct)
+
+    class Sum(Aggregate):
+        function_name = "sum"
+
+    class Avg(Aggregate):
+        function_name = "avg"
+
+    class Min(Aggregate):
+        function_name = "min"
+
+    class Max(Aggregate):
+        function_name = "max"
+
+    class Collect(Aggregate):
+        function_name = "collect"
+
+    class StDev(Aggregate):
+        function_name = "stDev"
 
 
 fn = Function()
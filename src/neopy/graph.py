@@ -1,8 +1,7 @@
-from neo4j.v1 import types
-
-from .cypher import Cypher, Properties, Query
-from .db import driver
+from . import backends, cache, columnar, db, deferred
+from .cypher import Cypher, Properties, Query, cypher_parameter
 from .exceptions import CypherError, CypherIdAlreadyUsed
+from .expressions import PropertyAccessor, lookup
 from .functions import fn
 from .utils import clone, split_id_args
 
@@ -11,16 +10,50 @@ class Graph:
     def __init__(self):
         self.query = Query()
 
-    def run(self):
-        with driver.session() as session:
-            with session.begin_transaction() as tx:
-                return tx.run(self.query.render())
+    def run(self, backend=None, **options):
+        statement, parameters = self.query.compile()
+        read_only = self.query.is_read_only()
+        query_cache = cache.current()
+        if query_cache is not None and read_only:
+            records = query_cache.get(statement, parameters)
+            if records is not None:
+                return records
+        records = (backend or backends.current()).run(
+            self.query,
+            statement,
+            parameters,
+            access_mode=db.READ_ACCESS if read_only else db.WRITE_ACCESS,
+            **options,
+        )
+        if query_cache is not None:
+            if read_only:
+                query_cache.set(statement, records, self.query.labels(), parameters)
+            else:
+                query_cache.invalidate(self.query.labels())
+        return records
+
+    def stream(self, consumer, backend=None, **options):
+        statement, parameters = self.query.compile()
+        access_mode = db.READ_ACCESS if self.query.is_read_only() else db.WRITE_ACCESS
+        backend = backend or backends.current()
+        return backend.stream(self.query, statement, parameters, consumer, access_mode=access_mode, **options)
+
+    def to_columns(self, backend=None, **options):
+        return self.stream(columnar.to_columns, backend=backend, **options)
+
+    def to_numpy(self, backend=None, **options):
+        return self.stream(columnar.to_numpy, backend=backend, **options)
 
     @clone
     def match(self, *args, **kwargs):
         self.query.add_match(*args, **kwargs)
         return self
 
+    @clone
+    def optional_match(self, *args, **kwargs):
+        self.query.add_optional_match(*args, **kwargs)
+        return self
+
     def match_id(self, node):
         if node.cypher_id:
             if node.cypher_id in self.query.matched_ids:
@@ -32,9 +65,15 @@ class Graph:
         self_clone.query.matched_ids.add(node_cypher_id)
         return self_clone
 
+    def shortest_path(self, cypher_id, *components):
+        return self.match(ShortestPath(cypher_id, *components))
+
+    def all_shortest_paths(self, cypher_id, *components):
+        return self.match(AllShortestPaths(cypher_id, *components))
+
     @clone
-    def where(self, *conditions, **properties):
-        self.query.add_where(*conditions, **properties)
+    def where(self, *conditions, **lookups):
+        self.query.add_where(*conditions, *(lookup(key, value) for key, value in lookups.items()))
         return self
 
     @clone
@@ -42,11 +81,66 @@ class Graph:
         self.query.add_create(*args, **kwargs)
         return self
 
+    @clone
+    def with_(self, *args, **kwargs):
+        self.query.add_with(*args, **kwargs)
+        return self
+
+    @clone
+    def with_distinct(self, *args, **kwargs):
+        self.query.add_with_distinct(*args, **kwargs)
+        return self
+
+    @clone
+    def call(self, procedure, *arguments, yields=(), read_only=False):
+        self.query.add_call(procedure, *arguments, yields=yields, read_only=read_only)
+        return self
+
+    @clone
+    def call_subquery(self, graph):
+        self.query.add_subquery(graph.query)
+        return self
+
     @clone
     def return_(self, *args, **kwargs):
         self.query.add_return(*args, **kwargs)
         return self
 
+    @clone
+    def return_distinct(self, *args, **kwargs):
+        self.query.add_return_distinct(*args, **kwargs)
+        return self
+
+    @clone
+    def order_by(self, *args, descending=False):
+        self.query.add_order_by(*args, descending=descending)
+        return self
+
+    @clone
+    def skip(self, count):
+        self.query.add_skip(count)
+        return self
+
+    @clone
+    def limit(self, count):
+        self.query.add_limit(count)
+        return self
+
+    @clone
+    def bind(self, **parameters):
+        self.query.parameters.update((name, cypher_parameter(value)) for name, value in parameters.items())
+        return self
+
+    @clone
+    def prepare(self):
+        self.query.prepare()
+        return self
+
+    def rebind(self, **parameters):
+        # In place, unlike builder methods: rebinding a prepared query for each request must not copy it.
+        self.query.rebind(**parameters)
+        return self
+
     @clone
     def delete(self, *args, **kwargs):
         self.query.add_delete(*args, **kwargs)
@@ -73,8 +167,36 @@ class NodeLabel:
         self.name = name
 
 
-class Node(Cypher):
+class Entity(Cypher):
+    """A node or relationship, whose internal id may be pending a deferred write."""
+
+    pending = None
+    _internal_id = None
+
+    @property
+    def internal_id(self):
+        if self.pending is not None:
+            self._internal_id = self.pending.result()
+            self.pending = None
+        return self._internal_id
+
+    @internal_id.setter
+    def internal_id(self, value):
+        self._internal_id = value
+        self.pending = None
+
+    @property
+    def is_created(self):
+        return self.pending is not None or self._internal_id is not None
+
+    def defer(self, pending):
+        self.pending = pending
+
+
+class Node(Entity):
     cypher_template = "({id}{labels}{properties})"
+    is_pattern = True
+    identity_map = None
 
     def __init__(self, *args, **properties):
         self.internal_id = None
@@ -84,39 +206,70 @@ class Node(Cypher):
 
     @property
     def cypher_params(self):
+        return self.render_params()
+
+    def render_params(self, parameters=None):
         return {
             "id": self.cypher_id if self.cypher_id else "",
             "labels": ":" + ":".join(l.name for l in self.labels) if self.labels else "",
-            "properties": self.properties.as_cypher(),
+            "properties": self.properties.as_cypher(parameters),
         }
 
-    def create(self):
-        records = list(Graph().create(self).return_(self).run())
+    @property
+    def prop(self):
+        return PropertyAccessor(self)
+
+    def create(self, **options):
+        buffer = deferred.current()
+        if buffer is not None and not options:
+            return buffer.create(self)
+        if self.cypher_id is None:
+            self.cypher_id = Query().get_unused_id()
+        records = Graph().create(self).return_(self).run(**options)
         created = records[0].value(self.cypher_id)
         self.internal_id = created.id
         return self
 
-    def connect(self, relationship, node):
-        if not self.internal_id:
-            raise CypherError
+    def connect(self, relationship, node, **options):
+        buffer = deferred.current()
+        if buffer is not None and not options:
+            if not self.is_created:
+                raise CypherError("cannot connect a node that was not created")
+            relationship.start_node = self
+            relationship.end_node = node
+            if isinstance(relationship, RelationshipFrom):
+                return buffer.connect(node, relationship, self)
+            return buffer.connect(self, relationship, node)
+        if self.internal_id is None:
+            raise CypherError("cannot connect a node that was not created")
+        for component in (self, relationship, node):
+            if component.cypher_id is None:
+                component.cypher_id = Query().get_unused_id()
         graph = Graph().match_id(self)
-        if relationship.cypher_id is None:
-            relationship.cypher_id = graph.query.get_unused_id()
-        returns = [relationship]
         if node.internal_id is not None:
             graph = graph.match_id(node)
-        else:
-            returns.append(node)
-        graph = graph.create(self, relationship, node).return_(*returns)
-        for record in graph.run():
-            if isinstance(record, types.Relationship):
-                relationship.internal_id = record.id
-                relationship.start_node = self
-                relationship.end_node = node
-            elif isinstance(record, types.Node):
-                node.internal_id = record.id
+        graph = graph.create(self, relationship, node).return_(relationship, node)
+        record = graph.run(**options)[0]
+        relationship.internal_id = record.value(relationship.cypher_id).id
+        relationship.start_node = self
+        relationship.end_node = node
+        node.internal_id = record.value(node.cypher_id).id
         return relationship
 
+    def neighbours(self, rel_type=None, direction="both"):
+        return [neighbour for _, neighbour in self.neighbourhood(rel_type, direction)]
+
+    def relationships(self, rel_type=None, direction="both"):
+        return [relationship for relationship, _ in self.neighbourhood(rel_type, direction)]
+
+    def neighbourhood(self, rel_type=None, direction="both"):
+        from .traversal import IdentityMap  # noqa: WPS433 (traversal builds its queries with this module)
+
+        if self.internal_id is None:
+            raise CypherError("cannot traverse from a node that was not created")
+        identity_map = self.identity_map or IdentityMap()
+        return identity_map.neighbourhood(self, rel_type, direction)
+
     def delete(self, *args, **kwargs):
         print("delete node", *(str(a) for a in args), kwargs)
         return self
@@ -139,21 +292,33 @@ class RelationshipType:
         self.name = name
 
 
-class Relationship(Cypher):
+class Relationship(Entity):
     cypher_template = "-[{id}{types}{length}{properties}]-"
+    is_pattern = True
 
     class LengthRange:
         def __init__(self, min_length, max_length):
             self.min = min_length
             self.max = max_length
 
+        @property
+        def bounded(self):
+            return self.max is not None
+
         def as_cypher(self):
-            return "*{min}..{max}".format(min=self.min or "", max=self.max or "")
+            return "*{min}..{max}".format(
+                min="" if self.min is None else self.min,
+                max="" if self.max is None else self.max,
+            )
 
     class ExactLength:
         def __init__(self, length):
             self.length = length
 
+        @property
+        def bounded(self):
+            return self.length not in (None, "*")
+
         def as_cypher(self):
             if self.length in (None, "*"):
                 return "*"
@@ -167,23 +332,36 @@ class Relationship(Cypher):
         self.cypher_id, args = split_id_args(*args)
         self.types = set(args)
         self.properties = Properties(**properties)
-        self.length = Relationship.ExactLength(1)
+        self.path_length = Relationship.ExactLength(1)
 
-    def length(self, length):
-        self.length = Relationship.ExactLength(length)
-        return self
+    def length(self, length, unbounded=False):
+        return self._expand(Relationship.ExactLength(length), unbounded)
 
-    def range(self, min_length, max_length):
-        self.length = Relationship.LengthRange(min_length, max_length)
+    def range(self, min_length, max_length, unbounded=False):
+        return self._expand(Relationship.LengthRange(min_length, max_length), unbounded)
+
+    @property
+    def prop(self):
+        return PropertyAccessor(self)
+
+    def _expand(self, path_length, unbounded):
+        # Unbounded expansions can exhaust the server memory:
+        # they must be asked for explicitly.
+        if not (path_length.bounded or unbounded):
+            raise CypherError("variable-length relationship without upper bound (pass unbounded=True to allow it)")
+        self.path_length = path_length
         return self
 
     @property
     def cypher_params(self):
+        return self.render_params()
+
+    def render_params(self, parameters=None):
         return {
             "id": self.cypher_id if self.cypher_id else "",
             "types": ":" + "|".join(t.name for t in self.types) if self.types else "",
-            "length": self.length.as_cypher(),
-            "properties": self.properties.as_cypher(),
+            "length": self.path_length.as_cypher(),
+            "properties": self.properties.as_cypher(parameters),
         }
 
     def delete(self, *args, **kwargs):
@@ -209,3 +387,29 @@ class RelationshipTo(Relationship):
 
 class RelationshipFrom(Relationship):
     cypher_template = "<-[{id}{types}{length}{properties}]-"
+
+
+class Path(Cypher):
+    cypher_template = "{id}{pattern}"
+    is_pattern = True
+
+    def __init__(self, *args):
+        self.cypher_id, self.components = split_id_args(*args)
+
+    @property
+    def cypher_params(self):
+        return self.render_params()
+
+    def render_params(self, parameters=None):
+        return {
+            "id": self.cypher_id + " = " if self.cypher_id else "",
+            "pattern": "".join(component.as_cypher(parameters=parameters) for component in self.components),
+        }
+
+
+class ShortestPath(Path):
+    cypher_template = "{id}shortestPath({pattern})"
+
+
+class AllShortestPaths(Path):
+    cypher_template = "{id}allShortestPaths({pattern})"
@@ -0,0 +1,915 @@
+"""
+In-memory execution backend.
+
+`InMemoryBackend` executes queries built with `Graph` over Python structures:
+adjacency lists, and label and property indexes. It needs no server,
+making test suites fast, and gives a stand-in to measure the client-side
+overhead of neopy alone.
+
+The supported subset is:
+
+- `MATCH` and `OPTIONAL MATCH` of node and relationship patterns: labels,
+  property maps, relationship types and directions, variable lengths,
+  named paths, shortest paths;
+- `WHERE` conditions built as expressions, or simple comparisons as strings;
+- `CREATE` of nodes and relationships;
+- `WITH` and `RETURN` projections, with aliases, `DISTINCT` and aggregates;
+- `ORDER BY`, `SKIP` and `LIMIT`;
+- `CALL … YIELD` of the full-text and vector index procedures, over indexes
+  declared with `MemoryStore.create_fulltext_index()` and `create_vector_index()`.
+
+Other clauses raise `NotImplementedError`.
+"""
+
+import math
+import operator
+import re
+import threading
+from collections import defaultdict
+from functools import cmp_to_key
+from itertools import count
+
+from .backends import Backend
+from .cypher import (
+    CALL,
+    CREATE,
+    MATCH,
+    LIMIT,
+    MODIFIERS,
+    OPTIONAL_MATCH,
+    ORDER_BY,
+    RETURN,
+    RETURN_DISTINCT,
+    SKIP,
+    WHERE,
+    WITH,
+    WITH_DISTINCT,
+    Cypher,
+)
+from .exceptions import CypherError
+from .expressions import BinaryOperation, FunctionCall, Literal, Projection, Property, Raw, UnaryOperation, reference
+from .graph import AllShortestPaths, Path, Relationship, RelationshipFrom, RelationshipTo, ShortestPath
+
+AGGREGATES = {"count", "sum", "avg", "min", "max", "collect"}
+
+IDENTIFIER = re.compile(r"^[A-Za-z_]\w*$")
+PROPERTY = re.compile(r"^([A-Za-z_]\w*)\.([A-Za-z_]\w*)$")
+FUNCTION = re.compile(r"^([A-Za-z_]\w*)\(([A-Za-z_]\w*)\)$")
+COMPARISON = re.compile(r"^(.+?)\s*(<>|<=|>=|=|<|>)\s*(.+)$")
+ALIAS = re.compile(r"^(.+?)\s+AS\s+([A-Za-z_]\w*)$", re.IGNORECASE)
+NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+STRING = re.compile(r"""^(["'])(.*)\1$""")
+
+
+def _null_safe(function):
+    def wrapper(left, right):
+        if left is None or right is None:
+            return None
+        try:
+            return function(left, right)
+        except TypeError:
+            return None
+
+    return wrapper
+
+
+def _divide(left, right):
+    if isinstance(left, int) and isinstance(right, int):
+        return int(left / right)
+    return left / right
+
+
+OPERATORS = {
+    "=": _null_safe(operator.eq),
+    "<>": _null_safe(operator.ne),
+    "<": _null_safe(operator.lt),
+    "<=": _null_safe(operator.le),
+    ">": _null_safe(operator.gt),
+    ">=": _null_safe(operator.ge),
+    "+": _null_safe(operator.add),
+    "-": _null_safe(operator.sub),
+    "*": _null_safe(operator.mul),
+    "/": _null_safe(_divide),
+    "%": _null_safe(operator.mod),
+    "^": _null_safe(lambda left, right: float(left ** right)),
+    "IN": _null_safe(lambda left, right: left in right),
+    "CONTAINS": _null_safe(lambda left, right: right in left),
+    "STARTS WITH": _null_safe(lambda left, right: left.startswith(right)),
+    "ENDS WITH": _null_safe(lambda left, right: left.endswith(right)),
+    "=~": _null_safe(lambda left, right: re.fullmatch(right, left) is not None),
+}
+
+# Geographic points, in degrees, and the earth radius Neo4j measures their distances with.
+WGS84_SRIDS = {4326, 4979}
+EARTH_RADIUS = 6378140.0
+
+
+def _distance(start, end):
+    if start is None or end is None or start.srid != end.srid:
+        return None
+    if start.srid in WGS84_SRIDS:
+        (longitude1, latitude1), (longitude2, latitude2) = [map(math.radians, point[:2]) for point in (start, end)]
+        haversine = (
+            math.sin((latitude2 - latitude1) / 2) ** 2
+            + math.cos(latitude1) * math.cos(latitude2) * math.sin((longitude2 - longitude1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS * math.asin(math.sqrt(haversine))
+    return math.sqrt(sum((left - right) ** 2 for left, right in zip(start, end)))
+
+
+FUNCTIONS = {
+    "id": lambda entity: entity.id,
+    "labels": lambda node: sorted(node.labels),
+    "type": lambda relationship: relationship.type,
+    "properties": lambda entity: dict(entity.items()),
+    "keys": lambda entity: list(entity.keys()),
+    "size": len,
+    "length": len,
+    "nodes": lambda path: list(path.nodes),
+    "relationships": lambda path: list(path.relationships),
+    "toLower": lambda text: text.lower(),
+    "toUpper": lambda text: text.upper(),
+    "coalesce": lambda *values: next((value for value in values if value is not None), None),
+    "point.distance": _distance,
+}
+
+
+def _hashable(value):
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    elif isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+def _indexable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class MemoryEntity:
+    def __init__(self, id_, properties):
+        self.id = id_
+        self.properties = dict(properties)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.id == self.id
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.id))
+
+    def __getitem__(self, key):
+        return self.properties[key]
+
+    def __contains__(self, key):
+        return key in self.properties
+
+    def get(self, key, default=None):
+        return self.properties.get(key, default)
+
+    def keys(self):
+        return self.properties.keys()
+
+    def values(self):
+        return self.properties.values()
+
+    def items(self):
+        return self.properties.items()
+
+
+class MemoryNode(MemoryEntity):
+    def __init__(self, id_, labels, properties):
+        super().__init__(id_, properties)
+        self.labels = frozenset(labels)
+
+    def __repr__(self):
+        return "<MemoryNode id=%d labels=%s properties=%r>" % (self.id, set(self.labels), self.properties)
+
+
+class MemoryRelationship(MemoryEntity):
+    def __init__(self, id_, type_, start_node, end_node, properties):
+        super().__init__(id_, properties)
+        self.type = type_
+        self.start_node = start_node
+        self.end_node = end_node
+
+    def __repr__(self):
+        return "<MemoryRelationship id=%d nodes=(%d, %d) type=%r properties=%r>" % (
+            self.id,
+            self.start_node.id,
+            self.end_node.id,
+            self.type,
+            self.properties,
+        )
+
+
+class MemoryPath:
+    def __init__(self, nodes, relationships):
+        self.nodes = tuple(nodes)
+        self.relationships = tuple(relationships)
+
+    def __eq__(self, other):
+        return isinstance(other, MemoryPath) and (other.nodes, other.relationships) == (self.nodes, self.relationships)
+
+    def __hash__(self):
+        return hash((self.nodes, self.relationships))
+
+    def __len__(self):
+        return len(self.relationships)
+
+    def __repr__(self):
+        return "<MemoryPath nodes=%r>" % [node.id for node in self.nodes]
+
+    @property
+    def start_node(self):
+        return self.nodes[0]
+
+    @property
+    def end_node(self):
+        return self.nodes[-1]
+
+
+class MemoryRecord:
+    """A record with the interface of the driver's records."""
+
+    def __init__(self, keys, values):
+        self._keys = tuple(keys)
+        self._values = tuple(values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        return isinstance(other, MemoryRecord) and (other._keys, other._values) == (self._keys, self._values)
+
+    def __hash__(self):
+        return hash((self._keys, self._values))
+
+    def __repr__(self):
+        return "<MemoryRecord %s>" % " ".join("%s=%r" % item for item in self.items())
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._values[key]
+        return self._values[self._keys.index(key)]
+
+    def keys(self):
+        return list(self._keys)
+
+    def values(self):
+        return list(self._values)
+
+    def items(self):
+        return list(zip(self._keys, self._values))
+
+    def value(self, key=0, default=None):
+        try:
+            return self[key]
+        except (IndexError, ValueError):
+            return default
+
+    def data(self):
+        return dict(self.items())
+
+
+class MemoryStore:
+    """Nodes and relationships, with adjacency lists and label and property indexes."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.relationships = {}
+        self.nodes_by_label = defaultdict(set)
+        self.nodes_by_property = defaultdict(set)
+        self.outgoing = defaultdict(list)
+        self.incoming = defaultdict(list)
+        self.ids = count()
+        self.fulltext_indexes = {}
+        self.vector_indexes = {}
+
+    def create_fulltext_index(self, name, labels, properties):
+        self.fulltext_indexes[name] = (set(labels), list(properties))
+
+    def create_vector_index(self, name, label, property_name):
+        self.vector_indexes[name] = (label, property_name)
+
+    def create_node(self, labels, properties):
+        node = MemoryNode(next(self.ids), labels, properties)
+        self.nodes[node.id] = node
+        for label in node.labels:
+            self.nodes_by_label[label].add(node.id)
+            for key, value in node.items():
+                if _indexable(value):
+                    self.nodes_by_property[(label, key, value)].add(node.id)
+        return node
+
+    def create_relationship(self, type_, start_node, end_node, properties):
+        relationship = MemoryRelationship(next(self.ids), type_, start_node, end_node, properties)
+        self.relationships[relationship.id] = relationship
+        self.outgoing[start_node.id].append(relationship)
+        self.incoming[end_node.id].append(relationship)
+        return relationship
+
+    def delete_node(self, node):
+        del self.nodes[node.id]
+        for label in node.labels:
+            self.nodes_by_label[label].discard(node.id)
+            for key, value in node.items():
+                if _indexable(value):
+                    self.nodes_by_property[(label, key, value)].discard(node.id)
+
+    def delete_relationship(self, relationship):
+        del self.relationships[relationship.id]
+        self.outgoing[relationship.start_node.id].remove(relationship)
+        self.incoming[relationship.end_node.id].remove(relationship)
+
+    def find_nodes(self, labels, properties):
+        """
+        Find nodes by labels and properties, using the most selective index.
+
+        Arguments:
+            labels: Label names.
+            properties: A mapping of property values.
+
+        Returns:
+            A list of nodes.
+        """
+        candidates = None
+        for label in labels:
+            for key, value in properties.items():
+                if _indexable(value):
+                    ids = self.nodes_by_property.get((label, key, value), set())
+                    if candidates is None or len(ids) < len(candidates):
+                        candidates = ids
+            ids = self.nodes_by_label.get(label, set())
+            if candidates is None or len(ids) < len(candidates):
+                candidates = ids
+        if candidates is None:
+            nodes = self.nodes.values()
+        else:
+            nodes = (self.nodes[node_id] for node_id in sorted(candidates))
+        return [node for node in nodes if node.labels >= labels and _has_properties(node, properties)]
+
+    def steps(self, node, pattern):
+        if not isinstance(pattern, RelationshipFrom):
+            for relationship in self.outgoing.get(node.id, ()):
+                if _relationship_matches(pattern, relationship):
+                    yield relationship, relationship.end_node
+        if not isinstance(pattern, RelationshipTo):
+            for relationship in self.incoming.get(node.id, ()):
+                if _relationship_matches(pattern, relationship):
+                    yield relationship, relationship.start_node
+
+
+def _index(indexes, name):
+    if name not in indexes:
+        raise CypherError("no such index: %s" % name)
+    return indexes[name]
+
+
+def _query_fulltext_nodes(store, index, text, options=None):
+    # Scored by the share of the query terms found in the indexed properties, not by Lucene.
+    labels, properties = _index(store.fulltext_indexes, index)
+    terms = text.lower().split()
+    results = []
+    for node in store.nodes.values():
+        if terms and node.labels & labels:
+            words = " ".join(str(node.get(key, "")) for key in properties).lower().split()
+            found = sum(term in words for term in terms)
+            if found:
+                results.append({"node": node, "score": found / len(terms)})
+    return sorted(results, key=lambda result: -result["score"])
+
+
+def _query_vector_nodes(store, index, top_k, embedding):
+    # Cosine similarity, normalized to [0, 1] like Neo4j scores.
+    label, property_name = _index(store.vector_indexes, index)
+    norm = math.sqrt(sum(value * value for value in embedding))
+    results = []
+    for node_id in store.nodes_by_label.get(label, ()):
+        node = store.nodes[node_id]
+        vector = node.get(property_name)
+        if vector is not None and len(vector) == len(embedding):
+            product = sum(left * right for left, right in zip(vector, embedding))
+            cosine = product / ((math.sqrt(sum(value * value for value in vector)) * norm) or 1)
+            results.append({"node": node, "score": (1 + cosine) / 2})
+    return sorted(results, key=lambda result: (-result["score"], result["node"].id))[:top_k]
+
+
+PROCEDURES = {
+    "db.index.fulltext.queryNodes": _query_fulltext_nodes,
+    "db.index.vector.queryNodes": _query_vector_nodes,
+}
+
+
+def _has_properties(entity, properties):
+    return all(key in entity and entity[key] == value for key, value in properties.items())
+
+
+def _relationship_matches(pattern, relationship):
+    types = {relationship_type.name for relationship_type in pattern.types}
+    return (not types or relationship.type in types) and _has_properties(relationship, pattern.properties)
+
+
+def _hops(pattern):
+    path_length = pattern.path_length
+    if hasattr(path_length, "length"):
+        if path_length.length in (None, "*"):
+            return 1, None
+        return path_length.length, path_length.length
+    return (1 if path_length.min is None else path_length.min), path_length.max
+
+
+def _is_variable_length(pattern):
+    return _hops(pattern) != (1, 1)
+
+
+def _variables(components):
+    variables = []
+    for component in components:
+        if component.cypher_id:
+            variables.append(component.cypher_id)
+        variables.extend(_variables(getattr(component, "components", ())))
+    return variables
+
+
+def _truthy(value):
+    return value is True
+
+
+class Executor:
+    """Execute the steps of a query on a store."""
+
+    def __init__(self, store, parameters):
+        self.store = store
+        self.parameters = parameters
+        self.created = []
+
+    def execute(self, query):
+        if query is None:
+            raise CypherError("the in-memory backend only runs queries built with neopy, not Cypher text")
+        rows = [{}]
+        columns = None
+        steps = query.steps()
+        index = 0
+        while index < len(steps):
+            kind, clauses = steps[index]
+            if kind in {MATCH, OPTIONAL_MATCH}:
+                conditions = []
+                if index + 1 < len(steps) and steps[index + 1][0] == WHERE:
+                    index += 1
+                    conditions = [arg for clause in steps[index][1] for arg in clause.args]
+                rows = self.match(clauses, rows, conditions, optional=kind == OPTIONAL_MATCH)
+            elif kind == WHERE:
+                conditions = [arg for clause in clauses for arg in clause.args]
+                rows = [row for row in rows if self.satisfies(conditions, row)]
+            elif kind == CREATE:
+                for clause in clauses:
+                    rows = [self.create(clause.args, row) for row in rows]
+            elif kind in {WITH, WITH_DISTINCT}:
+                _, rows = self.project(clauses, rows, distinct=kind == WITH_DISTINCT)
+            elif kind == RETURN:
+                distinct = any(clause.kind == RETURN_DISTINCT for clause in clauses)
+                columns, rows = self.project(clauses, rows, distinct=distinct, keep=True)
+            elif kind == MODIFIERS:
+                rows = self.modify(clauses, rows)
+            elif kind == CALL:
+                rows = self.call(clauses, rows)
+            else:
+                raise NotImplementedError("%s clauses are not supported in memory" % kind)
+            index += 1
+        if columns is None:
+            return []
+        return [MemoryRecord(columns, [row[column] for column in columns]) for row in rows]
+
+    # Calling --------------------------------------------------------------
+
+    def call(self, clauses, rows):
+        for clause in clauses:
+            procedure, *arguments = clause.args
+            if procedure not in PROCEDURES:
+                raise NotImplementedError("procedure %s is not supported in memory" % procedure)
+            called = []
+            for row in rows:
+                # Arguments are values, unless they are expressions or patterns.
+                expressions = [reference(arg) if isinstance(arg, Cypher) else Literal(arg) for arg in arguments]
+                values = [self.evaluate(expression, row) for expression in expressions]
+                for output in PROCEDURES[procedure](self.store, *values):
+                    called.append(dict(row, **{alias: output[field] for field, alias in clause.kwargs["yields"]}))
+            rows = called
+        return rows
+
+    # Matching -------------------------------------------------------------
+
+    def match(self, clauses, rows, conditions, optional=False):
+        for position, clause in enumerate(clauses):
+            # WHERE conditions belong to the last pattern (this matters for OPTIONAL MATCH).
+            clause_conditions = conditions if position == len(clauses) - 1 else []
+            matched_rows = []
+            for row in rows:
+                extensions = [
+                    extension
+                    for extension in self.match_pattern(clause.args, row)
+                    if self.satisfies(clause_conditions, extension)
+                ]
+                if not extensions and optional:
+                    extensions = [dict(row, **{name: None for name in _variables(clause.args) if name not in row})]
+                matched_rows.extend(extensions)
+            rows = matched_rows
+        return rows
+
+    def match_pattern(self, components, row):
+        if len(components) == 1 and isinstance(components[0], Path):
+            yield from self.match_path(components[0], row)
+        else:
+            for extension, _, _ in self.match_chain(components, row):
+                yield extension
+
+    def match_path(self, path, row):
+        if isinstance(path, (ShortestPath, AllShortestPaths)):
+            matches = self.match_shortest(path.components, row, find_all=isinstance(path, AllShortestPaths))
+        else:
+            matches = self.match_chain(path.components, row)
+        for extension, nodes, relationships in matches:
+            yield self.bind(extension, path, MemoryPath(nodes, relationships))
+
+    def match_chain(self, components, row):
+        if not components or len(components) % 2 == 0:
+            raise CypherError("a pattern alternates nodes and relationships, and starts and ends with a node")
+        first = components[0]
+        for node in self.node_candidates(first, row):
+            yield from self.extend_chain(components, 1, node, self.bind(row, first, node), [node], [])
+
+    def extend_chain(self, components, index, node, row, nodes, relationships):
+        if index == len(components):
+            yield row, nodes, relationships
+            return
+        pattern, end_pattern = components[index], components[index + 1]
+        for path, end in self.expand(node, pattern, set(relationships)):
+            if not self.node_matches(end_pattern, end, row):
+                continue
+            value = list(path) if _is_variable_length(pattern) else path[0]
+            if pattern.cypher_id and pattern.cypher_id in row and row[pattern.cypher_id] != value:
+                continue
+            extension = self.bind(self.bind(row, pattern, value), end_pattern, end)
+            yield from self.extend_chain(
+                components, index + 2, end, extension, nodes + self.path_nodes(node, path), relationships + list(path)
+            )
+
+    def expand(self, start, pattern, used):
+        low, high = _hops(pattern)
+        stack = [(start, ())]
+        while stack:
+            node, path = stack.pop()
+            if len(path) >= low:
+                yield path, node
+            if high is not None and len(path) == high:
+                continue
+            for relationship, other in reversed(list(self.store.steps(node, pattern))):
+                if relationship not in used and relationship not in path:
+                    stack.append((other, path + (relationship,)))
+
+    def match_shortest(self, components, row, find_all=False):
+        if len(components) != 3:
+            raise CypherError("shortest paths have exactly one relationship pattern")
+        start_pattern, pattern, end_pattern = components
+        low, high = _hops(pattern)
+        for start in self.node_candidates(start_pattern, row):
+            start_row = self.bind(row, start_pattern, start)
+            found = []
+            frontier = [(start, ())]
+            depths = {start.id: 0}
+            depth = 0
+            while frontier and not found:
+                found = [
+                    (node, path)
+                    for node, path in frontier
+                    if len(path) >= low and len(path) and self.node_matches(end_pattern, node, start_row)
+                ]
+                if found or (high is not None and depth == high):
+                    break
+                depth += 1
+                next_frontier = []
+                for node, path in frontier:
+                    for relationship, other in self.store.steps(node, pattern):
+                        if relationship in path or depths.get(other.id, depth) < depth:
+                            continue
+                        depths[other.id] = depth
+                        next_frontier.append((other, path + (relationship,)))
+                frontier = next_frontier
+            for end, path in found if find_all else found[:1]:
+                extension = self.bind(self.bind(start_row, pattern, list(path)), end_pattern, end)
+                yield extension, self.path_nodes(start, path, include_start=True), list(path)
+
+    def path_nodes(self, start, path, include_start=False):
+        nodes = [start] if include_start else []
+        node = start
+        for relationship in path:
+            node = relationship.end_node if relationship.start_node == node else relationship.start_node
+            nodes.append(node)
+        return nodes
+
+    def node_candidates(self, pattern, row):
+        if pattern.cypher_id and pattern.cypher_id in row:
+            node = row[pattern.cypher_id]
+            return [node] if self.node_matches(pattern, node, row) else []
+        labels = frozenset(label.name for label in pattern.labels)
+        return self.store.find_nodes(labels, pattern.properties)
+
+    def node_matches(self, pattern, node, row):
+        if node is None:
+            return False
+        if pattern.cypher_id and pattern.cypher_id in row and row[pattern.cypher_id] != node:
+            return False
+        labels = {label.name for label in pattern.labels}
+        return node.labels >= labels and _has_properties(node, pattern.properties)
+
+    def bind(self, row, component, value):
+        if not component.cypher_id:
+            return row
+        extension = dict(row)
+        extension[component.cypher_id] = value
+        return extension
+
+    # Writing --------------------------------------------------------------
+
+    def create(self, components, row):
+        previous = None
+        pending = None
+        for component in components:
+            if isinstance(component, Relationship):
+                pending = component
+                continue
+            node = row.get(component.cypher_id) if component.cypher_id else None
+            if node is None:
+                labels = [label.name for label in component.labels]
+                node = self.store.create_node(labels, component.properties)
+                self.created.append(node)
+                row = self.bind(row, component, node)
+            if pending is not None:
+                row = self.bind(row, pending, self.create_relationship(pending, previous, node))
+                pending = None
+            previous = node
+        return row
+
+    def create_relationship(self, pattern, previous, node):
+        if len(pattern.types) != 1:
+            raise CypherError("a created relationship needs exactly one type")
+        if isinstance(pattern, RelationshipTo):
+            start, end = previous, node
+        elif isinstance(pattern, RelationshipFrom):
+            start, end = node, previous
+        else:
+            raise CypherError("a created relationship needs a direction")
+        relationship_type = next(iter(pattern.types)).name
+        relationship = self.store.create_relationship(relationship_type, start, end, pattern.properties)
+        self.created.append(relationship)
+        return relationship
+
+    def rollback(self):
+        for entity in reversed(self.created):
+            if isinstance(entity, MemoryRelationship):
+                self.store.delete_relationship(entity)
+            else:
+                self.store.delete_node(entity)
+
+    # Projecting -----------------------------------------------------------
+
+    def project(self, clauses, rows, distinct=False, keep=False):
+        items = []
+        for clause in clauses:
+            for arg in clause.args:
+                items.append(self.projection_item(arg))
+            for alias, arg in clause.kwargs.items():
+                items.append((alias, reference(arg)))
+        columns = [column for column, _ in items]
+        aggregates = {
+            column
+            for column, expression in items
+            if isinstance(expression, FunctionCall) and expression.name in AGGREGATES
+        }
+        if aggregates:
+            projected = self.aggregate(items, aggregates, rows)
+        else:
+            projected = []
+            for row in rows:
+                # ORDER BY may still refer to the variables of a RETURN clause.
+                projected_row = dict(row) if keep else {}
+                projected_row.update((column, self.evaluate(expression, row)) for column, expression in items)
+                projected.append(projected_row)
+        if distinct:
+            unique = {}
+            for row in projected:
+                unique.setdefault(tuple(_hashable(row[column]) for column in columns), row)
+            projected = list(unique.values())
+        return columns, projected
+
+    def projection_item(self, arg):
+        if isinstance(arg, str):
+            alias = ALIAS.match(arg)
+            if alias:
+                return alias.group(2), Raw(alias.group(1))
+            return arg, Raw(arg)
+        expression = reference(arg)
+        if getattr(arg, "is_pattern", False):
+            return arg.cypher_id, expression
+        return expression.render(), expression
+
+    def aggregate(self, items, aggregates, rows):
+        groups = {}
+        for row in rows:
+            keys = {column: self.evaluate(expression, row) for column, expression in items if column not in aggregates}
+            group = groups.setdefault(tuple(_hashable(value) for value in keys.values()), (keys, []))
+            group[1].append(row)
+        if not groups and len(aggregates) == len(items):
+            groups[()] = ({}, [])
+        projected = []
+        for keys, group_rows in groups.values():
+            row = dict(keys)
+            for column, expression in items:
+                if column in aggregates:
+                    row[column] = self.compute_aggregate(expression, group_rows)
+            projected.append({column: row[column] for column, _ in items})
+        return projected
+
+    def compute_aggregate(self, expression, rows):
+        argument = expression.arguments[0] if expression.arguments else Raw("*")
+        if isinstance(argument, Raw) and argument.text == "*":
+            return len(rows)
+        values = [self.evaluate(argument, row) for row in rows]
+        values = [value for value in values if value is not None]
+        if expression.distinct:
+            unique = {}
+            for value in values:
+                unique.setdefault(_hashable(value), value)
+            values = list(unique.values())
+        if expression.name == "count":
+            return len(values)
+        elif expression.name == "collect":
+            return values
+        elif not values:
+            return None
+        elif expression.name == "sum":
+            return sum(values)
+        elif expression.name == "avg":
+            return sum(values) / len(values)
+        elif expression.name == "min":
+            return min(values)
+        return max(values)
+
+    def modify(self, clauses, rows):
+        orders = [clause for clause in clauses if clause.kind == ORDER_BY]
+        for clause in reversed(orders):
+            for arg in reversed(clause.args):
+                expression = Raw(arg) if isinstance(arg, str) else reference(arg)
+                rows = sorted(
+                    rows,
+                    key=cmp_to_key(
+                        lambda left, right: _compare(self.evaluate(expression, left), self.evaluate(expression, right))
+                    ),
+                    reverse=bool(clause.kwargs.get("descending")),
+                )
+        skips = [clause.args[0] for clause in clauses if clause.kind == SKIP]
+        if skips:
+            rows = rows[self.evaluate(Raw(skips[-1]), {}) :]
+        limits = [clause.args[0] for clause in clauses if clause.kind == LIMIT]
+        if limits:
+            rows = rows[: self.evaluate(Raw(limits[-1]), {})]
+        return rows
+
+    # Evaluating -----------------------------------------------------------
+
+    def satisfies(self, conditions, row):
+        for condition in conditions:
+            expression = Raw(condition) if isinstance(condition, str) else reference(condition)
+            if not _truthy(self.evaluate(expression, row)):
+                return False
+        return True
+
+    def evaluate(self, expression, row):  # noqa: WPS231 (one branch per node type)
+        if isinstance(expression, Literal):
+            return expression.value
+        elif isinstance(expression, Raw):
+            return self.evaluate_text(expression.text, row)
+        elif isinstance(expression, Property):
+            owner = self.evaluate(expression.owner, row)
+            return None if owner is None else owner.get(expression.name)
+        elif isinstance(expression, Projection):
+            owner = self.evaluate(expression.owner, row)
+            projected = {name: owner.get(name) for name in expression.names}
+            projected.update((key, self.evaluate(value, row)) for key, value in expression.computed)
+            return projected
+        elif isinstance(expression, FunctionCall):
+            if expression.name not in FUNCTIONS:
+                raise NotImplementedError("function %s() is not supported in memory" % expression.name)
+            arguments = [self.evaluate(argument, row) for argument in expression.arguments]
+            if expression.name != "coalesce" and None in arguments:
+                return None
+            return FUNCTIONS[expression.name](*arguments)
+        elif isinstance(expression, UnaryOperation):
+            return self.evaluate_unary(expression.operator, self.evaluate(expression.operand, row))
+        elif isinstance(expression, BinaryOperation):
+            return self.evaluate_binary(expression, row)
+        raise NotImplementedError("%s is not supported in memory" % type(expression).__name__)
+
+    def evaluate_unary(self, operator_, value):
+        if operator_ == "IS NULL":
+            return value is None
+        elif operator_ == "IS NOT NULL":
+            return value is not None
+        elif value is None:
+            return None
+        elif operator_ == "NOT":
+            return not value
+        return -value
+
+    def evaluate_binary(self, expression, row):
+        left = self.evaluate(expression.left, row)
+        if expression.operator in {"AND", "OR", "XOR"}:
+            right = self.evaluate(expression.right, row)
+            if expression.operator == "AND":
+                if left is False or right is False:
+                    return False
+                return None if left is None or right is None else True
+            elif expression.operator == "OR":
+                if left is True or right is True:
+                    return True
+                return None if left is None or right is None else False
+            return None if left is None or right is None else left != right
+        return OPERATORS[expression.operator](left, self.evaluate(expression.right, row))
+
+    def evaluate_text(self, text, row):  # noqa: WPS231 (one branch per syntax)
+        text = text.strip()
+        if text in row:
+            return row[text]
+        elif text.startswith("$"):
+            return self.parameters[text[1:]]
+        elif IDENTIFIER.match(text):
+            if text.lower() in {"true", "false", "null"}:
+                return {"true": True, "false": False, "null": None}[text.lower()]
+            raise CypherError("variable %s is not defined" % text)
+        elif NUMBER.match(text):
+            return float(text) if "." in text else int(text)
+        elif STRING.match(text):
+            return STRING.match(text).group(2)
+        property_match = PROPERTY.match(text)
+        if property_match:
+            return self.evaluate(Property(Raw(property_match.group(1)), property_match.group(2)), row)
+        function_match = FUNCTION.match(text)
+        if function_match:
+            return self.evaluate(FunctionCall(function_match.group(1), Raw(function_match.group(2))), row)
+        comparison = COMPARISON.match(text)
+        if comparison:
+            left, operator_, right = comparison.groups()
+            return OPERATORS[operator_](self.evaluate_text(left, row), self.evaluate_text(right, row))
+        raise NotImplementedError("%r is not supported in memory" % text)
+
+
+def _compare(left, right):
+    # Nulls come last in ascending order.
+    if left is None or right is None:
+        return (left is None) - (right is None)
+    return (left > right) - (left < right)
+
+
+class InMemoryBackend(Backend):
+    """
+    Execute queries over an in-memory graph.
+
+    Each query, or pipeline of queries, runs atomically: the entities it created are removed if it fails.
+
+    Arguments:
+        store: The graph (defaults to a new, empty `MemoryStore`).
+    """
+
+    def __init__(self, store=None):
+        self.store = store or MemoryStore()
+        self.lock = threading.RLock()
+
+    def run(self, query, statement, parameters, access_mode=None, **options):
+        with self.lock:
+            executor = Executor(self.store, parameters)
+            try:
+                return executor.execute(query)
+            except Exception:
+                executor.rollback()
+                raise
+
+    def run_many(self, queries, access_mode=None, **options):
+        with self.lock:
+            executors = []
+            try:
+                results = []
+                for query, _, parameters in queries:
+                    executors.append(Executor(self.store, parameters))
+                    results.append(executors[-1].execute(query))
+                return results
+            except Exception:
+                for executor in reversed(executors):
+                    executor.rollback()
+                raise
@@ -0,0 +1,45 @@
+"""
+Keyset pagination of large MATCH results.
+
+Instead of skipping over the rows of previous pages, each page
+starts after the last key seen (`WHERE n.id > $last ORDER BY n.id LIMIT $n`).
+With an index on the key, deep pages cost the same as the first one.
+"""
+
+KEY_ALIAS = "_neopy_key"
+LAST_PARAMETER = "neopy_last"
+
+
+def keyset(graph, cypher_id, *returns, key=None, page_size=1000, **run_options):
+    """
+    Iterate over the records of a query, page by page.
+
+    Arguments:
+        graph: A graph with MATCH (and optional WHERE) clauses, but no RETURN clause.
+        cypher_id: The cypher ID of the matched node or relationship to page by.
+        *returns: What to return (defaults to the paged entity).
+            The key is also returned, under the `_neopy_key` alias.
+        key: The property to page by (defaults to the internal id).
+            It should be unique and indexed.
+        page_size: The number of records fetched by each query.
+        **run_options: Options passed to `Graph.run()`.
+
+    Yields:
+        The records, ordered by key.
+    """
+    key_expression = "id(%s)" % cypher_id if key is None else "%s.%s" % (cypher_id, key)
+    returns = returns or (cypher_id,)
+
+    def page(base):
+        projected = base.return_(*returns, "%s AS %s" % (key_expression, KEY_ALIAS))
+        return projected.order_by(key_expression).limit(page_size)
+
+    first_page = page(graph)
+    next_pages = page(graph.where("%s > $%s" % (key_expression, LAST_PARAMETER)))
+
+    records = first_page.run(**run_options)
+    while records:
+        yield from records
+        if len(records) < page_size:
+            return
+        records = next_pages.bind(**{LAST_PARAMETER: records[-1][KEY_ALIAS]}).run(**run_options)
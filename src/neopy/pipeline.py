@@ -0,0 +1,103 @@
+"""
+Several queries in one transaction and one round trip.
+
+`Graph.run()` runs each query in a transaction of its own, so a few
+small dependent writes cost a round trip each. A `Pipeline` queues
+queries instead, then runs them together, and returns their results:
+
+```python
+anna, bob = Node("a", person, name="Anna"), Node("b", person, name="Bob")
+with pipelined() as pipeline:
+    pipeline.add(Graph().create(anna).create(bob))
+    pipeline.add(Graph().match(anna).match(bob).create(Node("a"), RelationshipTo(friend), Node("b")))
+    pipeline.add(Graph().match(Node("p", person)).return_("p"))
+people = pipeline.results[-1]
+```
+
+Queries run in order and see the writes of the previous ones. They are
+committed together, or not at all, by the `BoltBackend` and the
+`InMemoryBackend`; other backends may run them one at a time.
+
+The `BoltBackend` sends them as a single statement, with one `CALL`
+subquery per query returning its rows as a list (see
+`neopy.backends.combine`). The driver waits for the server to accept
+each statement before sending the next one, so queries whose columns
+are not known in advance (`RETURN *`, returned literals) make it fall
+back to one statement, and one round trip, per query.
+"""
+
+from contextlib import contextmanager
+
+from . import backends, cache, db
+
+
+class Pipeline:
+    """
+    Queries waiting to be run together.
+
+    Arguments:
+        backend: The backend running the queries (defaults to the current one, when run).
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.graphs = []
+        self.results = None
+
+    def __len__(self):
+        return len(self.graphs)
+
+    def add(self, graph):
+        """
+        Queue a query.
+
+        Arguments:
+            graph: The `Graph` to run.
+
+        Returns:
+            The pipeline, to chain calls.
+        """
+        self.graphs.append(graph)
+        return self
+
+    def run(self, **options):
+        """
+        Run the queued queries in one transaction, and empty the queue.
+
+        Arguments:
+            **options: Execution options, like a retry policy, an idempotency key or a logical session.
+
+        Returns:
+            The list of records of each query, in order.
+        """
+        graphs, self.graphs = self.graphs, []
+        if not graphs:
+            self.results = []
+            return self.results
+        queries = [(graph.query, *graph.query.compile()) for graph in graphs]
+        read_only = all(graph.query.is_read_only() for graph in graphs)
+        access_mode = db.READ_ACCESS if read_only else db.WRITE_ACCESS
+        self.results = (self.backend or backends.current()).run_many(queries, access_mode=access_mode, **options)
+        query_cache = cache.current()
+        if query_cache is not None:
+            for graph in graphs:
+                if not graph.query.is_read_only():
+                    query_cache.invalidate(graph.query.labels())
+        return self.results
+
+
+@contextmanager
+def pipelined(backend=None, **options):
+    """
+    Queue queries in a `with` block, and run them together when it exits without error.
+
+    Arguments:
+        backend: The backend running the queries (defaults to the current one).
+        **options: Execution options.
+
+    Yields:
+        The `Pipeline`. Its `results` are set once the block exits.
+    """
+    pipeline = Pipeline(backend)
+    yield pipeline
+    pipeline.run(**options)
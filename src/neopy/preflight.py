@@ -0,0 +1,171 @@
+"""
+Pre-flight checks of query plans.
+
+Some queries look harmless when built, but plan into full scans or
+cartesian products, and only show up in production as CPU spikes.
+`PreflightBackend` wraps a backend and has each new query shape
+explained (`EXPLAIN`) before running it. It then inspects the plan for
+costly operators, and warns or refuses, according to its policy:
+
+```python
+backends.use(PreflightBackend(refuse=True))
+graph.match(neo).match(anna).return_(neo, anna).run()  # raises QueryPlanError: CartesianProduct
+```
+
+Plans are cached by query shape: the statement with its string and
+number literals (such as the values of inline property maps) blanked
+out, so that queries differing only by their values are explained once.
+"""
+
+import re
+import threading
+import warnings
+from collections import OrderedDict
+
+from . import db
+from .backends import Backend, current
+from .exceptions import QueryPlanError, QueryPlanWarning
+
+# Operators that are reported whatever their estimated rows.
+FORBIDDEN_OPERATORS = {"CartesianProduct", "AllNodesScan"}
+
+# Label scans are reported when they are estimated to return more rows than this.
+MAX_SCAN_ROWS = 100000
+
+SCAN_OPERATORS = {"NodeByLabelScan", "DirectedRelationshipTypeScan", "UndirectedRelationshipTypeScan"}
+
+# Matches string and number literals, or backquoted names (group 1), which are kept in shapes.
+LITERALS = re.compile(r'"(?:\\.|[^"\\])*"' + r"|'(?:\\.|[^'\\])*'" + r"|(`[^`]*`)|\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+
+# Matches the expansion of an unbounded variable-length relationship in plan details, like `*]` or `*2..]`.
+UNBOUNDED_EXPANSION = re.compile(r"\*(?:\d*\.\.)?(?=[\]\s])")
+
+
+def shape(statement):
+    """
+    Blank out the literals of a statement.
+
+    Arguments:
+        statement: The rendered query.
+
+    Returns:
+        The statement, with `?` in place of its string and number literals.
+    """
+    return LITERALS.sub(lambda match: match.group(1) or "?", statement)
+
+
+def _operator(plan):
+    # Operators may be suffixed with their runtime, like "NodeByLabelScan@neo4j".
+    return plan.get("operatorType", "").split("@")[0]
+
+
+def _details(plan):
+    args = plan.get("args", {})
+    return " ".join(str(args.get(key, "")) for key in ("Details", "ExpandExpression"))
+
+
+def inspect_plan(plan, max_scan_rows=MAX_SCAN_ROWS, forbidden=FORBIDDEN_OPERATORS):
+    """
+    Find the costly operators of a plan.
+
+    Arguments:
+        plan: A plan, as returned by `Backend.explain()`.
+        max_scan_rows: The number of estimated rows over which label and type scans are reported.
+        forbidden: Operators reported whatever their estimated rows.
+
+    Returns:
+        A list of problems, as text.
+    """
+    problems = []
+    plans = [plan] if plan else []
+    while plans:
+        step = plans.pop()
+        plans.extend(step.get("children", ()))
+        operator = _operator(step)
+        estimated_rows = step.get("args", {}).get("EstimatedRows", 0)
+        if operator in forbidden:
+            problems.append(operator)
+        elif operator in SCAN_OPERATORS and estimated_rows > max_scan_rows:
+            problems.append("%s of %d estimated rows" % (operator, estimated_rows))
+        elif operator.startswith("VarLengthExpand") and UNBOUNDED_EXPANSION.search(_details(step)):
+            problems.append("unbounded %s" % operator)
+    return problems
+
+
+class PreflightBackend(Backend):
+    """
+    Explain each new query shape before running it, and warn about or refuse costly plans.
+
+    Arguments:
+        backend: The backend running the queries (defaults to the current one, when created).
+        refuse: Whether to raise `QueryPlanError` instead of emitting a `QueryPlanWarning`.
+        max_scan_rows: The number of estimated rows over which label and type scans are reported.
+        forbidden: Operators reported whatever their estimated rows.
+        maxsize: The number of query shapes whose problems are remembered.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        refuse=False,
+        max_scan_rows=MAX_SCAN_ROWS,
+        forbidden=FORBIDDEN_OPERATORS,
+        maxsize=1024,
+    ):
+        self.backend = backend or current()
+        self.refuse = refuse
+        self.max_scan_rows = max_scan_rows
+        self.forbidden = forbidden
+        self.maxsize = maxsize
+        self.problems = OrderedDict()
+        self.lock = threading.Lock()
+
+    def check(self, statement, parameters, access_mode=db.WRITE_ACCESS):
+        """
+        Check the plan of a query, explaining it if its shape (see `shape`) is new.
+
+        Arguments:
+            statement: The rendered query.
+            parameters: The query parameters.
+            access_mode: `db.READ_ACCESS` for read-only queries, `db.WRITE_ACCESS` otherwise.
+
+        Raises:
+            QueryPlanError: When the plan is costly and the policy is to refuse it.
+
+        Returns:
+            The list of problems found in the plan.
+        """
+        key = shape(statement)
+        with self.lock:
+            problems = self.problems.get(key)
+            if problems is not None:
+                self.problems.move_to_end(key)
+        if problems is None:
+            plan = self.backend.explain(statement, parameters, access_mode=access_mode)
+            problems = inspect_plan(plan, self.max_scan_rows, self.forbidden)
+            with self.lock:
+                self.problems[key] = problems
+                if len(self.problems) > self.maxsize:
+                    self.problems.popitem(last=False)
+        if problems:
+            message = "costly query plan (%s): %s" % (", ".join(problems), statement)
+            if self.refuse:
+                raise QueryPlanError(message)
+            warnings.warn(message, QueryPlanWarning, stacklevel=4)
+        return problems
+
+    def run(self, query, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        self.check(statement, parameters, access_mode)
+        return self.backend.run(query, statement, parameters, access_mode=access_mode, **options)
+
+    def stream(self, query, statement, parameters, consumer, access_mode=db.WRITE_ACCESS, **options):
+        self.check(statement, parameters, access_mode)
+        return self.backend.stream(query, statement, parameters, consumer, access_mode=access_mode, **options)
+
+    def run_many(self, queries, access_mode=db.WRITE_ACCESS, **options):
+        for _, statement, parameters in queries:
+            self.check(statement, parameters, access_mode)
+        return self.backend.run_many(queries, access_mode=access_mode, **options)
+
+    def explain(self, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        return self.backend.explain(statement, parameters, access_mode=access_mode, **options)
@@ -0,0 +1,247 @@
+"""
+Local graph projections, for in-process algorithms.
+
+A projection streams node ids and relationship ends from two queries
+into a compressed sparse row (CSR) adjacency: internal ids are remapped
+to contiguous indexes, and the neighbours of each node are a slice of a
+single index array. Algorithms then run on NumPy arrays, without going
+back to the server:
+
+```python
+person = Node("p", NodeLabel("Person"))
+nodes = Graph().match(person).return_(person)
+friend = RelationshipTo(RelationshipType("friend"))
+friends = Graph().match(Node("a", NodeLabel("Person")), friend, Node("b")).return_("a", "b")
+graph = projection.project(nodes, friends)
+ranks = dict(zip(graph.ids, graph.pagerank()))
+```
+
+NumPy is an optional dependency: install the `columnar` extra.
+"""
+
+from .columnar import ColumnBuffer, _numpy
+
+
+def _first_columns(count):
+    def consumer(records):
+        buffers = [ColumnBuffer() for _ in range(count)]
+        for record in records:
+            values = record.values()
+            for buffer, value in zip(buffers, values):
+                buffer.append(value)
+        return [buffer.array() for buffer in buffers]
+
+    return consumer
+
+
+class CSRGraph:
+    """
+    A directed graph in compressed sparse row form.
+
+    Arguments:
+        ids: The sorted, unique internal ids of the nodes.
+        indptr: The offsets of each node's neighbours in `indices` (one more than the number of nodes).
+        indices: The indexes of the neighbours.
+    """
+
+    def __init__(self, ids, indptr, indices):
+        self.numpy = _numpy()
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, node_ids, starts, ends, undirected=False):
+        """
+        Build a projection from arrays of ids.
+
+        Arguments:
+            node_ids: The internal ids of the nodes.
+            starts: The ids of the start nodes of the relationships.
+            ends: The ids of the end nodes of the relationships.
+            undirected: Whether to also add each relationship in the reverse direction.
+
+        Returns:
+            A `CSRGraph`. Relationships whose ends are not among the nodes are dropped.
+        """
+        numpy = _numpy()
+        ids = numpy.unique(numpy.asarray(node_ids, dtype="int64"))
+        sources = cls._remap(ids, numpy.asarray(starts, dtype="int64"))
+        targets = cls._remap(ids, numpy.asarray(ends, dtype="int64"))
+        kept = (sources >= 0) & (targets >= 0)
+        sources, targets = sources[kept], targets[kept]
+        if undirected:
+            sources, targets = numpy.concatenate([sources, targets]), numpy.concatenate([targets, sources])
+        order = numpy.argsort(sources, kind="stable")
+        counts = numpy.bincount(sources, minlength=len(ids))
+        indptr = numpy.zeros(len(ids) + 1, dtype="int64")
+        numpy.cumsum(counts, out=indptr[1:])
+        return cls(ids, indptr, targets[order])
+
+    @staticmethod
+    def _remap(ids, values):
+        numpy = _numpy()
+        if not len(ids):
+            return numpy.full(len(values), -1, dtype="int64")
+        positions = numpy.searchsorted(ids, values)
+        positions[positions == len(ids)] = 0
+        return numpy.where(ids[positions] == values, positions, -1)
+
+    @property
+    def node_count(self):
+        return len(self.ids)
+
+    @property
+    def edge_count(self):
+        return len(self.indices)
+
+    @property
+    def sources(self):
+        """The index of the start node of each relationship, aligned with `indices`."""
+        return self.numpy.repeat(self.numpy.arange(self.node_count), self.numpy.diff(self.indptr))
+
+    def index(self, node_id):
+        """
+        Return the index of a node.
+
+        Arguments:
+            node_id: The internal id of the node.
+
+        Raises:
+            KeyError: When the node is not in the projection.
+
+        Returns:
+            The index of the node in the arrays of the projection.
+        """
+        position = int(self._remap(self.ids, self.numpy.asarray([node_id], dtype="int64"))[0])
+        if position < 0:
+            raise KeyError(node_id)
+        return position
+
+    def neighbours(self, node_id):
+        index = self.index(node_id)
+        return self.ids[self.indices[self.indptr[index] : self.indptr[index + 1]]]
+
+    def out_degree(self):
+        return self.numpy.diff(self.indptr)
+
+    def in_degree(self):
+        return self.numpy.bincount(self.indices, minlength=self.node_count)
+
+    def degree(self):
+        return self.out_degree() + self.in_degree()
+
+    def expand(self, frontier):
+        """
+        Return the neighbours of a set of nodes.
+
+        Arguments:
+            frontier: An array of node indexes.
+
+        Returns:
+            The concatenated neighbour indexes of these nodes.
+        """
+        numpy = self.numpy
+        starts = self.indptr[frontier]
+        lengths = self.indptr[frontier + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return numpy.empty(0, dtype="int64")
+        # Positions in `indices`: each node's start, then consecutive offsets.
+        offsets = numpy.arange(total) - numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+        return self.indices[numpy.repeat(starts, lengths) + offsets]
+
+    def bfs_depth(self, source, max_depth=None):
+        """
+        Compute the depth of each node in a breadth-first search.
+
+        Arguments:
+            source: The internal id of the start node.
+            max_depth: The depth to stop at (defaults to exploring the whole reachable graph).
+
+        Returns:
+            An array of depths, by node index: -1 for nodes that were not reached.
+        """
+        numpy = self.numpy
+        depths = numpy.full(self.node_count, -1, dtype="int64")
+        frontier = numpy.array([self.index(source)], dtype="int64")
+        depth = 0
+        depths[frontier] = depth
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            depth += 1
+            reached = numpy.unique(self.expand(frontier))
+            frontier = reached[depths[reached] < 0]
+            depths[frontier] = depth
+        return depths
+
+    def connected_components(self):
+        """
+        Compute the weakly connected components.
+
+        Returns:
+            An array of component numbers, by node index, numbered from 0.
+        """
+        numpy = self.numpy
+        labels = numpy.arange(self.node_count)
+        sources, targets = self.sources, self.indices
+        while True:
+            previous = labels.copy()
+            # Propagate the smallest label along relationships, both ways, then jump pointers.
+            numpy.minimum.at(labels, targets, labels[sources])
+            numpy.minimum.at(labels, sources, labels[targets])
+            labels = labels[labels]
+            if numpy.array_equal(labels, previous):
+                break
+        return numpy.unique(labels, return_inverse=True)[1].reshape(-1)
+
+    def pagerank(self, damping=0.85, iterations=100, tolerance=1e-6):
+        """
+        Compute the PageRank of each node.
+
+        Arguments:
+            damping: The probability of following a relationship rather than jumping to a random node.
+            iterations: The maximum number of iterations.
+            tolerance: The total change of ranks under which iterations stop.
+
+        Returns:
+            An array of ranks, by node index, summing to 1.
+        """
+        numpy = self.numpy
+        count = self.node_count
+        if not count:
+            return numpy.empty(0)
+        ranks = numpy.full(count, 1.0 / count)
+        sources, targets = self.sources, self.indices
+        out_degree = self.out_degree()
+        dangling = out_degree == 0
+        weights = numpy.zeros(count)
+        weights[~dangling] = 1.0 / out_degree[~dangling]
+        for _ in range(iterations):
+            shared = ranks[dangling].sum() / count
+            spread = numpy.bincount(targets, weights=(ranks * weights)[sources], minlength=count)
+            new_ranks = (1 - damping) / count + damping * (spread + shared)
+            change = numpy.abs(new_ranks - ranks).sum()
+            ranks = new_ranks
+            if change < tolerance:
+                break
+        return ranks
+
+
+def project(node_query, rel_query, undirected=False, backend=None, **options):
+    """
+    Project a subgraph into a local `CSRGraph`.
+
+    Arguments:
+        node_query: A graph returning nodes (or their internal ids) in its first column.
+        rel_query: A graph returning the start and end nodes of relationships (or their ids)
+            in its first two columns.
+        undirected: Whether to also add each relationship in the reverse direction.
+        backend: The backend running the queries (defaults to the current one).
+        **options: Options passed to `Graph.stream()`.
+
+    Returns:
+        A `CSRGraph`.
+    """
+    (node_ids,) = node_query.stream(_first_columns(1), backend=backend, **options)
+    starts, ends = rel_query.stream(_first_columns(2), backend=backend, **options)
+    return CSRGraph.from_edges(node_ids, starts, ends, undirected=undirected)
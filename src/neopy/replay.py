@@ -0,0 +1,258 @@
+"""
+Record and replay query results.
+
+`RecordingBackend` wraps another backend and writes every executed
+query to a file: the rendered statement, its parameters, the returned
+records and the time it took. `ReplayBackend` serves these records
+back without a server, optionally simulating latency. Together they
+measure the client-side cost of neopy on real traffic, offline and
+reproducibly (see `neopy.benchmark`).
+
+Recordings are JSON lines, compressed with gzip when the file name ends with `.gz`.
+Nodes, relationships and paths are replayed as `neopy.memory` entities,
+and temporal values as `neo4j.time` ones.
+"""
+
+import datetime
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from . import backends, db
+from .backends import Backend
+from .cypher import TEMPORAL_TYPES
+from .exceptions import ReplayMiss
+from .memory import MemoryNode, MemoryPath, MemoryRecord, MemoryRelationship
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _encode_temporal(value):
+    import neo4j.time  # noqa: WPS433 (the driver is only needed for temporal values)
+
+    if isinstance(value, datetime.timedelta):
+        value = neo4j.time.Duration(days=value.days, seconds=value.seconds, microseconds=value.microseconds)
+    elif isinstance(value, datetime.datetime):
+        value = neo4j.time.DateTime.from_native(value)
+    elif isinstance(value, (datetime.date, datetime.time)):
+        value = getattr(neo4j.time, type(value).__name__.capitalize()).from_native(value)
+    return {"$temporal": [type(value).__name__, value.iso_format()]}
+
+
+def encode(value):
+    """
+    Convert a value to JSON-compatible data.
+
+    Arguments:
+        value: A record value or a parameter.
+
+    Returns:
+        JSON-compatible data. Records, nodes, relationships, paths and temporal values are tagged.
+    """
+    if isinstance(value, TEMPORAL_TYPES) or type(value).__module__ == "neo4j.time":
+        return _encode_temporal(value)
+    elif hasattr(value, "keys") and hasattr(value, "data"):
+        # Records, before tuples: driver records are tuples.
+        return {"$record": [list(value.keys()), encode(list(value.values()))]}
+    elif isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    elif isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    elif hasattr(value, "relationships") and hasattr(value, "nodes"):
+        return {"$path": [encode(list(value.nodes)), encode(list(value.relationships))]}
+    elif hasattr(value, "labels") and hasattr(value, "items"):
+        return {"$node": [value.id, sorted(value.labels), encode(dict(value.items()))]}
+    elif hasattr(value, "start_node") and hasattr(value, "items"):
+        start, end = encode(value.start_node), encode(value.end_node)
+        return {"$relationship": [value.id, value.type, start, end, encode(dict(value.items()))]}
+    elif value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def decode(data):
+    """
+    Convert JSON data back to a record value.
+
+    Arguments:
+        data: Data converted by `encode`.
+
+    Returns:
+        The value, with `neopy.memory` records and entities for records, nodes, relationships and paths,
+        and `neo4j.time` values for temporal values.
+    """
+    if isinstance(data, list):
+        return [decode(item) for item in data]
+    elif isinstance(data, dict):
+        if "$record" in data:
+            keys, values = data["$record"]
+            return MemoryRecord(keys, decode(values))
+        elif "$node" in data:
+            id_, labels, properties = data["$node"]
+            return MemoryNode(id_, labels, decode(properties))
+        elif "$relationship" in data:
+            id_, type_, start, end, properties = data["$relationship"]
+            return MemoryRelationship(id_, type_, decode(start), decode(end), decode(properties))
+        elif "$path" in data:
+            nodes, relationships = data["$path"]
+            return MemoryPath(decode(nodes), decode(relationships))
+        elif "$temporal" in data:
+            import neo4j.time  # noqa: WPS433 (the driver is only needed for temporal values)
+
+            type_, text = data["$temporal"]
+            return getattr(neo4j.time, type_).from_iso_format(text)
+        return {key: decode(item) for key, item in data.items()}
+    return data
+
+
+def entry_key(statement, parameters):
+    return statement, json.dumps(encode(parameters), sort_keys=True)
+
+
+class RecordingBackend(Backend):
+    """
+    Record the queries executed by another backend.
+
+    Arguments:
+        path: The recording file. Entries are appended to it.
+        backend: The backend executing the queries (defaults to the current one, when created).
+    """
+
+    def __init__(self, path, backend=None):
+        self.path = path
+        self.backend = backend or backends.current()
+        self.lock = threading.Lock()
+
+    def run(self, query, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        start = time.perf_counter()
+        records = self.backend.run(query, statement, parameters, access_mode=access_mode, **options)
+        self._record([self._entry(statement, parameters, records, time.perf_counter() - start)])
+        return records
+
+    def run_many(self, queries, access_mode=db.WRITE_ACCESS, **options):
+        start = time.perf_counter()
+        results = self.backend.run_many(queries, access_mode=access_mode, **options)
+        # The queries ran together: each is recorded with an equal share of the time.
+        seconds = (time.perf_counter() - start) / max(len(queries), 1)
+        entries = [
+            self._entry(statement, parameters, records, seconds)
+            for (_, statement, parameters), records in zip(queries, results)
+        ]
+        self._record(entries)
+        return results
+
+    def stream(self, query, statement, parameters, consumer, access_mode=db.WRITE_ACCESS, **options):
+        # The records read by the consumer are spooled to a temporary file, not kept in memory.
+        spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        keys = []
+
+        def recorded(records):
+            spool.seek(0)
+            spool.truncate()
+            keys.clear()
+            for record in records:
+                if not keys:
+                    keys.extend(record.keys())
+                else:
+                    spool.write(",")
+                spool.write(json.dumps(encode(list(record.values())), separators=(",", ":")))
+                yield record
+
+        def recording_consumer(records):
+            return consumer(recorded(records))
+
+        start = time.perf_counter()
+        try:
+            result = self.backend.stream(
+                query, statement, parameters, recording_consumer, access_mode=access_mode, **options
+            )
+            entry = self._entry(statement, parameters, [], time.perf_counter() - start)
+            # The records are the last list of the entry: they go between its head and its tail.
+            head, _, tail = json.dumps(dict(entry, keys=keys), separators=(",", ":")).rpartition('"records":[')
+            spool.seek(0)
+            with self.lock:
+                with _open(self.path, "a") as recording:
+                    recording.write(head + '"records":[')
+                    shutil.copyfileobj(spool, recording)
+                    recording.write(tail + "\n")
+        finally:
+            spool.close()
+        return result
+
+    def explain(self, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        return self.backend.explain(statement, parameters, access_mode=access_mode, **options)
+
+    def _entry(self, statement, parameters, records, seconds):
+        return {
+            "statement": statement,
+            "parameters": encode(parameters),
+            "keys": list(records[0].keys()) if records else [],
+            "records": [encode(list(record.values())) for record in records],
+            "seconds": seconds,
+        }
+
+    def _record(self, entries):
+        lines = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with self.lock:
+            with _open(self.path, "a") as recording:
+                recording.write(lines)
+
+
+class ReplayBackend(Backend):
+    """
+    Serve recorded records back, without a server.
+
+    A query recorded several times is answered with its recordings in order,
+    then with the last one.
+
+    Arguments:
+        path: The recording file.
+        latency: A delay added to each query, in seconds.
+        recorded_latency: Whether to also wait the time the recorded query took.
+    """
+
+    def __init__(self, path, latency=0.0, recorded_latency=False):
+        self.latency = latency
+        self.recorded_latency = recorded_latency
+        self.entries = defaultdict(list)
+        self.positions = defaultdict(int)
+        self.served = 0
+        self.lock = threading.Lock()
+        with _open(path, "r") as recording:
+            for line in recording:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = entry["statement"], json.dumps(entry["parameters"], sort_keys=True)
+                    self.entries[key].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
+
+    def rewind(self):
+        """Serve each query's recordings from the first one again."""
+        with self.lock:
+            self.positions.clear()
+            self.served = 0
+
+    def run(self, query, statement, parameters, access_mode=db.WRITE_ACCESS, **options):
+        key = entry_key(statement, parameters)
+        with self.lock:
+            entries = self.entries.get(key)
+            if not entries:
+                raise ReplayMiss("query was not recorded: %s" % statement)
+            position = self.positions[key]
+            self.positions[key] = min(position + 1, len(entries) - 1)
+            self.served += 1
+        entry = entries[position]
+        delay = self.latency + (entry["seconds"] if self.recorded_latency else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return [MemoryRecord(entry["keys"], decode(values)) for values in entry["records"]]
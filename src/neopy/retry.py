@@ -0,0 +1,88 @@
+"""Retry helpers for transient Neo4j errors."""
+
+import random
+import time
+
+
+def transient_errors():
+    """
+    Return the driver errors worth retrying: deadlocks, leader switches, connection resets.
+
+    Returns:
+        A tuple of exception classes.
+    """
+    from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+
+    return TransientError, ServiceUnavailable, SessionExpired
+
+
+class RetryPolicy:
+    """
+    Describe how many times, and how fast, a failing operation is retried.
+
+    Delays grow exponentially and are randomly spread by `jitter`
+    so that concurrent clients do not retry in lockstep.
+
+    Arguments:
+        max_retries: Maximum number of retries after the first attempt.
+        initial_delay: Delay before the first retry, in seconds.
+        multiplier: Factor applied to the delay after each retry.
+        max_delay: Upper bound for a single delay, in seconds.
+        jitter: Relative spread of each delay, between 0 and 1.
+        deadline: Maximum total time spent in attempts and delays, in seconds.
+        retry_on: Exception classes considered transient (defaults to `transient_errors()`).
+    """
+
+    def __init__(
+        self,
+        max_retries=5,
+        initial_delay=0.1,
+        multiplier=2.0,
+        max_delay=5.0,
+        jitter=0.2,
+        deadline=None,
+        retry_on=None,
+    ):
+        self.max_retries = max_retries
+        self.initial_delay = initial_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_on = tuple(retry_on) if retry_on is not None else None
+
+    def delays(self):
+        delay = self.initial_delay
+        for _ in range(self.max_retries):
+            spread = random.uniform(1 - self.jitter, 1 + self.jitter) if self.jitter else 1  # noqa: S311
+            yield min(delay, self.max_delay) * spread
+            delay *= self.multiplier
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call a function, retrying it on transient errors.
+
+        Arguments:
+            func: The function to call.
+            *args: Positional arguments passed to the function.
+            **kwargs: Keyword arguments passed to the function.
+
+        Returns:
+            The return value of the function.
+        """
+        retry_on = self.retry_on if self.retry_on is not None else transient_errors()
+        start = time.monotonic()
+        delays = self.delays()
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except retry_on:
+                delay = next(delays, None)
+                if delay is None:
+                    raise
+                if self.deadline is not None:
+                    remaining = self.deadline - (time.monotonic() - start)
+                    if remaining <= delay:
+                        raise
+                time.sleep(delay)
+
@@ -0,0 +1,105 @@
+"""
+Full-text and vector index queries.
+
+`fulltext` and `vector` start a query with a `CALL … YIELD` clause on
+an index. The yielded nodes can be used by the clauses that follow, in
+the same statement, and `hits` hydrates the results into `Node` objects:
+
+```python
+movies = search.fulltext("titles", "matrix", node="movie", top_k=10, min_score=0.5)
+actors = movies.match(Node("movie"), RelationshipFrom(RelationshipType("ACTED_IN")), Node("actor"))
+for movie, score in search.hits(search.vector("plots", embedding, top_k=5)):
+    print(movie.properties["title"], score)
+```
+
+Query strings, thresholds and embeddings are sent as parameters: the
+embedding as a list of floats.
+"""
+
+from .expressions import Variable
+from .graph import Graph
+from .traversal import IdentityMap
+
+FULLTEXT_NODES = "db.index.fulltext.queryNodes"
+VECTOR_NODES = "db.index.vector.queryNodes"
+
+
+def _name(node):
+    return getattr(node, "cypher_id", node)
+
+
+def _ranked(graph, node, score, top_k=None, min_score=None):
+    if min_score is not None:
+        graph = graph.where(Variable(score) >= min_score)
+    if top_k is not None:
+        graph = graph.with_(node, score).order_by(score, descending=True).limit(top_k)
+    return graph
+
+
+def fulltext(index, text, node="node", score="score", top_k=None, min_score=None, graph=None):
+    """
+    Query a full-text index of nodes.
+
+    Arguments:
+        index: The name of the index.
+        text: The query, in Lucene syntax.
+        node: The name (or `Node`) the matching nodes are yielded as.
+        score: The name the scores are yielded as.
+        top_k: The maximum number of nodes, with the best scores.
+        min_score: The minimum score of the nodes.
+        graph: The query to continue (defaults to a new one).
+
+    Returns:
+        The `Graph`, to continue with other clauses.
+    """
+    node = _name(node)
+    graph = (graph or Graph()).call(FULLTEXT_NODES, index, text, yields={node: "node", score: "score"}, read_only=True)
+    return _ranked(graph, node, score, top_k, min_score)
+
+
+def vector(index, embedding, top_k, node="node", score="score", min_score=None, graph=None):
+    """
+    Query a vector index of nodes, for the nearest neighbours of an embedding.
+
+    Arguments:
+        index: The name of the index.
+        embedding: The query embedding, as a sequence of numbers (a list, a NumPy array...).
+        top_k: The number of nearest neighbours.
+        node: The name (or `Node`) the nodes are yielded as.
+        score: The name the similarity scores are yielded as.
+        min_score: The minimum score of the nodes.
+        graph: The query to continue (defaults to a new one).
+
+    Returns:
+        The `Graph`, to continue with other clauses.
+    """
+    node = _name(node)
+    embedding = [float(value) for value in embedding]
+    yields = {node: "node", score: "score"}
+    graph = (graph or Graph()).call(VECTOR_NODES, index, top_k, embedding, yields=yields, read_only=True)
+    return _ranked(graph, node, score, min_score=min_score)
+
+
+def hits(graph, node="node", score="score", identity_map=None, **run_options):
+    """
+    Run a search and hydrate its nodes.
+
+    The nodes are loaded as a cohort of the identity map: traversing
+    from one of them prefetches the neighbourhoods of all (see `neopy.traversal`).
+
+    Arguments:
+        graph: The search query. Its nodes and scores are returned if it has no RETURN clause.
+        node: The name (or `Node`) of the column of nodes.
+        score: The name of the column of scores.
+        identity_map: The `IdentityMap` to load the nodes into (defaults to a new one).
+        **run_options: Options passed to `Graph.run()`.
+
+    Returns:
+        A list of `(node, score)` tuples.
+    """
+    node = _name(node)
+    if not graph.query.statements.returns:
+        graph = graph.return_(node, score)
+    identity_map = identity_map or IdentityMap()
+    cohort = []
+    return [(identity_map.node(record[node], cohort), record[score]) for record in graph.run(**run_options)]
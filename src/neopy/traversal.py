@@ -0,0 +1,171 @@
+"""
+Traversal of the graph from loaded nodes.
+
+`Node.neighbours()` and `Node.relationships()` load the neighbourhood of
+a node lazily. Nodes loaded together (by the same query, through an
+`IdentityMap`) form a cohort: asking one of them for its neighbours
+fetches the neighbours of the whole cohort, by internal id list, in a
+single query. Walking a subgraph level by level then costs one query per
+level instead of one per node, like `prefetch_related` in ORMs:
+
+```python
+identity_map = IdentityMap()
+people = identity_map.load(Graph().match(Node("p", NodeLabel("Person"))).return_("p"))
+for person in people:
+    friends = person.neighbours("friend", OUTGOING)  # one query for all people
+```
+
+The identity map keeps one `Node` per internal id, so that a node
+reached through several paths is the same object.
+"""
+
+from .functions import fn
+from .graph import Graph, Node, NodeLabel, Relationship, RelationshipFrom, RelationshipTo, RelationshipType
+
+OUTGOING = "out"
+INCOMING = "in"
+BOTH = "both"
+
+PATTERNS = {OUTGOING: RelationshipTo, INCOMING: RelationshipFrom, BOTH: Relationship}
+
+SOURCE_ALIAS = "_neopy_source"
+
+
+def _types(rel_type):
+    if rel_type is None:
+        return ()
+    names = [rel_type] if isinstance(rel_type, (str, RelationshipType)) else rel_type
+    return tuple(sorted(getattr(name, "name", name) for name in names))
+
+
+class IdentityMap:
+    """One `Node` and `Relationship` per internal id, with the neighbourhoods already loaded."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.relationships = {}
+        self.cohorts = {}
+        self.adjacency = {}
+
+    def __deepcopy__(self, memo):
+        # Nodes copied in cloned graphs stay attached to the same map.
+        return self
+
+    def node(self, entity, cohort=None):
+        """
+        Return the node of an entity returned by a query, creating it on first sight.
+
+        Arguments:
+            entity: A node returned by the driver or a backend.
+            cohort: The list of nodes loaded with it.
+
+        Returns:
+            A `Node`.
+        """
+        node = self.nodes.get(entity.id)
+        if node is None:
+            node = Node(*[NodeLabel(label) for label in sorted(entity.labels)], **dict(entity.items()))
+            node.internal_id = entity.id
+            node.identity_map = self
+            self.nodes[entity.id] = node
+        if cohort is not None and entity.id not in self.cohorts:
+            cohort.append(node)
+            self.cohorts[entity.id] = cohort
+        return node
+
+    def relationship(self, entity, start, end):
+        relationship = self.relationships.get(entity.id)
+        if relationship is None:
+            relationship = RelationshipTo(RelationshipType(entity.type), **dict(entity.items()))
+            relationship.internal_id = entity.id
+            relationship.start_node = start
+            relationship.end_node = end
+            self.relationships[entity.id] = relationship
+        return relationship
+
+    def adopt(self, node):
+        """
+        Attach a node created or loaded elsewhere.
+
+        Arguments:
+            node: A created node.
+
+        Returns:
+            The node known to the map for this internal id.
+        """
+        known = self.nodes.setdefault(node.internal_id, node)
+        known.identity_map = self
+        self.cohorts.setdefault(node.internal_id, [known])
+        return known
+
+    def load(self, graph, column=0, **run_options):
+        """
+        Run a query and load the nodes of one of its columns, as a cohort.
+
+        Arguments:
+            graph: The query.
+            column: The index or key of the column of nodes.
+            **run_options: Options passed to `Graph.run()`.
+
+        Returns:
+            The list of nodes.
+        """
+        cohort = []
+        return [self.node(record[column], cohort) for record in graph.run(**run_options)]
+
+    def cohort(self, node):
+        return self.cohorts.get(node.internal_id) or [node]
+
+    def prefetch(self, nodes, rel_type=None, direction=BOTH, **run_options):
+        """
+        Load the neighbourhoods of several nodes in one query.
+
+        Arguments:
+            nodes: Created nodes.
+            rel_type: A relationship type (or its name), a list of them, or `None` for all types.
+            direction: `OUTGOING`, `INCOMING` or `BOTH`.
+            **run_options: Options passed to `Graph.run()`.
+        """
+        nodes = [self.adopt(node) for node in nodes]
+        types = _types(rel_type)
+        source, target = Node("a"), Node("b")
+        pattern = PATTERNS[direction]("r", *[RelationshipType(name) for name in types])
+        graph = (
+            Graph()
+            .match(source, pattern, target)
+            .where(fn.Id(source).in_([node.internal_id for node in nodes]))
+            .return_(pattern, target, **{SOURCE_ALIAS: fn.Id(source)})
+        )
+        loaded = {node.internal_id: [] for node in nodes}
+        cohort = []
+        for record in graph.run(**run_options):
+            start = self.nodes[record[SOURCE_ALIAS]]
+            entity, neighbour = record["r"], self.node(record["b"], cohort)
+            outgoing = direction == OUTGOING or (direction == BOTH and entity.end_node.id == neighbour.internal_id)
+            relationship = self.relationship(entity, *((start, neighbour) if outgoing else (neighbour, start)))
+            loaded[start.internal_id].append((relationship, neighbour))
+        for internal_id, neighbourhood in loaded.items():
+            self.adjacency[(internal_id, types, direction)] = neighbourhood
+
+    def neighbourhood(self, node, rel_type=None, direction=BOTH):
+        """
+        Return the relationships and neighbours of a node, prefetching them for its whole cohort.
+
+        Arguments:
+            node: A created node.
+            rel_type: A relationship type (or its name), a list of them, or `None` for all types.
+            direction: `OUTGOING`, `INCOMING` or `BOTH`.
+
+        Returns:
+            A list of `(relationship, neighbour)` tuples.
+        """
+        node = self.adopt(node)
+        key = (node.internal_id, _types(rel_type), direction)
+        if key not in self.adjacency:
+            missing = [
+                member
+                for member in self.cohort(node)
+                if (member.internal_id, key[1], direction) not in self.adjacency
+            ]
+            self.prefetch(missing, rel_type, direction)
+        return self.adjacency[key]
@@ -37,3 +37,14 @@ def clone(func):
         return func(obj, *args, **kwargs)
 
     return new_func
+
+
+def chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
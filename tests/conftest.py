@@ -1 +1,90 @@
 """Configuration for the pytest test suite."""
+
+import pytest
+
+from neopy import db
+
+
+class StubRecord(dict):
+    def value(self, key):
+        return self[key]
+
+
+class StubResult(list):
+    def consume(self):
+        return None
+
+
+class StubTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and self.driver.commit_failures:
+            raise self.driver.commit_failures.pop(0)
+
+    def run(self, statement, parameters=None, **kwparameters):
+        self.driver.statements.append((statement, dict(parameters or {}, **kwparameters)))
+        failure = self.driver.failures.pop(0) if self.driver.failures else None
+        if failure is not None:
+            raise failure
+        return StubResult(self.driver.records.pop(0) if self.driver.records else [])
+
+
+class StubSession:
+    def __init__(self, driver, **config):
+        self.driver = driver
+        self.config = config
+        self.transaction_config = None
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def begin_transaction(self, **config):
+        self.transaction_config = config
+        return StubTransaction(self.driver)
+
+    def last_bookmark(self):
+        return "bookmark-%d" % len(self.driver.statements)
+
+    def close(self):
+        self.closed = True
+
+
+class StubDriver:
+    """A driver recording statements, returning canned records and raising injected failures (`None` to pass)."""
+
+    def __init__(self):
+        self.statements = []
+        self.failures = []
+        self.commit_failures = []
+        self.records = []
+        self.sessions = []
+
+    def session(self, **config):
+        session = StubSession(self, **config)
+        self.sessions.append(session)
+        return session
+
+
+@pytest.fixture()
+def stub_driver(monkeypatch):
+    """
+    Replace the Neo4j driver with a stub.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+
+    Returns:
+        A `StubDriver` instance.
+    """
+    driver = StubDriver()
+    monkeypatch.setattr(db, "driver", driver)
+    return driver
@@ -0,0 +1,110 @@
+"""Tests for the `bulk` module."""
+
+from decimal import Decimal
+
+import pytest
+from neo4j.exceptions import TransientError
+
+from neopy import bulk
+from neopy.graph import Node, NodeLabel, RelationshipTo, RelationshipType
+from neopy.retry import RetryPolicy
+from tests.conftest import StubRecord
+
+
+def test_partition_rounds_touch_disjoint_nodes():
+    """Batches of a same round never share a node."""
+    edges = [("you", name, ("you", name)) for name in "abcdef"]
+    edges += [(left, right, (left, right)) for left, right in zip("abcde", "bcdef")]
+    rounds = bulk.partition_edges(edges, batch_size=3, width=2)
+    assert sum(len(batch) for batches in rounds for batch in batches) == len(edges)
+    for batches in rounds:
+        node_sets = [{node for row in batch for node in row} for batch in batches]
+        for index, nodes in enumerate(node_sets):
+            for other in node_sets[index + 1 :]:
+                assert not nodes & other
+
+
+def test_loader_retries_transient_errors(stub_driver):
+    """
+    Write nodes and relationships, retrying deadlocks.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.failures.append(TransientError("deadlock"))
+    person = NodeLabel("Person")
+    you = Node(person, id=0, name="You")
+    friends = [Node(person, id=index, name=name) for index, name in enumerate(["Anna", "Julia"], 1)]
+    edges = [(you, RelationshipTo(RelationshipType("friend")), friend) for friend in friends]
+    loader = bulk.BulkLoader(batch_size=2, workers=2, retry=RetryPolicy(initial_delay=0))
+    report = loader.load([you, *friends], edges)
+    assert report.items == 5
+    assert len(stub_driver.statements) == 4
+    assert stub_driver.statements[-1][0] == (
+        "UNWIND $rows AS row MATCH (a:`Person` {id: row.start}) MATCH (b:`Person` {id: row.end}) "
+        "CREATE (a)-[r:friend]->(b) SET r = row.properties"
+    )
+    assert all(session.closed for session in stub_driver.sessions)
+
+
+def test_columns_are_sent_as_list_parameters(stub_driver):
+    """
+    Slice columns in batches of list parameters, returning the ids in row order.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    numpy = pytest.importorskip("numpy")
+    stub_driver.records.extend([[StubRecord({0: 10}), StubRecord({0: 11})], [StubRecord({0: 12})]])
+    columns = {"id": numpy.arange(3), "first name": ["Anna", "Julia", "You"]}
+    loader = bulk.BulkLoader(batch_size=2, workers=1)
+    report, ids = loader.load_columns([NodeLabel("Person")], columns, return_ids=True)
+    assert report.items == 3
+    assert ids.tolist() == [10, 11, 12]
+    statement, parameters = stub_driver.statements[1]
+    assert statement == (
+        "UNWIND range(0, $size - 1) AS i MERGE (n:`Person` {id: $c0[i]}) SET n.`first name` = $c1[i] RETURN id(n)"
+    )
+    assert parameters == {"size": 1, "c0": [2], "c1": ["You"]}
+    with pytest.raises(ValueError, match="key column"):
+        loader.load_columns(["Person"], {"name": ["Anna"]})
+
+
+def test_decimals_are_sent_as_floats(stub_driver):
+    """
+    Convert decimal properties in node rows, relationship rows and columns.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    person = NodeLabel("Person")
+    you, anna = Node(person, id=Decimal(1), score=Decimal("0.5")), Node(person, id=2)
+    friend = RelationshipTo(RelationshipType("friend"), since=Decimal(2010))
+    bulk.load([you, anna], [(you, friend, anna)], workers=1)
+    bulk.load_columns([person], {"id": [3], "score": [Decimal("1.5")]}, workers=1)
+    (_, nodes), (_, edges), (_, columns) = stub_driver.statements
+    assert nodes["rows"][0] == {"id": 1.0, "score": 0.5}
+    assert edges["rows"] == [{"start": 1.0, "end": 2, "properties": {"since": 2010.0}}]
+    assert columns["c1"] == [1.5]
+    assert all(type(value) is float for value in (*nodes["rows"][0].values(), columns["c1"][0]))
+
+
+def test_names_are_escaped(stub_driver):
+    """
+    Escape labels and keys in the statements, and close sessions after a failure.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.failures.append(ValueError("rejected"))
+    label = NodeLabel("Famous Person")
+    you, anna = Node(label, **{"user id": 1}), Node(label, **{"user id": 2})
+    with pytest.raises(ValueError, match="rejected"):
+        bulk.load([you], workers=1, key="user id")
+    bulk.load([], [(you, RelationshipTo(RelationshipType("friend")), anna)], workers=1, key="user id")
+    assert stub_driver.statements[0][0] == "UNWIND $rows AS row CREATE (n:`Famous Person`) SET n = row"
+    assert stub_driver.statements[1][0] == (
+        "UNWIND $rows AS row MATCH (a:`Famous Person` {`user id`: row.start}) "
+        "MATCH (b:`Famous Person` {`user id`: row.end}) CREATE (a)-[r:friend]->(b) SET r = row.properties"
+    )
+    assert all(session.closed for session in stub_driver.sessions)
@@ -0,0 +1,86 @@
+"""Tests for the `cache` module."""
+
+import pytest
+
+from neopy import bulk, cache, deferred
+from neopy.graph import Graph, Node, NodeLabel
+from tests.conftest import StubRecord
+
+
+@pytest.fixture()
+def query_cache():
+    """
+    Enable a result cache for the duration of a test.
+
+    Yields:
+        The enabled cache.
+    """
+    yield cache.enable(cache.QueryCache(cache.MemoryBackend(maxsize=2)))
+    cache.disable()
+
+
+def test_reads_are_cached_until_a_write_touches_their_label(stub_driver, query_cache):
+    """
+    Serve identical reads from the cache, and evict them on writes.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+        query_cache: The enabled cache.
+    """
+    person = NodeLabel("Person")
+    read = Graph().match(Node("you", person)).return_("you")
+    read.run()
+    read.run()
+    assert (query_cache.hits, query_cache.misses) == (1, 1)
+
+    Graph().create(Node("db", NodeLabel("Database"))).run()
+    read.run()
+    assert query_cache.hits == 2
+
+    Graph().create(Node("anna", person)).run()
+    read.run()
+    assert query_cache.misses == 2
+    assert len(stub_driver.statements) == 4
+
+
+def test_memory_backend_is_bounded_and_expires():
+    """Evict the least recently used entries, and expired ones."""
+    backend = cache.MemoryBackend(maxsize=2)
+    backend.set("a", [1], {"A"}, ttl=60)
+    backend.set("b", [2], {"B"}, ttl=60)
+    backend.get("a")
+    backend.set("c", [3], {"C"}, ttl=0)
+    assert backend.get("b") is None
+    assert backend.get("a") == [1]
+    assert backend.get("c") is None
+    assert len(backend) == 1
+
+
+def test_key_keeps_string_literals():
+    """Collapse whitespace between tokens, but not inside string literals."""
+    query_cache = cache.QueryCache()
+    spaced = query_cache.key('MATCH  (n {name: "a  b"})\n RETURN n;')
+    assert spaced == query_cache.key('MATCH (n {name: "a  b"}) RETURN n')
+    assert spaced != query_cache.key('MATCH (n {name: "a b"}) RETURN n')
+
+
+def test_bulk_and_deferred_writes_invalidate(stub_driver, query_cache):
+    """
+    Evict the cached reads of the labels written by bulk loads and deferred writes.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+        query_cache: The enabled cache.
+    """
+    person = NodeLabel("Person")
+    read = Graph().match(Node("you", person)).return_("you")
+    read.run()
+    bulk.load([Node(person, id=1)], workers=1)
+    read.run()
+    bulk.load_columns([person], {"id": [2]}, workers=1)
+    read.run()
+    stub_driver.records.append([StubRecord({"n0": [1]})])
+    with deferred.deferred_writes():
+        Node(person, name="Anna").create()
+    read.run()
+    assert (query_cache.hits, query_cache.misses) == (0, 4)
@@ -2,7 +2,8 @@
 
 import pytest
 
-from neopy import cli
+from neopy import backends, cli
+from neopy.memory import InMemoryBackend
 
 
 def test_main():
@@ -21,3 +22,60 @@ def test_show_help(capsys):
         cli.main(["-h"])
     captured = capsys.readouterr()
     assert "neopy" in captured.out
+
+
+def test_query_streams_jsonl(tmp_path, capsys, monkeypatch):
+    """
+    Run a builder file and write its records as JSON lines, after the existing output.
+
+    Arguments:
+        tmp_path: A temporary directory.
+        capsys: Pytest fixture to capture output.
+        monkeypatch: Pytest fixture to redirect the standard output.
+    """
+    builder = tmp_path / "builder.py"
+    builder.write_text(
+        "from neopy.graph import Graph, Node, NodeLabel\n"
+        "graph = Graph().create(Node('p', NodeLabel('Person'), name='Anna')).return_('p.name')\n"
+    )
+    with backends.using(InMemoryBackend()):
+        assert cli.main(["query", "--file", str(builder)]) == 0
+    assert capsys.readouterr().out == '{"p.name": "Anna"}\n'
+
+    output = tmp_path / "out.jsonl"
+    output.write_text("previous\n")
+    with open(output, "a") as stream:
+        monkeypatch.setattr("sys.stdout", stream)
+        with backends.using(InMemoryBackend()):
+            assert cli.main(["query", "--file", str(builder)]) == 0
+        monkeypatch.undo()
+    assert output.read_text() == 'previous\n{"p.name": "Anna"}\n'
+
+
+def test_import_then_bench(tmp_path, capsys, stub_driver):
+    """
+    Import nodes and relationships from files, and run a benchmark scenario.
+
+    Arguments:
+        tmp_path: A temporary directory.
+        capsys: Pytest fixture to capture output.
+        stub_driver: A stub Neo4j driver.
+    """
+    nodes = tmp_path / "people.csv"
+    nodes.write_text("id,name,zip\n1,Anna,007\n2,Julia,1e3\n")
+    edges = tmp_path / "friends.jsonl"
+    edges.write_text('{"start": 1, "end": 2, "since": 2010}\n')
+    options = ["--label", "Person", "--type", "friend", "--workers", "1"]
+    assert cli.main(["import", "--nodes", str(nodes), "--edges", str(edges), *options]) == 0
+    (_, node_parameters), (edge_statement, edge_parameters) = stub_driver.statements
+    assert node_parameters == {
+        "rows": [{"id": 1, "name": "Anna", "zip": "007"}, {"id": 2, "name": "Julia", "zip": "1e3"}],
+    }
+    assert edge_parameters == {"rows": [{"start": 1, "end": 2, "properties": {"since": 2010}}]}
+    assert capsys.readouterr().out.startswith("3 items")
+
+    assert cli.main(["bench", "render", "--operations", "10", "--warmup", "0"]) == 0
+    assert capsys.readouterr().out.startswith("render: 10 operations")
+
+    assert cli.main(["bench", "create", "--target", "bolt", "--operations", "2", "--warmup", "0"]) == 0
+    assert stub_driver.statements[-1] == ("MATCH (n:NeopyBench) DETACH DELETE n", {})
@@ -0,0 +1,44 @@
+"""Tests for the `columnar` module."""
+
+import pytest
+
+from neopy.columnar import ColumnBuffer
+from neopy.graph import Graph, Node, NodeLabel
+from neopy.memory import InMemoryBackend
+
+numpy = pytest.importorskip("numpy")
+
+
+def test_buffers_promote_their_type():
+    """Type columns after their values, promoting them on nulls and mixed values."""
+    values = {
+        "int64": [1, 2, 3],
+        "float64": [1, None, 2.5],
+        "bool": [True, False],
+        "object": ["a", 1, None],
+    }
+    for dtype, column in values.items():
+        buffer = ColumnBuffer(capacity=1)
+        for value in column:
+            buffer.append(value)
+        assert buffer.array().dtype == numpy.dtype(dtype)
+        assert len(buffer) == len(column)
+    buffer = ColumnBuffer()
+    buffer.append(None)
+    buffer.append(7)
+    assert numpy.isnan(buffer.array()[0])
+    assert buffer.array()[1] == 7
+
+
+def test_graph_to_columns_and_numpy():
+    """Stream records into typed columns, with internal ids for nodes."""
+    backend = InMemoryBackend()
+    for index in range(3):
+        backend.store.create_node(["Person"], {"name": "P%d" % index, "age": 20 + index})
+    graph = Graph().match(Node("p", NodeLabel("Person"))).return_("p", "p.name", "p.age").order_by("p.age")
+    columns = graph.to_columns(backend=backend)
+    assert columns["p"].dtype == numpy.int64
+    assert list(columns["p.name"]) == ["P0", "P1", "P2"]
+    assert columns["p.age"].tolist() == [20, 21, 22]
+    array = graph.to_numpy(backend=backend)
+    assert array["p.age"].sum() == 63
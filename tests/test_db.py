@@ -0,0 +1,33 @@
+"""Tests for the `db` module."""
+
+from neopy import db
+from neopy.graph import Graph, Node, NodeLabel
+
+
+def test_read_only_queries_are_routed_to_readers(stub_driver):
+    """
+    Route MATCH/RETURN queries with read access, and writes with write access.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    person = NodeLabel("Person")
+    Graph().match(Node("you", person)).return_("you").run()
+    Graph().create(Node("you", person)).run()
+    modes = [session.config["default_access_mode"] for session in stub_driver.sessions]
+    assert modes == [db.READ_ACCESS, db.WRITE_ACCESS]
+
+
+def test_session_carries_bookmarks(stub_driver):
+    """
+    Pass the bookmark of a write to the following read.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    session = db.Session()
+    Graph().create(Node("you")).run(session=session)
+    assert session.bookmarks == ["bookmark-1"]
+    Graph().match(Node("you")).return_("you").run(session=session)
+    assert not stub_driver.sessions[0].config["bookmarks"]
+    assert stub_driver.sessions[1].config["bookmarks"] == ["bookmark-1"]
@@ -0,0 +1,92 @@
+"""Tests for the `deferred` module."""
+
+import time
+
+import pytest
+
+from neopy import backends, deferred
+from neopy.exceptions import CypherError
+from neopy.graph import Node, NodeLabel, RelationshipTo, RelationshipType
+from neopy.memory import InMemoryBackend
+from tests.conftest import StubRecord
+
+
+def test_writes_are_batched_until_an_id_is_read(stub_driver):
+    """
+    Register creations and connections, then flush them in one statement.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.records.append([StubRecord({"n0": [10, 11, 12], "r0": [20, 21]})])
+    person = NodeLabel("Person")
+    with deferred.deferred_writes(max_delay=60) as buffer:
+        you = Node(person, name="You").create()
+        friends = []
+        for name in ("Anna", "Julia"):
+            friends.append(you.connect(RelationshipTo(RelationshipType("friend")), Node(person, name=name)))
+        assert len(buffer) == 5
+        assert not stub_driver.statements
+        assert friends[1].internal_id == 21
+    assert you.internal_id == 10
+    assert friends[0].start_node is you
+    ((statement, parameters),) = stub_driver.statements
+    assert statement == (
+        "CALL { UNWIND $n0 AS row CREATE (n:`Person`) SET n = row RETURN collect(n) AS n0 } WITH n0 AS nodes, n0 "
+        "CALL { WITH nodes UNWIND $r0 AS row WITH nodes[row.start] AS a, nodes[row.end] AS b, row "
+        "CREATE (a)-[r:`friend`]->(b) SET r = row.properties RETURN collect(id(r)) AS r0 } "
+        "RETURN [n IN n0 | id(n)] AS n0, r0"
+    )
+    assert [row["name"] for row in parameters["n0"]] == ["You", "Anna", "Julia"]
+    assert parameters["r0"] == [{"start": 0, "end": 1, "properties": {}}, {"start": 0, "end": 2, "properties": {}}]
+
+
+def test_size_threshold_flushes(stub_driver):
+    """
+    Flush as soon as enough writes are pending.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.records.append([StubRecord({"n0": [10, 11]})])
+    with deferred.deferred_writes(max_size=2):
+        Node(NodeLabel("Person"), name="Anna").create()
+        assert not stub_driver.statements
+        Node(NodeLabel("Person"), name="Julia").create()
+        assert len(stub_driver.statements) == 1
+    assert deferred.current() is None
+
+
+def test_delay_threshold_flushes(stub_driver):
+    """
+    Flush the pending writes once they are old enough, and connect them to existing nodes.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.records.append([StubRecord({"n0": [11], "r0": [20]})])
+    you = Node(NodeLabel("Person"), name="You")
+    you.internal_id = 10
+    with deferred.deferred_writes(max_delay=0.01):
+        you.connect(RelationshipTo(RelationshipType("friend")), Node(NodeLabel("Person"), name="Anna"))
+        deadline = time.monotonic() + 5
+        while not stub_driver.statements and time.monotonic() < deadline:
+            time.sleep(0.01)
+        ((statement, parameters),) = stub_driver.statements
+    assert statement.startswith("CALL { UNWIND $existing AS i MATCH (n) WHERE id(n) = i")
+    assert "WITH existing + n0 AS nodes, n0" in statement
+    assert parameters["existing"] == [10]
+    assert parameters["r0"] == [{"start": 0, "end": 1, "properties": {}}]
+
+
+def test_timer_errors_are_raised_later():
+    """Raise the error of a flush from the timer thread from the next call, here when the block exits."""
+    with pytest.raises(CypherError, match="only runs queries built with neopy"):
+        with backends.using(InMemoryBackend()):
+            with deferred.deferred_writes(max_delay=0.01) as buffer:
+                node = Node(NodeLabel("Person"), name="Anna").create()
+                deadline = time.monotonic() + 5
+                while buffer.timer is not None and time.monotonic() < deadline:
+                    time.sleep(0.01)
+    with pytest.raises(CypherError):
+        node.internal_id  # noqa: B018 (the failed write is raised by its placeholder too)
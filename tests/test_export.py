@@ -0,0 +1,111 @@
+"""Tests for the `export` module."""
+
+import csv
+import datetime
+import gzip
+import json
+
+import pytest
+
+from neopy import export
+from neopy.graph import Graph, Node, NodeLabel
+from neopy.memory import InMemoryBackend
+
+
+@pytest.fixture()
+def people():
+    """
+    Return a query over five people, in an in-memory backend.
+
+    Returns:
+        The query and its backend.
+    """
+    backend = InMemoryBackend()
+    for index in range(5):
+        backend.store.create_node(["Person"], {"name": "P%d" % index, "age": 20 + index})
+    graph = Graph().match(Node("p", NodeLabel("Person"))).return_("p", "p.age").order_by("p.age")
+    return graph, backend
+
+
+def test_split_jsonl_export(people, tmp_path):
+    """
+    Split an export in gzipped JSON lines files.
+
+    Arguments:
+        people: A query and its backend.
+        tmp_path: A temporary directory.
+    """
+    graph, backend = people
+    report = export.export(graph, tmp_path / "people.jsonl.gz", flush_size=2, max_records=2, backend=backend)
+    assert report.records == 5
+    assert [path.rsplit("/", 1)[-1] for path in report.paths] == [
+        "people-00000.jsonl.gz",
+        "people-00001.jsonl.gz",
+        "people-00002.jsonl.gz",
+    ]
+    with gzip.open(report.paths[0], "rt") as stream:
+        first = json.loads(stream.readline())
+    assert first["p.age"] == 20
+    assert first["p"] == {"name": "P0", "age": 20}
+
+
+def test_csv_export(people, tmp_path):
+    """
+    Export records to CSV, nested values as JSON.
+
+    Arguments:
+        people: A query and its backend.
+        tmp_path: A temporary directory.
+    """
+    graph, backend = people
+    path = tmp_path / "people.csv"
+    export.export(graph, path, backend=backend)
+    with open(path) as stream:
+        rows = list(csv.reader(stream))
+    assert rows[0] == ["p", "p.age"]
+    assert [row[1] for row in rows[1:]] == ["20", "21", "22", "23", "24"]
+    with pytest.raises(ValueError, match="guess"):
+        export.Exporter(tmp_path / "people.txt")
+
+
+def test_values_are_written_as_plain_data():
+    """Export entities as property maps, and temporal values as ISO-8601 strings."""
+    neo4j_time = pytest.importorskip("neo4j.time")
+    backend = InMemoryBackend()
+    you = backend.store.create_node(["Person"], {"name": "You"})
+    anna = backend.store.create_node(["Person"], {"name": "Anna"})
+    friend = backend.store.create_relationship("FRIEND", you, anna, {"since": 2010})
+    born = datetime.datetime(2000, 1, 2, 3, 4, 5)
+    values = [you, friend, born, born.date(), datetime.timedelta(days=1, seconds=1.5), neo4j_time.Date(2010, 1, 1)]
+    assert export.serialize(values) == [
+        {"name": "You"},
+        {"since": 2010},
+        "2000-01-02T03:04:05",
+        "2000-01-02",
+        "P1DT1.5S",
+        "2010-01-01",
+    ]
+
+
+def test_parquet_schema_skips_null_chunks(tmp_path):
+    """
+    Infer the type of a column from its first values, even after chunks of nulls.
+
+    Arguments:
+        tmp_path: A temporary directory.
+    """
+    pyarrow = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+    backend = InMemoryBackend()
+    for index in range(4):
+        backend.store.create_node(["Person"], {"rank": index, "score": index / 2 if index > 1 else None})
+    graph = Graph().match(Node("p", NodeLabel("Person"))).return_("p.rank", "p.score").order_by("p.rank")
+    path = tmp_path / "people.parquet"
+    export.export(graph, path, flush_size=2, backend=backend)
+    table = parquet.read_table(path)
+    assert table.schema.field("p.score").type == pyarrow.float64()
+    assert table.column("p.score").to_pylist() == [None, None, 1.0, 1.5]
+
+    schema = pyarrow.schema([("p.rank", pyarrow.int32()), ("p.score", pyarrow.float32())])
+    export.export(graph, path, flush_size=2, backend=backend, schema=schema)
+    assert parquet.read_table(path).schema == schema
@@ -0,0 +1,45 @@
+"""Tests for the `expressions` module."""
+
+import pytest
+
+from neopy.exceptions import CypherError
+from neopy.functions import fn
+from neopy.graph import Graph, Node, NodeLabel
+
+
+def test_operators_render_parameterized_cypher():
+    """Build conditions with operators, and pass literals as parameters."""
+    person = Node("p", NodeLabel("Person"))
+    graph = Graph().match(person).where((person.prop.age > 30) | (person.prop.name == "Anna"), p__city="Paris")
+    graph = graph.return_(older=person.prop.age + 1)
+    text, parameters = graph.query.compile()
+    assert text == "MATCH (p:Person) WHERE (p.age > $p0 OR p.name = $p1) AND p.city = $p2 RETURN p.age + $p3 AS older;"
+    assert parameters == {"p0": 30, "p1": "Anna", "p2": "Paris", "p3": 1}
+    assert graph.query.compile() == (text, parameters)
+
+
+def test_expressions_are_immutable_and_hashable():
+    """Reuse expressions: building from them never changes them."""
+    identifier = fn.Id("n")
+    first = identifier.eq(1)
+    second = identifier.eq(2)
+    assert identifier.render() == "id(n)"
+    assert (first.render(), second.render()) == ("id(n) = 1", "id(n) = 2")
+    assert first.shape == second.shape == "id(n) = {0}"
+    assert len({first, fn.Id("n").eq(1), second}) == 2
+    with pytest.raises(AttributeError):
+        identifier.name = "count"
+
+
+def test_parentheses_follow_precedence():
+    """Parenthesize operands binding less strongly than their operator."""
+    n = Node("n")
+    assert ((n.prop.a + n.prop.b) * 2).render() == "(n.a + n.b) * 2"
+    assert (n.prop.a - (n.prop.b - 1)).render() == "n.a - (n.b - 1)"
+    assert (~(n.prop.a.is_null() & (n.prop.b >= 1))).render() == "NOT (n.a IS NULL AND n.b >= 1)"
+
+
+def test_invalid_lookup():
+    """Refuse lookups with an unknown operator."""
+    with pytest.raises(CypherError):
+        Graph().where(n__age__older=3)
@@ -0,0 +1,22 @@
+"""Tests for the `functions` module."""
+
+from neopy.functions import Projection, Property, fn
+from neopy.graph import Graph, Node, NodeLabel, Relationship, RelationshipType
+
+
+def test_return_aggregates_with_aliases():
+    """Render aggregates and aliases in the RETURN clause."""
+    user = Node("user", NodeLabel("User"))
+    friend = Node("friend", NodeLabel("User"))
+    graph = Graph().match(user, Relationship(RelationshipType("friends_with")), friend)
+    graph = graph.return_(user, number_of_friends=fn.Count(friend), names=fn.Collect(Property(friend, "name")))
+    assert graph.query.render() == (
+        "MATCH (user:User)-[:friends_with]-(friend:User) "
+        "RETURN user, count(friend) AS number_of_friends, collect(friend.name) AS names;"
+    )
+
+
+def test_return_distinct_projections():
+    """Render map projections in a RETURN DISTINCT clause."""
+    graph = Graph().match(Node("n")).return_distinct(Projection("n", "name", "age", total=fn.Sum("n.score", True)))
+    assert graph.query.render() == "MATCH (n) RETURN DISTINCT n{.name, .age, total: sum(DISTINCT n.score)};"
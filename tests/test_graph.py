@@ -0,0 +1,123 @@
+"""Tests for the `graph` module."""
+
+import datetime
+from decimal import Decimal
+
+import pytest
+from neo4j.spatial import CartesianPoint, WGS84Point
+
+from neopy.exceptions import CypherError
+from neopy.functions import fn
+from neopy.graph import Graph, Node, NodeLabel, Relationship, RelationshipTo, RelationshipType
+
+
+def test_shortest_path_clause():
+    """Render a named shortest path with a bounded expansion."""
+    friend = Relationship(RelationshipType("friend")).range(None, 5)
+    graph = Graph().shortest_path("path", Node("you"), friend, Node("expert", NodeLabel("Person"))).return_("path")
+    assert graph.query.render() == "MATCH path = shortestPath((you)-[:friend*..5]-(expert:Person)) RETURN path;"
+    assert graph.query.matched_ids == {"path", "you", "expert"}
+
+
+def test_all_shortest_paths_clause():
+    """Render all shortest paths."""
+    graph = Graph().all_shortest_paths("p", Node("a"), RelationshipTo().length(3), Node("b")).return_("p")
+    assert graph.query.render() == "MATCH p = allShortestPaths((a)-[*3]->(b)) RETURN p;"
+
+
+def test_expansions_need_an_upper_bound():
+    """Refuse unbounded expansions unless explicitly allowed."""
+    with pytest.raises(CypherError):
+        Relationship().range(2, None)
+    with pytest.raises(CypherError):
+        Relationship().length("*")
+    assert Relationship().range(0, None, unbounded=True).as_cypher() == "-[*0..]-"
+
+
+def test_clauses_keep_their_order():
+    """Render OPTIONAL MATCH, WITH pipelines and subqueries in the order they were added."""
+    user_label = NodeLabel("User")
+    user = Node("user", user_label)
+    friend = Node("friend", user_label)
+    friends_with = Relationship(RelationshipType("friends_with"))
+    popular = (
+        Graph()
+        .match(user)
+        .where(user.prop.active == True)  # noqa: E712 (builds a comparison)
+        .optional_match(user, friends_with, friend)
+        .with_(user, friends=fn.Count(friend))
+        .order_by("friends", descending=True)
+        .limit(10)
+        .where("friends > 2")
+    )
+    subquery = Graph().with_(user).match(user, RelationshipTo(RelationshipType("posted")), Node("post")).return_(
+        posts=fn.Count("post")
+    )
+    graph = popular.call_subquery(subquery).return_(user.prop.name, "friends", "posts")
+    assert graph.query.render() == (
+        "MATCH (user:User) WHERE user.active = $p0 "
+        "OPTIONAL MATCH (user:User)-[:friends_with]-(friend:User) "
+        "WITH user, count(friend) AS friends ORDER BY friends DESC LIMIT $limit WHERE friends > 2 "
+        "CALL { WITH user MATCH (user:User)-[:posted]->(post) RETURN count(post) AS posts } "
+        "RETURN user.name, friends, posts;"
+    )
+    assert graph.query.is_read_only()
+
+
+def test_return_is_rendered_last():
+    """Merge RETURN clauses at the end, whatever the order they were added in."""
+    graph = Graph()
+    for index, name in enumerate(["Anna", "Julia"]):
+        graph = graph.create(Node("id%d" % index, name=name)).return_("id%d" % index)
+    assert graph.limit(1).query.render() == (
+        'CREATE (id0 {name: "Anna"}) CREATE (id1 {name: "Julia"}) RETURN id0, id1 LIMIT $limit;'
+    )
+
+
+def test_prepared_query_is_rebound():
+    """Keep the rendered text of a prepared query while rebinding its parameters, until a clause is added."""
+    person = Node("p", NodeLabel("Person"))
+    unprepared = Graph().match(person).where("p.id = $id").bind(id=1).return_(person.prop.name)
+    graph = unprepared.prepare()
+    assert unprepared.query.prepared is None
+    assert graph.rebind(id=2).query.compile() == ("MATCH (p:Person) WHERE p.id = $id RETURN p.name;", {"id": 2})
+    with pytest.raises(CypherError):
+        graph.rebind(name="Anna")
+    limited = graph.limit(5)
+    assert limited.query.prepared is None
+    assert limited.query.compile()[0].endswith("RETURN p.name LIMIT $limit;")
+
+
+def test_temporal_and_spatial_values_are_parameters():
+    """Pass temporal values, points and decimals as driver-native parameters, and inline other values."""
+    moment = datetime.datetime(2020, 1, 2, 3, 4, tzinfo=datetime.timezone.utc)
+    place = Node("p", NodeLabel("Place"), name="Paris", location=WGS84Point((2.35, 48.85)), price=Decimal("1.5"))
+    graph = Graph().match(place).where(place.prop.visited >= moment).return_(place)
+    statement, parameters = graph.query.compile()
+    assert statement == 'MATCH (p:Place {name: "Paris", location: $p0, price: $p1}) WHERE p.visited >= $p2 RETURN p;'
+    assert parameters == {"p0": WGS84Point((2.35, 48.85)), "p1": 1.5, "p2": moment}
+    assert isinstance(parameters["p1"], float)
+
+    inline = Node("n", day=datetime.date(2020, 1, 2), at=datetime.time(10, 30), point=CartesianPoint((1, 2)))
+    assert inline.as_cypher() == (
+        '(n {day: date("2020-01-02"), at: localtime("10:30:00"), point: point({x: 1.0, y: 2.0, srid: 7203})})'
+    )
+    assert fn.Distance("a.location", "b.location").render() == "point.distance(a.location, b.location)"
+
+
+def test_subquery_parameters_do_not_overwrite_outer_ones():
+    """Rename the parameters of a subquery that collide with the outer ones, and refuse bound literal names."""
+    inner = Graph().with_("user").match(Node("user"), RelationshipTo(), Node("post")).return_("post").limit(1)
+    outer = Graph().match(Node("user")).limit(10).call_subquery(inner).return_("user", "post")
+    statement, parameters = outer.query.compile()
+    assert statement == (
+        "MATCH (user) CALL { WITH user MATCH (user)-[]->(post) RETURN post LIMIT $limit1 } "
+        "RETURN user, post LIMIT $limit;"
+    )
+    assert parameters == {"limit": 10, "limit1": 1}
+    assert inner.query.compile()[1] == {"limit": 1}
+
+    adults = Graph().match(Node("n")).where(Node("n").prop.age > 18).return_("n")
+    assert adults.bind(p0="bound").query.compile()[1] == {"p0": "bound", "p1": 18}
+    with pytest.raises(CypherError):
+        adults.prepare().bind(p0="bound").query.compile()
@@ -0,0 +1,36 @@
+"""Tests for import-time costs."""
+
+import os
+import subprocess  # noqa: S404
+import sys
+
+# Imported with the neo4j package made unimportable.
+SCRIPT = """
+import sys
+import time
+
+sys.modules["neo4j"] = None
+start = time.perf_counter()
+import neopy.bulk, neopy.cache, neopy.cli, neopy.db, neopy.export, neopy.graph, neopy.pagination, neopy.sync
+elapsed = time.perf_counter() - start
+
+from neopy.graph import Graph, Node
+print(Graph().match(Node("n")).where(n__age__gt=3).return_("n").query.render())
+print(elapsed)
+"""
+
+# Generous bound: without the driver, importing neopy only costs a few milliseconds.
+MAX_IMPORT_SECONDS = 0.5
+
+
+def test_queries_are_built_without_the_driver():
+    """Import neopy and render queries without importing the driver, quickly."""
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SCRIPT],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        env=os.environ,
+    ).stdout.splitlines()
+    assert output[0] == "MATCH (n) WHERE n.age > $p0 RETURN n;"
+    assert float(output[1]) < MAX_IMPORT_SECONDS
@@ -0,0 +1,98 @@
+"""Tests for the `memory` module."""
+
+import datetime
+
+import pytest
+from neo4j.spatial import WGS84Point
+
+from neopy import backends
+from neopy.exceptions import CypherError
+from neopy.functions import fn
+from neopy.graph import Graph, Node, NodeLabel, Relationship, RelationshipTo, RelationshipType
+from neopy.memory import InMemoryBackend, MemoryStore
+
+
+@pytest.fixture()
+def memory():
+    """
+    Use an in-memory backend with a small social graph.
+
+    Yields:
+        The backend.
+    """
+    backend = InMemoryBackend()
+    store = backend.store
+    anna = store.create_node(["Person"], {"name": "Anna", "age": 31})
+    bob = store.create_node(["Person"], {"name": "Bob", "age": 25})
+    carl = store.create_node(["Person"], {"name": "Carl"})
+    store.create_relationship("friend", anna, bob, {})
+    store.create_relationship("friend", bob, carl, {})
+    with backends.using(backend):
+        yield backend
+
+
+def test_match_where_return(memory):
+    """Filter matched nodes with expressions and return ordered properties."""
+    person = Node("p", NodeLabel("Person"))
+    records = Graph().match(person).where(person.prop.age >= 18).return_("p.name").order_by("p.name").run()
+    assert [record["p.name"] for record in records] == ["Anna", "Bob"]
+
+
+def test_variable_length_and_shortest_path(memory):
+    """Follow directed relationships over several hops."""
+    friend = RelationshipTo(RelationshipType("friend")).range(1, 2)
+    graph = Graph().match(Node("a", name="Anna"), friend, Node("b", NodeLabel("Person"))).return_("b.name")
+    assert sorted(record[0] for record in graph.run()) == ["Bob", "Carl"]
+
+    path = Graph().shortest_path("path", Node("a", name="Anna"), Relationship().range(None, 5), Node("c", name="Carl"))
+    (record,) = path.return_("path").run()
+    assert [node["name"] for node in record["path"].nodes] == ["Anna", "Bob", "Carl"]
+
+
+def test_aggregates_and_optional_match(memory):
+    """Group rows by the non-aggregated projections, keeping unmatched rows of OPTIONAL MATCH."""
+    person = Node("p", NodeLabel("Person"))
+    graph = (
+        Graph()
+        .match(person)
+        .optional_match(person, RelationshipTo(RelationshipType("friend")), Node("f"))
+        .return_(name="p.name", friends=fn.Count("f"))
+        .order_by("name")
+    )
+    assert [record.values() for record in graph.run()] == [["Anna", 1], ["Bob", 1], ["Carl", 0]]
+
+
+def test_create_and_connect(memory):
+    """Create nodes and relationships through the node helpers."""
+    dave = Node(NodeLabel("Person"), name="Dave").create()
+    anna = Graph().match(Node("a", name="Anna")).return_("a").run()[0]["a"]
+    erin = Node(NodeLabel("Person"), name="Erin")
+    dave.connect(RelationshipTo(RelationshipType("friend")), erin)
+    assert memory.store.nodes[dave.internal_id]["name"] == "Dave"
+    assert memory.store.nodes[erin.internal_id]["name"] == "Erin"
+    assert anna.id not in {dave.internal_id, erin.internal_id}
+    assert len(memory.store.outgoing[dave.internal_id]) == 1
+
+
+def test_failed_query_is_rolled_back():
+    """Remove the entities created by a failing query."""
+    backend = InMemoryBackend(MemoryStore())
+    graph = Graph().create(Node("n", NodeLabel("Person"))).return_("n", "missing")
+    with pytest.raises(CypherError):
+        graph.run(backend=backend)
+    assert not backend.store.nodes
+
+
+def test_temporal_and_distance_predicates():
+    """Compare dates and measure geographic distances in memory."""
+    backend = InMemoryBackend()
+    paris, lyon = WGS84Point((2.3522, 48.8566)), WGS84Point((4.8357, 45.764))
+    backend.store.create_node(["Place"], {"name": "Paris", "location": paris, "since": datetime.date(2020, 1, 1)})
+    backend.store.create_node(["Place"], {"name": "Lyon", "location": lyon, "since": datetime.date(2021, 6, 1)})
+    place = Node("p", NodeLabel("Place"))
+    near = Graph().match(place).where(fn.Distance(place.prop.location, paris) < 1000).return_(place.prop.name)
+    assert [record["p.name"] for record in near.run(backend=backend)] == ["Paris"]
+    recent = Graph().match(place).where(place.prop.since > datetime.date(2020, 6, 1)).return_(place.prop.name)
+    assert [record["p.name"] for record in recent.run(backend=backend)] == ["Lyon"]
+    distance = Graph().return_(km=fn.Distance(paris, lyon) / 1000).run(backend=backend)[0]["km"]
+    assert 390 < distance < 395
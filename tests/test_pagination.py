@@ -0,0 +1,33 @@
+"""Tests for the `pagination` module."""
+
+from neopy import pagination
+from neopy.graph import Graph, Node, NodeLabel
+from tests.conftest import StubRecord
+
+
+def test_order_skip_limit_are_parameters():
+    """Render ORDER BY, SKIP and LIMIT, passing counts as parameters."""
+    graph = Graph().match(Node("n", NodeLabel("Person"))).return_("n").order_by("n.name", descending=True)
+    query = graph.skip(20).limit(10).query
+    assert query.render() == "MATCH (n:Person) RETURN n ORDER BY n.name DESC SKIP $skip LIMIT $limit;"
+    assert query.parameters == {"skip": 20, "limit": 10}
+
+
+def test_keyset_pages_start_after_last_key(stub_driver):
+    """
+    Fetch pages until a short one, starting each after the last key.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.records.extend([[StubRecord(_neopy_key=1), StubRecord(_neopy_key=2)], [StubRecord(_neopy_key=5)]])
+    graph = Graph().match(Node("n", NodeLabel("Person")))
+    records = list(pagination.keyset(graph, "n", key="id", page_size=2))
+    assert [record["_neopy_key"] for record in records] == [1, 2, 5]
+    (first, first_parameters), (second, second_parameters) = stub_driver.statements
+    assert first == "MATCH (n:Person) RETURN n, n.id AS _neopy_key ORDER BY n.id LIMIT $limit;"
+    assert second == (
+        "MATCH (n:Person) WHERE n.id > $neopy_last RETURN n, n.id AS _neopy_key ORDER BY n.id LIMIT $limit;"
+    )
+    assert first_parameters == {"limit": 2}
+    assert second_parameters == {"limit": 2, "neopy_last": 2}
@@ -0,0 +1,122 @@
+"""Tests for the `pipeline` module."""
+
+import pytest
+from neo4j.work.transaction import Transaction
+
+from neopy import db
+from neopy.backends import BoltBackend
+from neopy.exceptions import CypherError
+from neopy.functions import fn
+from neopy.graph import Graph, Node, NodeLabel, RelationshipTo, RelationshipType
+from neopy.memory import InMemoryBackend
+from neopy.pipeline import Pipeline, pipelined
+from tests.conftest import StubRecord
+
+PERSON = NodeLabel("Person")
+
+
+class BoltConnection:
+    """A connection answering the messages sent by the driver, and counting the times it waits for an answer."""
+
+    bolt_patches = frozenset()
+    supports_multiple_results = True
+    server_info = None
+    most_recent_qid = None
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.queued = []
+        self.sent = []
+        self.round_trips = 0
+        self.waiting = False
+
+    def run(self, query, parameters=None, on_success=None, **metadata):
+        fields, _ = self.answers[0]
+        self.queued.append(lambda: on_success({"fields": fields, "qid": -1}))
+
+    def pull(self, on_records=None, on_success=None, on_summary=None, **metadata):
+        _, rows = self.answers.pop(0)
+
+        def answer():
+            on_records(rows)
+            on_success({})
+            on_summary()
+
+        self.queued.append(answer)
+
+    def send_all(self):
+        self.sent.extend(self.queued)
+        self.queued = []
+        self.waiting = True
+
+    def fetch_message(self):
+        if self.waiting:
+            self.round_trips += 1
+            self.waiting = False
+        self.sent.pop(0)()
+
+
+def test_queries_are_sent_in_one_statement(stub_driver):
+    """
+    Combine the queued queries in a single statement, and split its records.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.records.append([StubRecord({"r0": [], "r1": [[1, "Anna"], [2, "Bob"]]})])
+    with pipelined() as pipeline:
+        pipeline.add(Graph().create(Node("a", PERSON, name="Anna")))
+        pipeline.add(Graph().match(Node("p", PERSON)).where(Node("p").prop.age > 3).return_("p", "p.name"))
+        assert not stub_driver.statements
+    assert len(stub_driver.sessions) == 1
+    assert stub_driver.sessions[0].config["default_access_mode"] == "WRITE"
+    assert stub_driver.statements == [
+        (
+            'CALL { CALL { CREATE (a:Person {name: "Anna"}) } RETURN [] AS r0 } '
+            "CALL { CALL { MATCH (p:Person) WHERE p.age > $q1_p0 RETURN p, p.name AS `p.name` } "
+            "RETURN collect([p, `p.name`]) AS r1 } RETURN r0, r1",
+            {"q1_p0": 3},
+        )
+    ]
+    assert [[dict(record) for record in records] for records in pipeline.results] == [
+        [],
+        [{"p": 1, "p.name": "Anna"}, {"p": 2, "p.name": "Bob"}],
+    ]
+    assert not pipeline
+
+
+def test_bolt_round_trips(monkeypatch):
+    """
+    Run queries in one round trip with the driver, or one per query when they cannot be combined.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch `db.run_transaction`.
+    """
+    connection = BoltConnection([(["r0", "r1"], [[[[0]], [[1]]]])])
+    monkeypatch.setattr(db, "run_transaction", lambda work, **options: work(Transaction(connection, 1000, None, None)))
+    graphs = [Graph().match(Node("n")).return_(count=fn.Count("n")) for _ in range(2)]
+    results = BoltBackend().run_many([(graph.query, *graph.query.compile()) for graph in graphs])
+    assert [[dict(record) for record in records] for records in results] == [[{"count": 0}], [{"count": 1}]]
+    assert connection.round_trips == 1
+
+    connection = BoltConnection([(["query"], [[index]]) for index in range(3)])
+    queries = [(None, "RETURN %d AS query" % index, {}) for index in range(3)]
+    assert BoltBackend().run_many(queries) == [[{"query": 0}], [{"query": 1}], [{"query": 2}]]
+    assert connection.round_trips == 3
+
+
+def test_dependent_writes_are_atomic():
+    """See the writes of the previous queries, and roll all of them back on failure."""
+    backend = InMemoryBackend()
+    anna, bob = Node("a", PERSON, name="Anna"), Node("b", PERSON, name="Bob")
+    friendship = Graph().match(anna).match(bob).create(Node("a"), RelationshipTo(RelationshipType("friend")), Node("b"))
+    pipeline = Pipeline(backend).add(Graph().create(anna).create(bob)).add(friendship)
+    pipeline.add(Graph().match(Node("a", PERSON), RelationshipTo("r"), Node("b")).return_("a", "b"))
+    (records,) = pipeline.run()[2:]
+    assert [(record["a"]["name"], record["b"]["name"]) for record in records] == [("Anna", "Bob")]
+
+    pipeline.add(Graph().create(Node("c", PERSON, name="Carl"))).add(Graph().match(Node("c")).return_("missing"))
+    with pytest.raises(CypherError):
+        pipeline.run()
+    assert len(backend.store.nodes) == 2
+
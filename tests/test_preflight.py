@@ -0,0 +1,68 @@
+"""Tests for the `preflight` module."""
+
+import pytest
+
+from neopy.backends import Backend
+from neopy.exceptions import QueryPlanError, QueryPlanWarning
+from neopy.graph import Graph, Node, NodeLabel
+from neopy.preflight import PreflightBackend, inspect_plan
+
+
+class PlanningBackend(Backend):
+    def __init__(self, plan):
+        self.plan = plan
+        self.explained = []
+
+    def run(self, query, statement, parameters, access_mode=None, **options):
+        return []
+
+    def explain(self, statement, parameters, access_mode=None, **options):
+        self.explained.append(statement)
+        return self.plan
+
+
+def _plan(operator, children=(), **args):
+    return {"operatorType": operator + "@neo4j", "args": args, "children": list(children)}
+
+
+def test_inspect_plan():
+    """Report cartesian products, large scans and unbounded expansions."""
+    scan = _plan("NodeByLabelScan", EstimatedRows=1e6)
+    small_scan = _plan("NodeByLabelScan", EstimatedRows=10)
+    expand = _plan("VarLengthExpand(All)", [small_scan], Details="(a)-[anon_0*2..]->(b)")
+    bounded = _plan("VarLengthExpand(All)", Details="(a)-[anon_0*2..5]->(b)")
+    plan = _plan("ProduceResults", [_plan("CartesianProduct", [scan, expand, bounded])])
+    assert sorted(inspect_plan(plan)) == [
+        "CartesianProduct",
+        "NodeByLabelScan of 1000000 estimated rows",
+        "unbounded VarLengthExpand(All)",
+    ]
+
+
+def test_plans_are_checked_once_per_shape():
+    """Explain each query shape once, warning or refusing according to the policy."""
+    backend = PlanningBackend(_plan("CartesianProduct"))
+    neo = Node("neo", NodeLabel("Database"))
+    anna = Node("anna", NodeLabel("Person"))
+    preflight = PreflightBackend(backend)
+    for name in ("Neo4j", "Neo4j 4"):
+        graph = Graph().match(neo).match(anna).where(neo.prop.name == name).return_(neo, anna)
+        with pytest.warns(QueryPlanWarning, match="CartesianProduct"):
+            graph.run(backend=preflight)
+    assert len(backend.explained) == 1
+    with pytest.raises(QueryPlanError):
+        graph.run(backend=PreflightBackend(backend, refuse=True))
+
+
+def test_literals_share_a_plan():
+    """Explain queries differing only by inline property values once."""
+    backend = PlanningBackend(_plan("ProduceResults"))
+    preflight = PreflightBackend(backend)
+    for index in range(5):
+        person = Node("p", NodeLabel("Person"), id=index, name="P%d" % index)
+        Graph().match(person).return_("p").run(backend=preflight)
+    Graph().match(Node("p", NodeLabel("Database"), id=1, name="P")).return_("p").run(backend=preflight)
+    assert backend.explained == [
+        'MATCH (p:Person {id: 0, name: "P0"}) RETURN p;',
+        'MATCH (p:Database {id: 1, name: "P"}) RETURN p;',
+    ]
@@ -0,0 +1,46 @@
+"""Tests for the `projection` module."""
+
+import pytest
+
+from neopy import projection
+from neopy.graph import Graph, Node, NodeLabel, RelationshipTo, RelationshipType
+from neopy.memory import InMemoryBackend
+
+numpy = pytest.importorskip("numpy")
+
+
+@pytest.fixture()
+def chain():
+    """
+    Project a chain a -> b -> c and a separate pair d -> e, from an in-memory graph.
+
+    Returns:
+        The projection.
+    """
+    backend = InMemoryBackend()
+    nodes = [backend.store.create_node(["Person"], {"name": name}) for name in "abcde"]
+    for start, end in [(0, 1), (1, 2), (3, 4)]:
+        backend.store.create_relationship("friend", nodes[start], nodes[end], {})
+    person = Node("p", NodeLabel("Person"))
+    friend = RelationshipTo(RelationshipType("friend"))
+    node_query = Graph().match(person).return_(person)
+    rel_query = Graph().match(Node("a"), friend, Node("b")).return_("a", "b")
+    return projection.project(node_query, rel_query, backend=backend)
+
+
+def test_csr_structure(chain):
+    """Remap ids and build the adjacency of each node."""
+    assert (chain.node_count, chain.edge_count) == (5, 3)
+    assert chain.indptr.tolist() == [0, 1, 2, 2, 3, 3]
+    assert chain.neighbours(chain.ids[1]).tolist() == [chain.ids[2]]
+    assert chain.degree().tolist() == [1, 2, 1, 1, 1]
+
+
+def test_algorithms(chain):
+    """Run BFS, connected components and PageRank on the projection."""
+    assert chain.bfs_depth(chain.ids[0]).tolist() == [0, 1, 2, -1, -1]
+    assert chain.bfs_depth(chain.ids[0], max_depth=1).tolist() == [0, 1, -1, -1, -1]
+    assert chain.connected_components().tolist() == [0, 0, 0, 1, 1]
+    ranks = chain.pagerank()
+    assert ranks.sum() == pytest.approx(1)
+    assert ranks[2] > ranks[1] > ranks[0]
@@ -0,0 +1,108 @@
+"""Tests for the `replay` and `benchmark` modules."""
+
+import pytest
+
+from neopy import backends, benchmark
+from neopy.backends import Backend
+from neopy.exceptions import CypherError, ReplayMiss
+from neopy.graph import Graph, Node, NodeLabel, RelationshipTo, RelationshipType
+from neopy.memory import InMemoryBackend
+from neopy.pipeline import Pipeline
+from neopy.replay import RecordingBackend, ReplayBackend
+
+
+def _friends():
+    anna = Node("a", NodeLabel("Person"), name="Anna")
+    friend = RelationshipTo("r", RelationshipType("friend"))
+    return Graph().match(anna, friend, Node("b")).return_("a", "r", "b.name").run()
+
+
+@pytest.mark.parametrize("filename", ["traffic.jsonl", "traffic.jsonl.gz"])
+def test_record_then_replay(tmp_path, filename):
+    """
+    Replay the records of a recorded query, entities included.
+
+    Arguments:
+        tmp_path: A temporary directory.
+        filename: The name of the recording.
+    """
+    memory = InMemoryBackend()
+    anna = memory.store.create_node(["Person"], {"name": "Anna"})
+    bob = memory.store.create_node(["Person"], {"name": "Bob"})
+    memory.store.create_relationship("friend", anna, bob, {"since": 2010})
+    path = tmp_path / filename
+
+    with backends.using(RecordingBackend(path, memory)):
+        recorded = _friends()
+    with backends.using(ReplayBackend(path)):
+        replayed = _friends()
+
+    assert replayed[0].keys() == ["a", "r", "b.name"]
+    node, relationship, name = replayed[0]
+    assert (node.id, set(node.labels), node["name"]) == (anna.id, {"Person"}, "Anna")
+    assert (relationship.type, relationship["since"], relationship.end_node.id) == ("friend", 2010, bob.id)
+    assert name == recorded[0]["b.name"] == "Bob"
+
+    with pytest.raises(ReplayMiss):
+        Graph().match(Node("n")).return_("n").run(backend=ReplayBackend(path))
+
+
+def test_benchmark_counts_replayed_queries(tmp_path):
+    """
+    Time a workload on a recording.
+
+    Arguments:
+        tmp_path: A temporary directory.
+    """
+    path = tmp_path / "traffic.jsonl"
+    with backends.using(RecordingBackend(path, InMemoryBackend())):
+        _friends()
+    result = benchmark.run(_friends, path, repeat=3)
+    assert len(result.timings) == 3
+    assert result.queries == 1
+    assert result.summary().startswith("_friends: 3 runs, 1 queries")
+
+
+def test_prepared_queries_allocate_less():
+    """Trace the memory allocated by building queries, and by rebinding a prepared one."""
+    built = benchmark.measure_allocations("render", operations=20, warmup=5)
+    prepared = benchmark.measure_allocations("render-prepared", operations=20, warmup=5)
+    assert len(built.peaks) == 20
+    assert prepared.peak < built.peak
+    assert built.summary().startswith("render: 20 operations")
+
+
+def test_benchmark_deletes_its_nodes():
+    """Delete the nodes written by a scenario once it has run."""
+    backend = InMemoryBackend()
+    with backends.using(backend):
+        benchmark.run_scenario("point-read", operations=5, warmup=0)
+        benchmark.run_scenario("create", operations=5, warmup=0)
+    assert not backend.store.nodes
+
+
+def test_recording_forwards_streams_pipelines_and_plans(tmp_path):
+    """
+    Record streamed queries, run pipelines in one transaction, and explain queries, with the recorded backend.
+
+    Arguments:
+        tmp_path: A temporary directory.
+    """
+    memory = InMemoryBackend()
+    memory.store.create_node(["Person"], {"name": "Anna"})
+    path = tmp_path / "traffic.jsonl"
+    recording = RecordingBackend(path, memory)
+    people = Graph().match(Node("p", NodeLabel("Person"))).return_("p.name")
+    assert people.stream(lambda records: [record["p.name"] for record in records], backend=recording) == ["Anna"]
+    assert people.run(backend=ReplayBackend(path))[0]["p.name"] == "Anna"
+
+    pipeline = Pipeline(recording).add(Graph().create(Node("b", NodeLabel("Person"), name="Bob")))
+    with pytest.raises(CypherError):
+        pipeline.add(Graph().match(Node("c")).return_("missing")).run()
+    assert len(memory.store.nodes) == 1
+
+    class PlanningBackend(Backend):
+        def explain(self, statement, parameters, access_mode=None, **options):
+            return {"operatorType": "ProduceResults"}
+
+    assert RecordingBackend(path, PlanningBackend()).explain("RETURN 1", {}) == {"operatorType": "ProduceResults"}
@@ -0,0 +1,126 @@
+"""Tests for the `retry` module and retried transactions."""
+
+from types import SimpleNamespace
+
+import pytest
+from neo4j.exceptions import ServiceUnavailable, TransientError
+
+from neopy import db
+from neopy.exceptions import AlreadyCommitted
+from neopy.graph import Graph, Node, NodeLabel
+from neopy.memory import MemoryNode, MemoryRecord
+from neopy.retry import RetryPolicy
+from tests.conftest import StubRecord
+
+NO_DELAY = RetryPolicy(initial_delay=0)
+
+
+def test_delays_grow_within_jitter():
+    """Delays grow exponentially, spread by jitter and capped."""
+    policy = RetryPolicy(max_retries=4, initial_delay=1, multiplier=2, max_delay=5, jitter=0.1)
+    delays = list(policy.delays())
+    assert len(delays) == 4
+    for delay, expected in zip(delays, [1, 2, 4, 5]):
+        assert expected * 0.9 <= delay <= expected * 1.1
+
+
+def test_deadline_stops_retries():
+    """No retry is attempted when its delay would exceed the deadline."""
+    calls = []
+
+    def fail():
+        calls.append(None)
+        raise TransientError("deadlock")
+
+    with pytest.raises(TransientError):
+        RetryPolicy(initial_delay=1, deadline=0.5).call(fail)
+    assert len(calls) == 1
+
+
+def test_run_retries_transient_errors(stub_driver):
+    """
+    Replay the transaction after transient errors.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.failures.extend([TransientError("deadlock"), ServiceUnavailable("leader switch")])
+    stub_driver.records.append([StubRecord(you=SimpleNamespace(id=3))])
+    you = Node("you", NodeLabel("Person"), name="You").create(policy=NO_DELAY)
+    assert you.internal_id == 3
+    assert len(stub_driver.statements) == 3
+    assert len(stub_driver.sessions) == 3
+
+
+def test_retry_budget_is_exhausted(stub_driver):
+    """
+    Raise the last error once the retry budget is spent.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.failures.extend([TransientError("deadlock")] * 3)
+    with pytest.raises(TransientError):
+        Graph().match(Node("n")).return_("n").run(policy=RetryPolicy(max_retries=2, initial_delay=0))
+
+
+def test_replay_returns_committed_outcome(stub_driver):
+    """
+    Do not replay a write whose idempotency marker was committed, and return its stored result.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.commit_failures.append(ServiceUnavailable("connection reset during commit"))
+    stored = db._encode_outcome([MemoryRecord(["you"], [MemoryNode(7, ["Person"], {"name": "You"})])])
+    stub_driver.records.extend([[], [StubRecord(you=SimpleNamespace(id=7))], [], [StubRecord(outcome=stored)]])
+    you = Node("you", NodeLabel("Person"), name="You").create(policy=NO_DELAY, idempotency_key="create-you")
+    assert you.internal_id == 7
+    statements = [statement for statement, _ in stub_driver.statements]
+    assert statements[0] == db.MARKER_CHECK
+    assert statements[1] == 'CREATE (you:Person {name: "You"}) RETURN you;'
+    assert statements[2] == db.MARKER_CREATE
+    assert statements[3] == db.MARKER_CHECK
+    assert stub_driver.statements[2][1]["ttl"] == int(db.marker_ttl * 1000)
+
+
+def test_replay_without_outcome_raises(stub_driver):
+    """
+    Raise `AlreadyCommitted` when the marker of a committed write has no stored result.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.commit_failures.append(ServiceUnavailable("connection reset during commit"))
+    stub_driver.records.extend([[], [], [], [StubRecord(outcome=None)]])
+    with pytest.raises(AlreadyCommitted):
+        Graph().create(Node("you", name="You")).run(policy=NO_DELAY, idempotency_key="create-you")
+
+
+def test_new_call_returns_committed_outcome(stub_driver):
+    """
+    Do not write again when a new call uses the key of a committed write.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stored = db._encode_outcome([MemoryRecord(["you"], [MemoryNode(7, ["Person"], {"name": "You"})])])
+    stub_driver.records.append([StubRecord(outcome=stored)])
+    you = Node("you", NodeLabel("Person"), name="You").create(policy=NO_DELAY, idempotency_key="create-you")
+    assert you.internal_id == 7
+    assert [statement for statement, _ in stub_driver.statements] == [db.MARKER_CHECK]
+
+
+def test_deadline_is_the_transaction_timeout(stub_driver):
+    """
+    Give each transaction the time left before the deadline of the retry policy.
+
+    Arguments:
+        stub_driver: A stub Neo4j driver.
+    """
+    stub_driver.failures.append(TransientError("deadlock"))
+    Graph().match(Node("n")).return_("n").run(policy=RetryPolicy(initial_delay=0, deadline=10))
+    first, second = (session.transaction_config["timeout"] for session in stub_driver.sessions)
+    assert 0 < second <= first <= 10
+    Graph().match(Node("n")).return_("n").run(policy=NO_DELAY)
+    assert stub_driver.sessions[-1].transaction_config == {}
@@ -0,0 +1,45 @@
+"""Tests for the `search` module."""
+
+from neopy import backends, search
+from neopy.graph import Graph, Node, RelationshipFrom, RelationshipType
+from neopy.memory import InMemoryBackend
+
+
+def test_procedure_call_feeds_later_clauses():
+    """Render a full-text search whose nodes are matched by the next clauses."""
+    movies = search.fulltext("titles", "matrix", node=Node("movie"), top_k=10, min_score=0.5)
+    actors = movies.match(Node("movie"), RelationshipFrom(RelationshipType("ACTED_IN")), Node("actor")).return_("actor")
+    assert actors.query.compile() == (
+        "CALL db.index.fulltext.queryNodes($p0, $p1) YIELD node AS movie, score WHERE score >= $p2 "
+        "WITH movie, score ORDER BY score DESC LIMIT $limit "
+        "MATCH (movie)<-[:ACTED_IN]-(actor) RETURN actor;",
+        {"p0": "titles", "p1": "matrix", "p2": 0.5, "limit": 10},
+    )
+    assert actors.query.is_read_only()
+    assert not Graph().call("apoc.create.node", ["Person"], {}, yields=["node"]).query.is_read_only()
+
+
+def test_search_results_are_hydrated():
+    """Run vector and full-text searches in memory, and get nodes and scores."""
+    backend = InMemoryBackend()
+    store = backend.store
+    plots = {"The Matrix": [1.0, 0.0], "Speed": [0.0, 1.0], "Matrix Reloaded": [0.8, 0.6]}
+    movies = {title: store.create_node(["Movie"], {"title": title, "plot": plot}) for title, plot in plots.items()}
+    keanu = store.create_node(["Person"], {"name": "Keanu"})
+    store.create_relationship("ACTED_IN", keanu, movies["Speed"], {})
+    store.create_vector_index("plots", "Movie", "plot")
+    store.create_fulltext_index("titles", ["Movie"], ["title"])
+
+    with backends.using(backend):
+        nearest = search.hits(search.vector("plots", (0.9, 0.1), top_k=2))
+        assert [movie.properties["title"] for movie, _ in nearest] == ["The Matrix", "Matrix Reloaded"]
+        assert nearest[0][1] > nearest[1][1]
+        assert [movie.internal_id for movie, _ in search.hits(search.fulltext("titles", "matrix", min_score=1))] == [
+            movies["The Matrix"].id,
+            movies["Matrix Reloaded"].id,
+        ]
+
+        (speed,) = search.fulltext("titles", "speed", node="movie").match(
+            Node("movie"), RelationshipFrom(RelationshipType("ACTED_IN")), Node("actor")
+        ).return_("actor").run()
+        assert speed["actor"]["name"] == "Keanu"
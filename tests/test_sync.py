@@ -0,0 +1,55 @@
+"""Tests for the `sync` module."""
+
+from datetime import timezone
+
+from neo4j.time import DateTime
+
+from neopy import backends, sync
+from neopy.memory import InMemoryBackend
+
+
+def test_changes_resume_from_watermark(tmp_path):
+    """
+    Read changed nodes page by page, resuming from the persisted watermark.
+
+    Arguments:
+        tmp_path: A temporary directory.
+    """
+    backend = InMemoryBackend()
+    for index, updated_at in enumerate([10, 20, 20, 30]):
+        backend.store.create_node(["Person"], {"name": "P%d" % index, "updatedAt": updated_at})
+    path = str(tmp_path / "watermarks.json")
+    with backends.using(backend):
+        first_sync = [node["name"] for node in sync.changes("Person", store=sync.Watermarks(path), page_size=2)]
+        assert first_sync == ["P0", "P1", "P2", "P3"]
+        assert not list(sync.changes("Person", store=sync.Watermarks(path), page_size=2))
+
+        store = backend.store
+        store.nodes[1].properties["updatedAt"] = 40
+        store.create_node(["Person"], {"name": "P4", "updatedAt": 35})
+        changed = [node["name"] for node in sync.changes("Person", store=sync.Watermarks(path), page_size=2)]
+        assert changed == ["P4", "P1"]
+        assert sync.Watermarks(path).get("Person.updatedAt") == [40, 1]
+
+        new_nodes = sync.changes("Person", watermark=None, store=sync.Watermarks(path))
+        assert [node["name"] for node in new_nodes] == ["P0", "P1", "P2", "P3", "P4"]
+        assert sync.Watermarks(path).get("Person.id()") == 4
+
+
+def test_temporal_watermark_is_persisted(tmp_path):
+    """
+    Persist a `DateTime` watermark, and resume from it.
+
+    Arguments:
+        tmp_path: A temporary directory.
+    """
+    backend = InMemoryBackend()
+    for day in (1, 2):
+        updated_at = DateTime(2024, 1, day, tzinfo=timezone.utc)
+        backend.store.create_node(["Person"], {"name": "P%d" % day, "updatedAt": updated_at})
+    path = str(tmp_path / "watermarks.json")
+    with backends.using(backend):
+        assert len(list(sync.changes("Person", store=sync.Watermarks(path)))) == 2
+        assert sync.Watermarks(path).get("Person.updatedAt") == [DateTime(2024, 1, 2, tzinfo=timezone.utc), 1]
+        backend.store.create_node(["Person"], {"name": "P3", "updatedAt": DateTime(2024, 1, 3, tzinfo=timezone.utc)})
+        assert [node["name"] for node in sync.changes("Person", store=sync.Watermarks(path))] == ["P3"]
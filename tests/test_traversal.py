@@ -0,0 +1,45 @@
+"""Tests for the `traversal` module."""
+
+from neopy import backends
+from neopy.graph import Graph, Node, NodeLabel
+from neopy.memory import InMemoryBackend
+from neopy.traversal import INCOMING, OUTGOING, IdentityMap
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+
+    def run(self, query, statement, parameters, access_mode=None, **options):
+        self.queries += 1
+        return super().run(query, statement, parameters, access_mode, **options)
+
+
+def test_neighbours_are_prefetched_for_the_cohort():
+    """Fetch the neighbours of all the nodes loaded together in one query, level by level."""
+    backend = CountingBackend()
+    store = backend.store
+    people = [store.create_node(["Person"], {"name": name}) for name in ("Anna", "Bob", "Carl", "Dave")]
+    store.create_relationship("friend", people[0], people[2], {"since": 2010})
+    store.create_relationship("friend", people[1], people[2], {})
+    store.create_relationship("friend", people[2], people[3], {})
+    store.create_relationship("likes", people[0], people[3], {})
+
+    with backends.using(backend):
+        identity_map = IdentityMap()
+        (anna,) = identity_map.load(Graph().match(Node("p", name="Anna")).return_("p"))
+        others = Graph().match(Node("p", NodeLabel("Person"))).where("p.name <> 'Anna'").return_("p")
+        bob, carl, dave = identity_map.load(others)
+        assert backend.queries == 2
+
+        assert [node.properties["name"] for node in bob.neighbours("friend", OUTGOING)] == ["Carl"]
+        assert [node.properties["name"] for node in carl.neighbours("friend", OUTGOING)] == ["Dave"]
+        assert not dave.neighbours("friend", OUTGOING)
+        assert backend.queries == 3
+
+        (friendship,) = anna.relationships("friend", OUTGOING)
+        assert friendship.properties["since"] == 2010
+        assert friendship.end_node is carl
+        assert {node.properties["name"] for node in carl.neighbours(direction=INCOMING)} == {"Anna", "Bob"}
+        assert {node.properties["name"] for node in anna.neighbours()} == {"Carl", "Dave"}